@@ -1,37 +1,130 @@
+import hashlib
+import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from database import get_db
+import loading
+import metrics
+from cache import TTLCache
+from database import SessionLocal, get_db
+from hash_pool import HashPool, PoolSaturatedError
 from models import User
+from revocation import RevocationList
 
 # 設定
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production-2025")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 14400  # 10日（14400分）
 
+# 移行期間: subにメールアドレスを持つ旧形式トークンを受け付けるか
+# 旧形式トークンがすべて失効したら（最長ACCESS_TOKEN_EXPIRE_MINUTES後）falseにできる
+ACCEPT_LEGACY_EMAIL_SUBJECT = os.getenv("ACCEPT_LEGACY_EMAIL_SUBJECT", "true").lower() == "true"
+
+
+# argon2のコストパラメータ（calibrate_argon2.pyで計測して書き出したファイル）
+# ファイルがなければpasslibのデフォルト値を使う
+ARGON2_PARAMS_FILE = os.getenv(
+    "ARGON2_PARAMS_FILE", os.path.join(os.path.dirname(__file__), "argon2_params.json")
+)
+
+
+def load_argon2_params(path: str = ARGON2_PARAMS_FILE) -> dict[str, int]:
+    """argon2のパラメータ（time_cost, memory_cost, parallelism）を読み込む"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        params = json.load(f)
+    return {
+        key: int(params[key])
+        for key in ("time_cost", "memory_cost", "parallelism")
+        if key in params
+    }
+
+
+def build_crypt_context(argon2_params: dict[str, int]) -> CryptContext:
+    """指定したargon2パラメータでCryptContextを作成する"""
+    settings = {f"argon2__{key}": value for key, value in argon2_params.items()}
+    return CryptContext(schemes=["argon2"], deprecated="auto", **settings)
+
 
 # パスワードハッシュ化
 # argon2idは現代的で安全なハッシュアルゴリズム（bcryptより推奨）
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = build_crypt_context(load_argon2_params())
+
+# ハッシュ計算は専用プールで実行する（共有スレッドプールの枯渇を防ぐ）
+password_hash_pool = HashPool(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16")),
+)
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+metrics.register("password_hash", password_hash_pool.stats)
 
 # OAuth2スキーム
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# 認証済みユーザーのキャッシュ（トークンのsub -> ユーザーのカラム値）
+# 同一ユーザーの短時間の連続リクエストでusersテーブルへの問い合わせを省く
+user_cache = TTLCache(
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", "1024")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "30")),
+)
+metrics.register("user_cache", user_cache.stats)
+
+# 検証済みトークンのデコード結果のキャッシュ（トークンのSHA-256 -> クレーム）
+# 同じトークンの署名検証・JSONパースを繰り返さない。exp を過ぎたエントリは返さない
+token_cache = TTLCache(max_size=int(os.getenv("JWT_DECODE_CACHE_SIZE", "4096")))
+metrics.register("jwt_decode_cache", token_cache.stats)
+
+# 失効（ログアウト）済みトークンのリスト。他プロセスでの失効はこの間隔（秒）で取り込む
+revocation_list = RevocationList(
+    SessionLocal, sync_interval=float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "30"))
+)
+metrics.register("token_revocation", revocation_list.stats)
+
+
+def _run_in_hash_pool(fn, *args):
+    """ハッシュ専用プールで実行する。満杯なら503（Retry-After付き）を返す"""
+    try:
+        return password_hash_pool.run(fn, *args)
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please retry later.",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+
 
 def get_password_hash(password: str) -> str:
     """パスワードをハッシュ化する"""
-    return pwd_context.hash(password)
+    return _run_in_hash_pool(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """パスワードの検証"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_in_hash_pool(pwd_context.verify, plain_password, hashed_password)
+
+
+def rehash_password_if_needed(user: User, plain_password: str) -> bool:
+    """ハッシュのパラメータが現在の設定と異なれば再ハッシュする（コミットは呼び出し側）
+
+    検証済みの平文パスワードを渡すこと。再ハッシュした場合Trueを返す。
+    """
+    if not pwd_context.needs_update(user.hashed_password):
+        return False
+    try:
+        user.hashed_password = password_hash_pool.run(pwd_context.hash, plain_password)
+    except PoolSaturatedError:
+        # 混雑時はログインを優先し、再ハッシュは次回ログインに持ち越す
+        return False
+    return True
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -40,32 +133,147 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     expire = datetime.now() + (
         expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
+    # jtiはトークンの失効（ログアウト）に使う
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """トークンから現在のユーザーを取得"""
-    credentials_exception = HTTPException(
+def _user_snapshot(user: User) -> dict:
+    """キャッシュ用にユーザーのカラム値をコピーする（ORMインスタンスはセッションをまたがない）"""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _restore_user(db: Session, snapshot: dict) -> User:
+    """キャッシュしたカラム値から、SQLを発行せずにセッションへ永続化済みのUserを復元する"""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """更新・削除されたユーザーを記録し、コミット後にキャッシュを無効化する"""
+    for obj in [*session.dirty, *session.deleted]:
+        if isinstance(obj, User):
+            changed = session.info.setdefault("changed_users", [])
+            changed.append(obj.id)
+            # メールアドレス変更時は旧アドレスのキーも無効化する
+            changed.extend(inspect(obj).attrs.email.history.deleted or ())
+            changed.append(obj.email)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for key in session.info.pop("changed_users", []):
+        user_cache.pop(str(key))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_users", None)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="認証に挑戦しました",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str) -> dict:
+    """トークンを検証してクレームを返す（検証済みの結果はキャッシュする。戻り値は変更しないこと）"""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except jwt.PyJWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # expはjwt.decodeで検証済み。キャッシュもexpで失効させる
+    token_cache.set(digest, payload, expires_at=payload.get("exp"))
+    return payload
+
+
+def _decode_subject(token: str) -> str:
+    """トークンを検証してsub（ユーザーID、旧形式ではメールアドレス）を返す"""
+    payload = _decode_token(token)
+
+    subject = payload.get("sub")
+    if not isinstance(subject, str):
+        raise _credentials_exception()
+
+    jti = payload.get("jti")
+    if jti is not None and revocation_list.is_revoked(jti):
+        raise _credentials_exception()
+    return subject
+
+
+def _parse_user_id(subject: str) -> UUID | None:
+    """subがユーザーID（UUID）ならUUIDを返す。旧形式（メールアドレス）ならNone"""
+    try:
+        return UUID(subject)
+    except ValueError:
+        if not ACCEPT_LEGACY_EMAIL_SUBJECT:
+            raise _credentials_exception()
+        return None
+
+
+def _resolve_user(db: Session, subject: str) -> User:
+    """subからユーザーを取得する（キャッシュにあればDBに問い合わせない）"""
+    snapshot = user_cache.get(subject)
+    if snapshot is not None:
+        return _restore_user(db, snapshot)
 
-    user = db.query(User).filter(User.email == email).first()
+    # 認証ではユーザーのカラムのみ必要（挑戦記録は読み込まない）
+    user_id = _parse_user_id(subject)
+    query = db.query(User).options(*loading.USER_ONLY)
+    if user_id is not None:
+        user = query.filter(User.id == user_id).first()
+    else:
+        user = query.filter(User.email == subject).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
+    user_cache.set(subject, _user_snapshot(user))
     return user
+
+
+def revoke_token(db: Session, token: str) -> None:
+    """トークンを失効させる（jtiのない旧形式トークンは失効できないため何もしない）"""
+    payload = _decode_token(token)
+
+    jti = payload.get("jti")
+    if jti is None:
+        return
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None)
+    revocation_list.revoke(db, jti, expires_at)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """トークンから現在のユーザーを取得"""
+    return _resolve_user(db, _decode_subject(token))
+
+
+def get_current_user_id(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> UUID:
+    """トークンから現在のユーザーIDを取得（軽量版）
+
+    検証済みのクレームからIDを返すだけで、DBには問い合わせない。
+    user_idしか使わないエンドポイントはget_current_userの代わりにこちらを使う。
+    旧形式トークン（sub=メールアドレス）の場合のみユーザーを引いてIDを解決する。
+    """
+    subject = _decode_subject(token)
+    user_id = _parse_user_id(subject)
+    if user_id is not None:
+        return user_id
+    return _resolve_user(db, subject).id
@@ -0,0 +1,123 @@
+"""通知メールの一括送信のスループットとAPI呼び出し回数を、同時送信数・バッチサイズ・レート制限ごとに比較する
+
+Resendへの送信（Batch.send / Emails.send）は、1回の呼び出しごとに指定した遅延だけ待ってから
+成功を返す偽の送信処理に置き換える（実際のメールは送らない）。テンプレートのレンダリングを
+含む送信処理をdispatch_notificationsで実行し、1秒あたりの送信数とAPI呼び出し数を計測する。
+レート制限（回/秒）を指定すると、API呼び出しが上限に張り付いたときのスループットがわかる。
+
+使い方:
+    python benchmarks/notification_dispatch.py                  # 1000件、遅延300ms、無制限と2回/秒
+    python benchmarks/notification_dispatch.py --users 200 --rate-limit 0 --batch-size 1 100
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import email_service  # noqa: E402
+from email_service import NOTIFICATION_RATE_LIMIT_PER_SECOND, dispatch_notifications  # noqa: E402
+from models import User, generate_uuid  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+
+
+def _fake_resend(latency: float) -> types.ModuleType:
+    """API呼び出しごとにlatency秒待って成功を返し、呼び出し回数を数えるresendモジュールの代わり"""
+    module = types.ModuleType("resend")
+    module.api_key = None
+    module.calls = 0
+    lock = threading.Lock()
+
+    def call() -> None:
+        with lock:
+            module.calls += 1
+        time.sleep(latency)
+
+    class Emails:
+        @staticmethod
+        def send(params):
+            call()
+            return {"id": "bench"}
+
+    class Batch:
+        @staticmethod
+        def send(params, options=None):
+            call()
+            return {"data": [{"id": "bench"} for _ in params]}
+
+    module.Emails = Emails
+    module.Batch = Batch
+    return module
+
+
+def run(
+    resend: types.ModuleType,
+    users: list[User],
+    concurrency: int,
+    batch_size: int,
+    rate_limit: float,
+) -> tuple[float, int, float]:
+    """全員に送信し、1秒あたりの送信数・API呼び出し回数・所要秒数を返す"""
+    weekly_stats = {u.id: {"challenge_count": 3, "total_score": 10} for u in users}
+    resend.calls = 0
+    email_service.notification_rate_limiter = RateLimiter(rate=rate_limit)
+
+    # 送信ごとのログ出力は計測の邪魔になるので捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = dispatch_notifications(
+            users, weekly_stats, concurrency=concurrency, batch_size=batch_size
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(results)
+    return len(users) / elapsed, resend.calls, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="送信するユーザー数")
+    parser.add_argument("--latency-ms", type=float, default=300, help="API呼び出し1回あたりの遅延")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10], help="比較する同時送信数"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, nargs="+", default=[100], help="比較するバッチサイズ"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        nargs="+",
+        default=[0, NOTIFICATION_RATE_LIMIT_PER_SECOND],
+        help="比較するAPI呼び出しの上限（回/秒、0で無制限）",
+    )
+    args = parser.parse_args()
+
+    resend = _fake_resend(args.latency_ms / 1000)
+    sys.modules["resend"] = resend
+    os.environ["RESEND_API_KEY"] = "re_benchmark"
+
+    # セッションに属さないユーザー（ワーカーからはemailとidだけを読む）
+    users = [User(id=generate_uuid(), email=f"user{i}@example.com") for i in range(args.users)]
+
+    print(f"📊 {args.users}件の通知メール送信（API呼び出し1回 {args.latency_ms:.0f} ms）")
+    for rate_limit in args.rate_limit:
+        label = f"{rate_limit:g} 回/秒" if rate_limit > 0 else "無制限"
+        for batch_size in args.batch_size:
+            for concurrency in args.concurrency:
+                rate, calls, elapsed = run(resend, users, concurrency, batch_size, rate_limit)
+                print(
+                    f"  rate_limit={label}, batch_size={batch_size}, concurrency={concurrency}: "
+                    f"{rate:,.1f} 通/秒、API呼び出し {calls}回（{calls / elapsed:.1f} 回/秒、"
+                    f"所要 {elapsed:.1f} 秒）"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""挑戦記録一覧のレスポンスのシリアライズにかかる1行あたりの時間を比較する
+
+before: 行ごとにmodel_validate → model_dump → JST変換した辞書を作り、
+        FastAPIと同様にSuccessResponseで再検証 → jsonable_encoder → json.dumps する
+after:  TypeAdapterで一覧を1回で検証し、ModelResponseでpydantic-coreが直接JSONにする
+
+使い方:
+    python benchmarks/serialization.py               # 100行のレスポンスで比較
+    python benchmarks/serialization.py --rows 1000 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schemas import ChallengeResponse, PaginatedResponse, challenge_list_adapter  # noqa: E402
+from serialization import ModelResponse  # noqa: E402
+
+jst = timezone(timedelta(hours=9))
+
+# select(*loading.CHALLENGE_COLUMNS)の行と同じく属性でアクセスできる行
+ChallengeRow = namedtuple("ChallengeRow", ["id", "user_id", "content", "score", "created_at"])
+
+
+class LegacyChallengeResponse(BaseModel):
+    """変更前のChallengeResponse（JST変換のシリアライザなし）"""
+
+    id: uuid.UUID
+    user_id: uuid.UUID
+    content: str
+    score: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class LegacySuccessResponse(BaseModel):
+    """変更前のSuccessResponse（dataは型なし）"""
+
+    success: bool = True
+    data: dict | list | None = None
+    message: str | None = None
+    next_cursor: str | None = None
+
+
+def _rows(n: int) -> list[ChallengeRow]:
+    user_id = uuid.uuid4()
+    now = datetime.utcnow()
+    return [
+        ChallengeRow(uuid.uuid4(), user_id, f"挑戦の内容 {i}", i % 5 + 1, now - timedelta(hours=i))
+        for i in range(n)
+    ]
+
+
+def before(rows: list[ChallengeRow]) -> bytes:
+    data = []
+    for row in rows:
+        challenge_dict = LegacyChallengeResponse.model_validate(row).model_dump()
+        created_at_jst = row.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
+        challenge_dict["created_at"] = created_at_jst.isoformat()
+        data.append(challenge_dict)
+    content = {"success": True, "data": data, "message": "ok", "next_cursor": None}
+    # FastAPIのresponse_modelによる再検証と、JSONResponseのjson.dumps
+    validated = LegacySuccessResponse.model_validate(content)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def after(rows: list[ChallengeRow]) -> bytes:
+    return ModelResponse(
+        PaginatedResponse[list[ChallengeResponse]](
+            data=challenge_list_adapter.validate_python(rows, from_attributes=True),
+            message="ok",
+        )
+    ).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="1レスポンスの行数")
+    parser.add_argument("--repeat", type=int, default=500, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    assert json.loads(before(rows)) == json.loads(after(rows))
+
+    print(f"📊 {args.rows}行のレスポンスのシリアライズ（{args.repeat}回の平均）")
+    for name, fn in (("before", before), ("after", after)):
+        seconds = timeit.timeit(lambda: fn(rows), number=args.repeat) / args.repeat
+        print(
+            f"  {name}: {seconds * 1e6 / args.rows:.2f} µs/行（{seconds * 1e3:.2f} ms/レスポンス）"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""通知メールのテンプレート描画（HTML + テキスト）のスループットを比較する
+
+before: 宛先ごとにテンプレートファイルを2つ読み込み（存在確認 + 読み込み）、
+        プレースホルダーごとに文字列全体をstr.replaceする
+after:  コンパイル済み・キャッシュ済みのテンプレートに値を入れて1回joinする
+
+使い方:
+    python benchmarks/template_render.py                        # 10万宛先で比較
+    python benchmarks/template_render.py --recipients 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_service import TEMPLATE_DIR, _get_template  # noqa: E402
+
+TEMPLATE_NAMES = ("notification_email.html", "notification_email.txt")
+
+
+def _context(i: int) -> dict[str, Any]:
+    # _build_notification_emailと同じ変数
+    return {
+        "email": f"user{i}@example.com",
+        "challenge_count": i % 20,
+        "total_score": i % 100,
+        "average_score": f"{(i % 50) / 10:.1f}",
+        "week_start": "2025/01/06",
+        "week_end": "2025/01/12",
+        "app_url": "https://example.com",
+    }
+
+
+def before(context: dict[str, Any]) -> list[str]:
+    bodies = []
+    for name in TEMPLATE_NAMES:
+        template_path = os.path.join(TEMPLATE_DIR, name)
+        if not os.path.exists(template_path):
+            bodies.append("")
+            continue
+        with open(template_path, encoding="utf-8") as f:
+            result = f.read()
+        for key, value in context.items():
+            result = result.replace("{{ " + key + " }}", str(value))
+        bodies.append(result)
+    return bodies
+
+
+def after(context: dict[str, Any]) -> list[str]:
+    bodies = []
+    for name in TEMPLATE_NAMES:
+        template = _get_template(name)
+        bodies.append(template.render(context) if template else "")
+    return bodies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=100_000, help="描画する宛先数")
+    args = parser.parse_args()
+
+    contexts = [_context(i) for i in range(args.recipients)]
+    assert before(contexts[0]) == after(contexts[0])
+
+    print(f"📊 {args.recipients:,}宛先分のテンプレート描画（HTML + テキスト）")
+    for name, fn in (("before", before), ("after", after)):
+        start = time.perf_counter()
+        for context in contexts:
+            fn(context)
+        elapsed = time.perf_counter() - start
+        print(f"  {name}: {args.recipients / elapsed:,.0f} 宛先/秒（合計 {elapsed:.2f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""プロセス内キャッシュ（LRU + TTL）"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    """件数上限付きのLRU + TTLキャッシュ（スレッドセーフ）
+
+    - max_size件を超えると最も長く使われていないエントリから削除する
+    - 各エントリはttl秒、またはset時に指定したexpires_at（UNIX時刻）の早い方で失効する
+    - ヒット/ミス/追い出し件数をstats()で参照できる
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """値を取得する。存在しない・失効している場合はdefaultを返す"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, expires_at: float | None = None) -> None:
+        """値を保存する。expires_atを指定するとTTLより早く失効させられる"""
+        if self.max_size <= 0:
+            return
+        if self.ttl is not None:
+            ttl_expires_at = time.time() + self.ttl
+            expires_at = ttl_expires_at if expires_at is None else min(expires_at, ttl_expires_at)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """エントリを削除する（存在しなくてもよい）"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """全エントリと統計をリセットする"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュの統計情報"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
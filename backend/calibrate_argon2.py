@@ -0,0 +1,113 @@
+"""
+argon2のコストパラメータをこのホストで計測し、目標レイテンシを満たす値を書き出すスクリプト
+
+使い方:
+    python calibrate_argon2.py --target-ms 50 --samples 20
+
+本番と同じく、ハッシュ専用プールのワーカー数（PASSWORD_HASH_WORKERS）だけ同時に計算した
+状態でレイテンシを計測する（同時実行時はCPU・メモリ帯域を取り合うため単発より遅くなる）。
+
+書き出したファイル（デフォルト: argon2_params.json）はauth.pyが起動時に読み込む。
+パラメータが変わると、既存ユーザーのハッシュは次回ログイン時に透過的に再ハッシュされる。
+"""
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Callable
+
+from passlib.hash import argon2
+
+from auth import ARGON2_PARAMS_FILE, password_hash_pool
+from hash_pool import HashPool
+
+# 計測するメモリコスト候補（KiB）
+MEMORY_COST_CANDIDATES = [19456, 32768, 47104, 65536, 102400]
+MAX_TIME_COST = 10
+
+
+def measure_p95_ms(
+    time_cost: int, memory_cost: int, parallelism: int, samples: int, workers: int
+) -> float:
+    """指定パラメータでハッシュ計算をworkers並列でsamples回行い、p95レイテンシ（ミリ秒）を返す
+
+    レイテンシは1回のハッシュ計算にかかった時間（プールの待ち行列での待ち時間を除く）。
+    """
+    hasher = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    pool = HashPool(max_workers=workers, max_queue=max(samples, workers))
+
+    def timed_hash() -> float:
+        started_at = time.perf_counter()
+        hasher.hash("calibration-password")
+        return (time.perf_counter() - started_at) * 1000
+
+    # 常にworkers件が同時に計算されるよう、全サンプルをまとめて投入する
+    futures = [pool.submit(timed_hash) for _ in range(max(samples, workers))]
+    durations = sorted(future.result() for future in futures)
+    return durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+
+
+def calibrate(
+    target_ms: float,
+    parallelism: int,
+    samples: int,
+    workers: int = 1,
+    measure: Callable[[int, int, int, int, int], float] = measure_p95_ms,
+) -> dict[str, float | int] | None:
+    """workers並列の計算で目標p95以内に収まり、計算量（time_cost × memory_cost）が最大のパラメータを選ぶ
+
+    どの候補も目標を満たさない場合はNoneを返す。
+    """
+    best = None
+    for memory_cost in MEMORY_COST_CANDIDATES:
+        for time_cost in range(1, MAX_TIME_COST + 1):
+            p95_ms = measure(time_cost, memory_cost, parallelism, samples, workers)
+            print(
+                f"  m={memory_cost:>6} KiB, t={time_cost:>2}, p={parallelism}, "
+                f"workers={workers}: p95={p95_ms:.1f} ms"
+            )
+            if p95_ms > target_ms:
+                # time_costを上げても遅くなるだけなので次のメモリコストへ
+                break
+            if best is None or time_cost * memory_cost > best["time_cost"] * best["memory_cost"]:
+                best = {
+                    "time_cost": time_cost,
+                    "memory_cost": memory_cost,
+                    "parallelism": parallelism,
+                    "workers": workers,
+                    "p95_ms": round(p95_ms, 1),
+                    "target_p95_ms": target_ms,
+                }
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="argon2のコストパラメータを計測して書き出す")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="目標p95レイテンシ（ms）")
+    parser.add_argument("--samples", type=int, default=20, help="候補ごとの計測回数")
+    parser.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=password_hash_pool.max_workers,
+        help="同時に計算するハッシュの数（デフォルト: PASSWORD_HASH_WORKERS）",
+    )
+    parser.add_argument("--output", default=ARGON2_PARAMS_FILE, help="書き出し先のJSONファイル")
+    args = parser.parse_args()
+
+    print(f"🔧 argon2を{args.workers}並列で計測します（目標p95: {args.target_ms} ms）")
+    params = calibrate(args.target_ms, args.parallelism, args.samples, args.workers)
+    if params is None:
+        print("❌ 目標レイテンシを満たすパラメータが見つかりませんでした")
+        raise SystemExit(1)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(params, f, indent=2)
+        f.write("\n")
+
+    print(f"✅ {args.output} に書き出しました: {params}")
+
+
+if __name__ == "__main__":
+    main()
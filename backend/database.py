@@ -2,7 +2,8 @@ import os
 from collections.abc import Generator
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 # PostgreSQLのデータベースURL（環境変数から取得）
 SQLALCHEMY_DATABASE_URL = os.getenv(
@@ -31,3 +32,10 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(db: Session):
+    """接続先DBの方言のinsert()を返す（ON CONFLICT句を使うため）"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -1,169 +1,349 @@
+import importlib
 import os
-from datetime import datetime, timedelta, timezone
+import re
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
+import loading
+import metrics
+import stats_rollup
 from models import Challenge, User
+from notification_schedule import next_notification_at
+from rate_limiter import RateLimiter
 
 
 def _jst_timezone() -> timezone:
     return timezone(timedelta(hours=9))
 
 
-def get_users_for_notification(db: Session, hour_jst: int) -> list[User]:
-    """指定されたJST時刻(0-23)に通知を希望しているユーザーを取得する
+def get_users_for_notification(db: Session, now: datetime) -> list[User]:
+    """通知の送信時刻（next_notification_at）がnow（UTC naive）以前のユーザーを取得する
 
-    notification_timeはHH:MM形式で保存されているため、LIKEでhour部分を絞り込む
+    next_notification_atのインデックスの範囲検索で選ぶため、対象外のユーザーは読まない。
+    通知時刻はユーザーのタイムゾーンで分単位まで指定でき、送信前にclaim_users_for_notification
+    で次の時刻へ進める。
     """
-    hour_pattern = f"{hour_jst:02d}:"
-    users = db.query(User).filter(User.notification_time.like(f"{hour_pattern}%")).all()
+    users = (
+        db.query(User)
+        .options(*loading.USER_ONLY)
+        .filter(User.next_notification_at <= now)
+        .order_by(User.next_notification_at)
+        .all()
+    )
     return users
 
 
-def get_weekly_stats(db: Session, user_id) -> dict[str, Any]:
-    """指定ユーザーのこの週の統計を返す
+# 通知対象の確保（UPDATE ... WHERE id IN (...)）1文あたりのユーザー数
+NOTIFICATION_CLAIM_CHUNK_SIZE = 1000
 
-    返却値は辞書で、challenge_count, total_score, average_score, week_start, week_end を含む
-    week_start/week_end は JST の YYYY/MM/DD 形式を返す
+
+def claim_users_for_notification(
+    db: Session, now: datetime, chunk_size: int = NOTIFICATION_CLAIM_CHUNK_SIZE
+) -> list[User]:
+    """送信時刻を過ぎたユーザーを、送信する前に次の通知時刻へ進めてコミットし、進めたユーザーを返す
+
+    更新は「next_notification_atがまだnow以前」を条件にしたUPDATE ... RETURNINGで行う。
+    実行が重なった別のバッチ（cronの間隔より送信が長引いた場合など）が先に進めたユーザーは
+    条件に合わず返らないため、同じ通知を二重に送らない。送信前に進めるので、送信中に
+    プロセスが落ちても再送はせず、その回の通知は送られないままになる。
+    次の通知時刻は通知時刻とタイムゾーンだけで決まるため、その組み合わせごとに1文で更新する。
     """
-    jst = _jst_timezone()
+    due_users = get_users_for_notification(db, now)
+    if not due_users:
+        return []
+
+    user_ids_by_schedule: dict[tuple[str | None, str | None], list[Any]] = {}
+    for u in due_users:
+        user_ids_by_schedule.setdefault((u.notification_time, u.timezone), []).append(u.id)
+
+    claimed_ids = set()
+    for (notification_time, tz_name), user_ids in user_ids_by_schedule.items():
+        next_at = next_notification_at(notification_time, tz_name, now)
+        for i in range(0, len(user_ids), chunk_size):
+            claimed_ids.update(
+                db.scalars(
+                    update(User)
+                    .where(
+                        User.id.in_(user_ids[i : i + chunk_size]),
+                        User.next_notification_at <= now,
+                    )
+                    .values(next_notification_at=next_at)
+                    .returning(User.id)
+                    .execution_options(synchronize_session=False)
+                )
+            )
+    db.commit()
 
-    now_jst = datetime.now(jst)
-    week_start_jst = now_jst - timedelta(days=now_jst.weekday())
-    week_start_jst = week_start_jst.replace(hour=0, minute=0, second=0, microsecond=0)
+    if not claimed_ids:
+        return []
+    # コミットで属性が失効するため、ユーザーごとに再読み込みせずまとめて読み直す
+    claimed_id_list = list(claimed_ids)
+    for i in range(0, len(claimed_id_list), chunk_size):
+        db.query(User).options(*loading.USER_ONLY).filter(
+            User.id.in_(claimed_id_list[i : i + chunk_size])
+        ).all()
+    return [u for u in due_users if u.id in claimed_ids]
 
-    # 週末は週の開始から7日目の00:00 (exclusive)
-    week_end_jst = week_start_jst + timedelta(days=7)
 
-    # DB保存はUTC naiveなので、JST->UTCに変換して比較する
-    week_start_utc = week_start_jst.astimezone(timezone.utc).replace(tzinfo=None)
+WEEKLY_STATS_CHUNK_SIZE = 1000
 
-    challenges = (
-        db.query(Challenge)
-        .filter(Challenge.user_id == user_id, Challenge.created_at >= week_start_utc)
-        .all()
-    )
 
-    if not challenges:
-        return {
-            "challenge_count": 0,
-            "total_score": 0,
-            "average_score": 0.0,
-            "week_start": week_start_jst.strftime("%Y/%m/%d"),
-            "week_end": (week_end_jst - timedelta(seconds=1)).strftime("%Y/%m/%d"),
-        }
-
-    challenge_count = len(challenges)
-    total_score = sum(c.score for c in challenges)
+def _week_range(tz_name: str | None) -> tuple[date, date]:
+    """ユーザーのタイムゾーン（未指定ならJST）で今週の月曜日と日曜日を返す"""
+    today = datetime.now(stats_rollup.user_timezone(tz_name)).date()
+    week_start = today - timedelta(days=today.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+
+def _weekly_stats(
+    challenge_count: int, total_score: int, week_start: date, week_end: date
+) -> dict[str, Any]:
+    """件数・合計スコアと週の範囲から週次統計の辞書を作る"""
     average_score = total_score / challenge_count if challenge_count > 0 else 0.0
 
     return {
         "challenge_count": challenge_count,
         "total_score": total_score,
         "average_score": average_score,
-        "week_start": week_start_jst.strftime("%Y/%m/%d"),
-        "week_end": (week_end_jst - timedelta(seconds=1)).strftime("%Y/%m/%d"),
+        "week_start": week_start.strftime("%Y/%m/%d"),
+        "week_end": week_end.strftime("%Y/%m/%d"),
     }
 
 
-def _load_template(template_name: str) -> str:
-    """テンプレートファイルを読み込む"""
-    template_dir = os.path.join(os.path.dirname(__file__), "templates")
-    template_path = os.path.join(template_dir, template_name)
+def get_weekly_stats(db: Session, user_id, tz_name: str | None = None) -> dict[str, Any]:
+    """指定ユーザーのこの週の統計を返す
 
-    if not os.path.exists(template_path):
-        return ""
+    返却値は辞書で、challenge_count, total_score, average_score, week_start, week_end を含む
+    週の区切りはユーザーのタイムゾーン（tz_name、未指定ならJST）で、week_start/week_end は
+    YYYY/MM/DD 形式を返す
+    """
+    week_start, week_end = _week_range(tz_name)
 
-    with open(template_path, encoding="utf-8") as f:
-        return f.read()
+    # 挑戦記録のlocal_date（作成時の日付）で絞り込み、DB側で集計する
+    challenge_count, total_score = db.execute(
+        select(func.count(), func.coalesce(func.sum(Challenge.score), 0)).where(
+            Challenge.user_id == user_id, Challenge.local_date >= week_start
+        )
+    ).one()
 
+    return _weekly_stats(challenge_count, total_score, week_start, week_end)
 
-def _render_template(template_content: str, context: dict[str, Any]) -> str:
-    """テンプレートに変数を埋め込む（簡易テンプレートエンジン）"""
-    result = template_content
-    for key, value in context.items():
-        placeholder = "{{ " + key + " }}"
-        result = result.replace(placeholder, str(value))
-    return result
 
+def get_weekly_stats_for_users(
+    db: Session, users: list[User], chunk_size: int = WEEKLY_STATS_CHUNK_SIZE
+) -> dict[Any, dict[str, Any]]:
+    """複数ユーザーのこの週の統計を、ユーザーIDをキーにした辞書でまとめて返す
 
-def send_notification_email(user: User, stats: dict[str, Any]) -> bool:
-    """ユーザーに通知メールを送信する。
+    get_weekly_statsをユーザーごとに呼ぶ代わりに、GROUP BY user_idの1クエリで集計する。
+    週の開始日が同じユーザー（通常はほぼ全員）をまとめ、chunk_size人ずつIN句で絞り込むため、
+    クエリ数は対象人数ではなく「週の開始日の種類 × チャンク数」で決まる。
+    記録がないユーザーも0件の統計を返す。
+    """
+    # 週の範囲ごとにユーザーをまとめる（タイムゾーンが違っても今週の月曜日が同じなら一緒に集計できる）
+    users_by_week: dict[tuple[date, date], list] = {}
+    for u in users:
+        users_by_week.setdefault(_week_range(u.timezone), []).append(u.id)
+
+    stats: dict[Any, dict[str, Any]] = {}
+    for (week_start, week_end), user_ids in users_by_week.items():
+        totals = {}
+        for i in range(0, len(user_ids), chunk_size):
+            rows = db.execute(
+                select(Challenge.user_id, func.count(), func.coalesce(func.sum(Challenge.score), 0))
+                .where(
+                    Challenge.user_id.in_(user_ids[i : i + chunk_size]),
+                    Challenge.local_date >= week_start,
+                )
+                .group_by(Challenge.user_id)
+            )
+            totals.update({user_id: (count, score) for user_id, count, score in rows})
 
-    実際の送信はResend等のクライアントに委ねる。成功すればTrue、失敗または例外でFalseを返す。
-    この関数はテストのために簡易なモック可能な形で実装している。
+        for user_id in user_ids:
+            challenge_count, total_score = totals.get(user_id, (0, 0))
+            stats[user_id] = _weekly_stats(challenge_count, total_score, week_start, week_end)
+
+    return stats
+
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# 1にするとテンプレートファイルの更新を検知して読み込み直す（開発用。本番では初回の1回だけ読む）
+TEMPLATE_RELOAD = os.getenv("EMAIL_TEMPLATE_RELOAD") == "1"
+
+# {{ key }} 形式のプレースホルダー
+_PLACEHOLDER = re.compile(r"(\{\{ \w+ \}\})")
+
+
+class _CompiledTemplate:
+    """プレースホルダーの位置で分割済みのテンプレート（簡易テンプレートエンジン）
+
+    固定部分とプレースホルダーを交互に並べた断片のリストを持ち、
+    描画はプレースホルダーの位置に値を入れて1回joinするだけにする。
     """
-    print(f"🔔 Starting email notification for {user.email}")
+
+    __slots__ = ("_parts", "_slots")
+
+    def __init__(self, content: str):
+        # 奇数番目がプレースホルダー（"{{ key }}"）
+        self._parts = _PLACEHOLDER.split(content)
+        self._slots = [(i, self._parts[i][3:-3]) for i in range(1, len(self._parts), 2)]
+
+    def render(self, context: dict[str, Any]) -> str:
+        """テンプレートに変数を埋め込む（contextにないプレースホルダーはそのまま残す）"""
+        parts = self._parts.copy()
+        for i, key in self._slots:
+            if key in context:
+                parts[i] = str(context[key])
+        return "".join(parts)
+
+
+# テンプレート名 → (ファイルの更新時刻, コンパイル済みテンプレート)。ファイルがなければ両方None
+_template_cache: dict[str, tuple[float | None, _CompiledTemplate | None]] = {}
+
+
+def _get_template(template_name: str) -> _CompiledTemplate | None:
+    """コンパイル済みのテンプレートを返す。ファイルがなければNone
+
+    初回だけファイルを読み込んでコンパイルし、以降はキャッシュを返す。
+    TEMPLATE_RELOADが有効なときは更新時刻を確認し、変わっていれば読み込み直す。
+    """
+    cached = _template_cache.get(template_name)
+    if cached is not None and not TEMPLATE_RELOAD:
+        return cached[1]
+
+    template_path = os.path.join(TEMPLATE_DIR, template_name)
     try:
-        # インポートを実行時に行うことでテスト時にsys.modules経由で差し替え可能にする
-        import importlib
+        mtime = os.stat(template_path).st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    template = None
+    if mtime is not None:
+        with open(template_path, encoding="utf-8") as f:
+            template = _CompiledTemplate(f.read())
+    _template_cache[template_name] = (mtime, template)
+    return template
+
+
+def _build_notification_email(user: User, stats: dict[str, Any]) -> dict[str, Any]:
+    """通知メールの送信パラメータ（Resend SDKの形式）を作る"""
+    app_url = os.getenv("APP_URL", "https://example.com")
+    from_email = os.getenv("FROM_EMAIL", "noreply@example.com")
+
+    subject = "今日も挑戦を記録しましょう！"
+
+    # テンプレート変数の準備
+    template_context = {
+        "email": user.email,
+        "challenge_count": stats.get("challenge_count", 0),
+        "total_score": stats.get("total_score", 0),
+        "average_score": f"{stats.get('average_score', 0.0):.1f}",
+        "week_start": stats.get("week_start", ""),
+        "week_end": stats.get("week_end", ""),
+        "app_url": app_url,
+    }
 
+    # HTMLテンプレート・テキストテンプレートをレンダリング（コンパイル済みのものを使う）
+    html_template = _get_template("notification_email.html")
+    html_body = html_template.render(template_context) if html_template else ""
+
+    text_template = _get_template("notification_email.txt")
+    text_body = text_template.render(template_context) if text_template else ""
+
+    # テンプレートが読み込めない場合はフォールバック
+    if not html_body and not text_body:
+        text_body = (
+            f"Hi {user.email}\n\n"
+            f"今週の挑戦回数: {stats.get('challenge_count', 0)}\n"
+            f"合計スコア: {stats.get('total_score', 0)}\n"
+            f"平均スコア: {stats.get('average_score', 0.0):.1f}\n\n"
+            f"アプリへ: {app_url}\n"
+        )
+
+    # メール送信パラメータを準備（正しいResend Python SDK形式）
+    params = {
+        "from": from_email,  # "from"が正しいパラメータ名
+        "to": [user.email],
+        "subject": subject,
+    }
+    if html_body:
+        params["html"] = html_body
+    if text_body:
+        params["text"] = text_body
+    return params
+
+
+def _resend_client():
+    """APIキーを設定したresendモジュールを返す。APIキーが未設定ならNone"""
+    # インポート済みならsys.modulesから取るだけにする（テスト時はsys.modules経由で差し替え可能）
+    resend = sys.modules.get("resend")
+    if resend is None:
         print("📦 Importing resend module...")
         resend = importlib.import_module("resend")
         print("✅ Resend module imported successfully")
 
-        app_url = os.getenv("APP_URL", "https://example.com")
-        from_email = os.getenv("FROM_EMAIL", "noreply@example.com")
-
-        subject = "今日も挑戦を記録しましょう！"
-
-        # テンプレート変数の準備
-        template_context = {
-            "email": user.email,
-            "challenge_count": stats.get("challenge_count", 0),
-            "total_score": stats.get("total_score", 0),
-            "average_score": f"{stats.get('average_score', 0.0):.1f}",
-            "week_start": stats.get("week_start", ""),
-            "week_end": stats.get("week_end", ""),
-            "app_url": app_url,
-        }
-
-        # HTMLテンプレートを読み込んでレンダリング
-        html_template = _load_template("notification_email.html")
-        html_body = _render_template(html_template, template_context) if html_template else ""
-
-        # テキストテンプレートを読み込んでレンダリング
-        text_template = _load_template("notification_email.txt")
-        text_body = _render_template(text_template, template_context) if text_template else ""
-
-        # テンプレートが読み込めない場合はフォールバック
-        if not html_body and not text_body:
-            text_body = (
-                f"Hi {user.email}\n\n"
-                f"今週の挑戦回数: {stats.get('challenge_count', 0)}\n"
-                f"合計スコア: {stats.get('total_score', 0)}\n"
-                f"平均スコア: {stats.get('average_score', 0.0):.1f}\n\n"
-                f"アプリへ: {app_url}\n"
-            )
+    # Resend APIキーを設定
+    api_key = os.getenv("RESEND_API_KEY")
+    if not api_key:
+        print("❌ RESEND_API_KEY not found in environment variables")
+        return None
+    print(f"✅ RESEND_API_KEY found: {api_key[:8]}...")
 
-        # Resend APIキーを設定
-        api_key = os.getenv("RESEND_API_KEY")
-        if not api_key:
-            print("❌ RESEND_API_KEY not found in environment variables")
-            return False
-        print(f"✅ RESEND_API_KEY found: {api_key[:8]}...")
-
-        # APIキーをresendモジュールに設定
-        resend.api_key = api_key
-
-        # メール送信パラメータを準備（正しいResend Python SDK形式）
-        print(f"📧 Attempting to send email to {user.email}")
-        params = {
-            "from": from_email,  # "from"が正しいパラメータ名
-            "to": [user.email],
-            "subject": subject,
-        }
-        if html_body:
-            params["html"] = html_body
-        if text_body:
-            params["text"] = text_body
+    # APIキーをresendモジュールに設定
+    resend.api_key = api_key
+    return resend
 
+
+# ResendのAPI呼び出し回数の上限（回/秒。Resendの既定のレート制限は2回/秒）。0以下で無制限
+# プロセスごとの上限で、プロセス内の送信ワーカーのスレッドで共有し、Batch.send / Emails.sendの
+# 前に取得する。複数のプロセス（uvicornのワーカーなど）が同時に送信しうる場合は、合計がResendの
+# 制限を超えないよう、制限をプロセス数で割った値を設定する
+NOTIFICATION_RATE_LIMIT_PER_SECOND = float(os.getenv("NOTIFICATION_RATE_LIMIT_PER_SECOND", "2"))
+notification_rate_limiter = RateLimiter(rate=NOTIFICATION_RATE_LIMIT_PER_SECOND)
+metrics.register("notification_rate_limit", notification_rate_limiter.stats)
+
+
+def _send_single(resend, params: dict[str, Any]) -> bool:
+    """1通だけ送信する（Emails.send）。失敗時は例外を送出せずFalseを返す"""
+    recipient = params["to"][0]
+    print(f"📧 Attempting to send email to {recipient}")
+    try:
+        notification_rate_limiter.acquire()
         # Resend APIでメール送信（静的メソッドとして呼び出す）
         email = resend.Emails.send(params)
-        print(f"✅ Email sent successfully to {user.email}, ID: {email.get('id', 'N/A')}")
+    except Exception as e:
+        print(f"❌ Email send failed for {recipient}: {type(e).__name__}: {str(e)}")
+        import traceback
 
-        return True
+        traceback.print_exc()
+        return False
+
+    print(f"✅ Email sent successfully to {recipient}, ID: {email.get('id', 'N/A')}")
+    return True
+
+
+def send_notification_email(user: User, stats: dict[str, Any]) -> bool:
+    """ユーザーに通知メールを送信する。
+
+    実際の送信はResend等のクライアントに委ねる。成功すればTrue、失敗または例外でFalseを返す。
+    この関数はテストのために簡易なモック可能な形で実装している。
+    """
+    print(f"🔔 Starting email notification for {user.email}")
+    try:
+        resend = _resend_client()
+        if resend is None:
+            return False
+        return _send_single(resend, _build_notification_email(user, stats))
 
     except Exception as e:
         # エラー内容をログに記録して、デバッグを容易にする
@@ -174,30 +354,184 @@ def send_notification_email(user: User, stats: dict[str, Any]) -> bool:
         return False
 
 
+# Resendのバッチ送信API（Batch.send）で1回に送れるメッセージ数の上限
+RESEND_BATCH_SIZE = 100
+
+# レート制限（429）・サーバーエラー（5xx）・タイムアウト時にバッチを送り直す回数と待ち時間
+# 待ち時間は送り直すたびに倍にする（1秒、2秒、4秒…）
+RESEND_BATCH_MAX_RETRIES = int(os.getenv("RESEND_BATCH_MAX_RETRIES", "3"))
+RESEND_RETRY_BACKOFF_SECONDS = 1.0
+
+
+def _error_status(error: Exception) -> int | None:
+    """ResendのAPIエラー（ResendError.code）からHTTPステータスを取り出す。なければNone"""
+    try:
+        return int(getattr(error, "code", None))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_transient(error: Exception) -> bool:
+    """送り直せば成功しうるエラー（429・5xx・タイムアウトなどの通信エラー）ならTrue"""
+    status_code = _error_status(error)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    # requestsの例外（Timeout, ConnectionError）もOSErrorのサブクラス
+    return isinstance(error, OSError)
+
+
+def _is_validation_rejection(error: Exception) -> bool:
+    """バッチの内容が不正として全体が拒否された（400・422）ならTrue"""
+    return _error_status(error) in (400, 422)
+
+
+def _send_batch_with_retry(resend, messages: list[dict[str, Any]]) -> dict[str, Any]:
+    """Batch.sendで送り、一時的なエラーなら間隔を空けて同じバッチを送り直す
+
+    送り直しても同じ冪等キーを使うため、タイムアウトしたが実際は受け付けられていた
+    バッチが二重に送られることはない。送り直しても失敗した場合は最後の例外を送出する。
+    """
+    options = {
+        # 不正なメッセージがあってもバッチ全体は拒否させず、errors[].indexで受け取る
+        "batch_validation": "permissive",
+        "idempotency_key": f"notification-batch/{uuid.uuid4()}",
+    }
+    attempt = 0
+    while True:
+        try:
+            notification_rate_limiter.acquire()
+            return resend.Batch.send(messages, options)
+        except Exception as e:
+            if not _is_transient(e) or attempt >= RESEND_BATCH_MAX_RETRIES:
+                raise
+            backoff = RESEND_RETRY_BACKOFF_SECONDS * 2**attempt
+            attempt += 1
+            print(
+                f"⚠️ Batch send failed ({type(e).__name__}: {str(e)}), "
+                f"retrying in {backoff:.0f}s ({attempt}/{RESEND_BATCH_MAX_RETRIES})"
+            )
+        time.sleep(backoff)
+
+
+def send_notification_email_batch(
+    users: list[User], weekly_stats: dict[Any, dict[str, Any]]
+) -> list[bool]:
+    """複数ユーザーへの通知メールをResendのバッチ送信APIで1回で送り、usersと同じ順で成否を返す
+
+    usersはRESEND_BATCH_SIZE人以下であること。
+    - 一部のメッセージだけが不正としてerrorsで返された場合は、そのメッセージだけをFalseにする
+    - レート制限・サーバーエラー・タイムアウトはバッチごと送り直し（_send_batch_with_retry）、
+      それでも失敗したら全員Falseにする（1通ずつ送り直すと負荷と二重送信を増やすため）
+    - バッチ全体が内容の不正で拒否された場合だけ、1通ずつの送信に切り替える
+    - バッチ送信APIのないresendモジュールでは1通ずつ送る
+    """
+    print(f"🔔 Starting batch email notification for {len(users)} users")
+    try:
+        resend = _resend_client()
+        if resend is None:
+            return [False] * len(users)
+        messages = [_build_notification_email(u, weekly_stats[u.id]) for u in users]
+    except Exception as e:
+        print(f"❌ Batch email preparation failed: {type(e).__name__}: {str(e)}")
+        import traceback
+
+        traceback.print_exc()
+        return [False] * len(users)
+
+    if not hasattr(resend, "Batch"):
+        return [_send_single(resend, params) for params in messages]
+
+    try:
+        response = _send_batch_with_retry(resend, messages)
+    except Exception as e:
+        if _is_validation_rejection(e):
+            print(
+                f"⚠️ Batch rejected ({type(e).__name__}: {str(e)}), "
+                f"falling back to single sends for {len(messages)} emails"
+            )
+            return [_send_single(resend, params) for params in messages]
+        print(f"❌ Batch send failed for {len(messages)} emails: {type(e).__name__}: {str(e)}")
+        return [False] * len(messages)
+
+    # 不正として受け付けられなかったメッセージ（permissiveモードのerrors）は失敗にする
+    errors = response.get("errors") if isinstance(response, dict) else None
+    failed_indexes = {error["index"] for error in errors or []}
+    for error in errors or []:
+        recipient = messages[error["index"]]["to"][0]
+        print(f"❌ Email rejected for {recipient}: {error.get('message')}")
+    print(f"✅ Batch sent: {len(messages) - len(failed_indexes)}/{len(messages)} emails accepted")
+    return [i not in failed_indexes for i in range(len(messages))]
+
+
+# 通知メールのバッチを同時に送信する数（ResendへのHTTPS往復をスレッドで並列化する）
+# 全体の呼び出し回数はnotification_rate_limiterで制限される
+NOTIFICATION_CONCURRENCY = int(os.getenv("NOTIFICATION_CONCURRENCY", "10"))
+
+
+def dispatch_notifications(
+    users: list[User],
+    weekly_stats: dict[Any, dict[str, Any]],
+    send_batch: Callable[[list[User], dict[Any, dict[str, Any]]], list[bool]] | None = None,
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+) -> list[bool]:
+    """usersをbatch_size人ずつのバッチに分けて最大concurrencyバッチを並列に送り、usersと同じ順で成否を返す
+
+    送信はブロッキングなHTTPS呼び出しのため、GILを解放して待つスレッドで並列化できる。
+    ワーカーはロード済みのユーザーの属性と集計済みの統計だけを読み、DBセッションには触れない。
+    既定はsend_batch=send_notification_email_batch、concurrency=NOTIFICATION_CONCURRENCY、
+    batch_size=RESEND_BATCH_SIZE。
+    """
+    send_batch = send_batch or send_notification_email_batch
+    concurrency = concurrency or NOTIFICATION_CONCURRENCY
+    batch_size = batch_size or RESEND_BATCH_SIZE
+    batches = [users[i : i + batch_size] for i in range(0, len(users), batch_size)]
+
+    if concurrency <= 1 or len(batches) <= 1:
+        results = [send_batch(batch, weekly_stats) for batch in batches]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(batches)), thread_name_prefix="notification-email"
+        ) as executor:
+            results = list(executor.map(lambda batch: send_batch(batch, weekly_stats), batches))
+
+    return [ok for batch_results in results for ok in batch_results]
+
+
 def send_notification_batch(db: Session) -> dict[str, Any]:
-    """バッチ処理 - 現在JST時刻で対象ユーザーを選んでメールを送る
+    """バッチ処理 - 通知の送信時刻を過ぎたユーザーを選んでメールを送る
 
+    送信前に対象ユーザーを次の送信時刻へ進めて確保する（claim_users_for_notification）。
+    実行が重なっても各ユーザーには1通だけ送り、送信に失敗したユーザーもその時刻には再送しない。
     成果を集計した辞書を返す（テストでは未使用）
     """
     now_utc = datetime.now(timezone.utc)
     now_jst = now_utc.astimezone(_jst_timezone())
     current_hour = now_jst.hour
+    now = now_utc.replace(tzinfo=None)
 
-    users = get_users_for_notification(db, current_hour)
+    users = claim_users_for_notification(db, now)
 
     total = len(users)
     sent = 0
     failed = 0
     failed_emails = []
 
-    for u in users:
-        stats = get_weekly_stats(db, u.id)
-        ok = send_notification_email(u, stats)
+    # 対象ユーザー全員の週次統計をまとめて集計する（ユーザーごとのクエリを発行しない）
+    weekly_stats = get_weekly_stats_for_users(db, users)
+
+    # メールはバッチ送信APIでまとめて並列に送り、結果はユーザーの順に集計する
+    results = dispatch_notifications(users, weekly_stats)
+
+    # 失敗したユーザーは記録だけして、次の通知時刻は戻さない（同じ時刻に何度も再送しない）
+    for u, ok in zip(users, results):
         if ok:
             sent += 1
         else:
             failed += 1
             failed_emails.append({"user_id": str(u.id), "email": u.email, "error": "send_failed"})
+    if failed:
+        print(f"⚠️ Notification batch: {failed}/{total} emails failed and will not be retried")
 
     return {
         "total_users": total,
@@ -0,0 +1,103 @@
+"""パスワードハッシュ専用のワーカープール
+
+argon2はCPU負荷が高いため、FastAPI共有のスレッドプールでは実行せず、
+ワーカー数と待ち行列の長さを制限した専用プールで実行する。
+待ち行列が満杯のときは即座にPoolSaturatedErrorを送出し（バックプレッシャー）、
+ログイン集中時でも他のエンドポイントのスレッドを使い切らないようにする。
+呼び出し元（同期エンドポイント）が待つスレッドも実行枠 + 待ち行列の数までに限られる。
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolSaturatedError(Exception):
+    """プールの実行枠・待ち行列がすべて埋まっている"""
+
+
+class HashPool:
+    """ワーカー数と待ち行列長を制限したスレッドプール
+
+    argon2-cffiはハッシュ計算中にGILを解放するため、プロセスではなくスレッドで並列化できる。
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        # 実行中 + 待機中の合計を制限する
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._run_time_total = 0.0
+        self._run_time_max = 0.0
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        """fn(*args)をプールに投入してFutureを返す（実行枠・待ち行列が埋まっていれば拒否する）"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturatedError("password hash pool is saturated")
+
+        submitted_at = time.perf_counter()
+
+        def task() -> T:
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started_at - submitted_at, time.perf_counter() - started_at)
+                # 結果がFutureに入る前に枠を返す（run()の戻り時点でin_flightが減っているように）
+                self._release()
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(task)
+        except BaseException:
+            self._release()
+            raise
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """fn(*args)をプールで実行して結果を返す（呼び出し元のスレッドは完了まで待つ）"""
+        return self.submit(fn, *args).result()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, queue_wait: float, run_time: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._run_time_total += run_time
+            self._run_time_max = max(self._run_time_max, run_time)
+
+    def stats(self) -> dict[str, float | int]:
+        """プールの統計情報（時間はミリ秒）"""
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": self._queue_wait_total / completed * 1000,
+                "queue_wait_max_ms": self._queue_wait_max * 1000,
+                "hash_time_avg_ms": self._run_time_total / completed * 1000,
+                "hash_time_max_ms": self._run_time_max * 1000,
+            }
@@ -1,10 +1,15 @@
 # モデルをインポートしてBaseに登録
 import models  # noqa: F401
 from database import Base, engine
+from migrate import upgrade
 
 # テーブル作成
 Base.metadata.create_all(bind=engine)
 
+# マイグレーションを適用済みにする（各マイグレーションは既存のスキーマでは何もしない）
+upgrade(engine)
+
 print("テーブルを作成しました:")
 print("- users")
 print("- challenges")
+print("- revoked_tokens")
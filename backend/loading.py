@@ -0,0 +1,63 @@
+"""リレーションのローディングプロファイル
+
+モデルのリレーションは自動ロードしない。各クエリは必要なプロファイルを
+``.options(*PROFILE)`` で明示し、プロファイル外のリレーションへのアクセスは
+raiseloadにより例外となる（暗黙のN+1クエリを防ぐ）。
+更新しない読み取りは ``select(*CHALLENGE_COLUMNS)`` のようにカラムだけを選択する。
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, joinedload, raiseload, selectinload
+
+from models import Challenge, User
+
+# ユーザーのカラムのみ（認証・/auth/meなど）
+USER_ONLY = (raiseload("*"),)
+
+# ユーザーと全挑戦記録（挑戦記録が本当に必要な場合のみ使用）
+USER_WITH_CHALLENGES = (selectinload(User.challenges), raiseload("*"))
+
+# 挑戦記録のカラムのみ（一覧・詳細・統計など）
+CHALLENGE_ONLY = (raiseload("*"),)
+
+# 挑戦記録と所有ユーザー
+CHALLENGE_WITH_USER = (joinedload(Challenge.user), raiseload("*"))
+
+# 読み取り専用の挑戦記録のカラム射影（一覧・詳細）
+# select(*CHALLENGE_COLUMNS)は軽量なRowを返し、ORMインスタンス・identity mapを経由しない
+CHALLENGE_COLUMNS = (
+    Challenge.id,
+    Challenge.user_id,
+    Challenge.content,
+    Challenge.score,
+    Challenge.created_at,
+)
+
+
+class ImplicitLazyLoadError(RuntimeError):
+    """strictモードで暗黙の遅延ロードが発生した場合の例外"""
+
+
+def _forbid_lazy_load(orm_execute_state: ORMExecuteState) -> None:
+    """暗黙の遅延ロード（属性アクセスによるSELECT）を検出して例外にする"""
+    # UPDATE/DELETEなどSELECT以外の文はlazy_loaded_fromを参照できない
+    if not orm_execute_state.is_relationship_load:
+        return
+    state = orm_execute_state.lazy_loaded_from
+    if state is not None:
+        raise ImplicitLazyLoadError(
+            f"Implicit lazy load on {state.class_.__name__} detected. "
+            "Specify a loading profile from loading.py on the query."
+        )
+
+
+def enable_strict_loading(target) -> None:
+    """Session/sessionmakerに対して暗黙の遅延ロードを禁止する（テスト・開発用）"""
+    if not event.contains(target, "do_orm_execute", _forbid_lazy_load):
+        event.listen(target, "do_orm_execute", _forbid_lazy_load)
+
+
+def disable_strict_loading(target) -> None:
+    """enable_strict_loadingで登録したチェックを解除する"""
+    if event.contains(target, "do_orm_execute", _forbid_lazy_load):
+        event.remove(target, "do_orm_execute", _forbid_lazy_load)
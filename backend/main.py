@@ -1,41 +1,65 @@
+import base64
+import binascii
 import os
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from uuid import UUID
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import case, delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from auth import create_access_token, get_current_user, get_password_hash, verify_password
+import loading
+import metrics
+import revocation
+import stats_rollup
+from auth import (
+    create_access_token,
+    get_current_user,
+    get_current_user_id,
+    get_password_hash,
+    oauth2_scheme,
+    rehash_password_if_needed,
+    revoke_token,
+    verify_password,
+)
 
 # 必要なモジュール
-from database import get_db
+from database import SessionLocal, dialect_insert, get_db
 from email_service import send_notification_batch
-from models import Challenge, User
+from models import Challenge, ChallengeDailyStats, User
+from notification_schedule import next_notification_at
 from schemas import (
     CalendarResponse,
     ChallengeCreate,
     ChallengeResponse,
     ChallengeUpdate,
+    DashboardResponse,
     DayStats,
     NotificationBatchResponse,
     NotificationTestResponse,
+    PaginatedResponse,
     PeriodStats,
+    ScoreDistributionResponse,
     StatsSummaryResponse,
     SuccessResponse,
+    TrendResponse,
     UserCreate,
     UserResponse,
     UserUpdate,
     UserWithToken,
+    challenge_list_adapter,
 )
-
-# 日本標準時（JST: UTC+9）のタイムゾーン定義
-jst = timezone(timedelta(hours=9))
+from serialization import ModelResponse, revalidated_response
 
 app = FastAPI(title="Challenge Bank")
 
+# 開発時: STRICT_LOADING=1 で暗黙の遅延ロードを例外にする（ローディングプロファイル漏れの検出）
+if os.getenv("STRICT_LOADING") == "1":
+    loading.enable_strict_loading(SessionLocal)
+
 # CORS設定（環境変数から許可オリジンを取得）
 ALLOWED_ORIGINS = os.getenv(
     "ALLOWED_ORIGINS",
@@ -66,6 +90,17 @@ def verify_api_key(x_api_key: str = Header(None)):
     return True
 
 
+# ====== メトリクス ======
+@app.get("/metrics", status_code=status.HTTP_200_OK, response_model=SuccessResponse)
+def get_metrics(_: bool = Depends(verify_api_key)):
+    """内部API: プロセス内キャッシュ等のメトリクスを取得"""
+    return {
+        "success": True,
+        "data": metrics.collect(),
+        "message": "Metrics retrieved successfully.",
+    }
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """HTTPExceptionのカスタムハンドラー"""
@@ -75,6 +110,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         401: "UNAUTHORIZED",
         404: "NOT_FOUND",
         422: "VALIDATION_ERROR",
+        503: "SERVICE_UNAVAILABLE",
     }
 
     return JSONResponse(
@@ -87,6 +123,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
                 "details": None,
             },
         },
+        headers=exc.headers,  # Retry-After, WWW-Authenticateなどを維持する
     )
 
 
@@ -98,11 +135,9 @@ def register_user(
 ):
     """新規ユーザーを登録するエンドポイント"""
 
-    # 1. メールアドレスの重複チェック
-    exisiting_user = db.query(User).filter(User.email == user_data.email).first()
-
-    if exisiting_user:
-        # 400 bad requestを返す
+    # 1. 既存メールアドレスの確認（インデックスを引くだけの軽い問い合わせで、重複登録のために
+    # argon2のハッシュ計算を行わない）
+    if db.scalar(select(User.id).where(User.email == user_data.email)) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="A user with this email already exists."
         )
@@ -110,35 +145,43 @@ def register_user(
     # 2. パスワードのハッシュ化
     hashed_password = get_password_hash(user_data.password)
 
-    # 3. 新機ユーザーをDBに追加
-    new_user = User(
-        email=user_data.email,
-        hashed_password=hashed_password,
-        notification_time=user_data.notification_time,
-    )
-
-    # セッションに追加(まだDBに保存されていない)
-    db.add(new_user)
-
+    # 3. 新規ユーザーをDBに追加（INSERT ... ON CONFLICT DO NOTHING RETURNING の1文）
+    # 確認後に同じメールアドレスで同時に登録された場合は行が返らない
+    upsert = dialect_insert(db)
     try:
-        db.commit()
-
-        db.refresh(new_user)  # 新規ユーザーの情報を取得(id, created_atなど)
+        new_user = db.scalars(
+            upsert(User)
+            .values(
+                email=user_data.email,
+                hashed_password=hashed_password,
+                notification_time=user_data.notification_time,
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        ).one_or_none()
     except IntegrityError:
-        # UNIQUE制約違反などのDB制約エラーが出た場合
+        # UNIQUE制約以外のDB制約エラーが出た場合
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Database integrity error occurred during user registration.",
         )
 
-    # 4. レスポンスを返す
+    if new_user is None:
+        db.rollback()
+        # 400 bad requestを返す
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="A user with this email already exists."
+        )
+
+    # 4. レスポンスを作成してからコミットする（コミット後に属性を読むと再SELECTされるため）
     user_response = UserResponse.model_validate(new_user)
 
     # トークン生成
-    access_token = create_access_token(data={"sub": new_user.email})
+    access_token = create_access_token(data={"sub": str(new_user.id)})
 
     user_response = UserWithToken(**user_response.model_dump(), access_token=access_token)
+    db.commit()
 
     return {
         "success": True,
@@ -151,7 +194,9 @@ def register_user(
 @app.post("/auth/login", response_model=SuccessResponse, status_code=status.HTTP_200_OK)
 def login_user(request_data: UserCreate, db: Session = Depends(get_db)):
     # 1. ユーザーの存在確認
-    user = db.query(User).filter(User.email == request_data.email).first()
+    user = (
+        db.query(User).options(*loading.USER_ONLY).filter(User.email == request_data.email).first()
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password."
@@ -163,8 +208,12 @@ def login_user(request_data: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password."
         )
 
-    # 3. トークン生成
-    access_token = create_access_token(data={"sub": user.email})
+    # 3. ハッシュのパラメータが変わっていれば透過的に再ハッシュ
+    if rehash_password_if_needed(user, request_data.password):
+        db.commit()
+
+    # 4. トークン生成
+    access_token = create_access_token(data={"sub": str(user.id)})
 
     user_response = UserWithToken(
         **UserResponse.model_validate(user).model_dump(), access_token=access_token
@@ -194,16 +243,26 @@ def update_me(
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの情報を更新するエンドポイント"""
-    # notification_time, is_notification_setup_completedを更新可能
+    # notification_time, is_notification_setup_completed, timezoneを更新可能
     if user_data.notification_time is not None:
         current_user.notification_time = user_data.notification_time
 
     if user_data.is_notification_setup_completed is not None:
         current_user.is_notification_setup_completed = user_data.is_notification_setup_completed
 
+    # 以降に作成する挑戦記録の日付の区切りに使う（作成済みの記録の日付は変わらない）
+    if user_data.timezone is not None:
+        current_user.timezone = user_data.timezone
+
+    # 通知時刻・タイムゾーンが変わったら、次の通知の送信時刻を計算し直す
+    if user_data.notification_time is not None or user_data.timezone is not None:
+        current_user.next_notification_at = next_notification_at(
+            current_user.notification_time, current_user.timezone, datetime.utcnow()
+        )
+
     try:
-        db.commit()
-        db.refresh(current_user)
+        # UPDATE 1文のみ発行する（ユーザーは読み込み済みのため、変更後の値はメモリ上にある）
+        db.flush()
     except IntegrityError:
         db.rollback()
         raise HTTPException(
@@ -211,7 +270,10 @@ def update_me(
             detail="Database integrity error occurred during user update.",
         )
 
+    # コミット後に属性を読むと再SELECTされるため、レスポンスを先に作る
     user_response = UserResponse.model_validate(current_user)
+    # コミット時にauth.user_cacheのこのユーザーのエントリは無効化される
+    db.commit()
 
     return {
         "success": True,
@@ -222,14 +284,18 @@ def update_me(
 
 # ログアウト
 @app.post("/auth/logout", response_model=SuccessResponse, status_code=status.HTTP_200_OK)
-def logout_user(current_user: User = Depends(get_current_user)):
-    """ログアウトエンドポイント（クライアント側でトークンを削除する方式）"""
-    # JWTはステートレスなので、サーバー側では何もしない
-    # クライアント側でトークンを削除することでログアウトを実現
+def logout_user(
+    token: str = Depends(oauth2_scheme),
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """ログアウトエンドポイント（トークンを失効させる）"""
+    # トークンのjtiを失効リストに登録し、以降このトークンでは認証できなくする
+    revoke_token(db, token)
     return {
         "success": True,
         "data": None,
-        "message": "Logout successful. Please remove the token from the client.",
+        "message": "Logout successful. The token has been revoked.",
     }
 
 
@@ -237,7 +303,11 @@ def logout_user(current_user: User = Depends(get_current_user)):
 
 
 # 挑戦記録を作成
-@app.post("/challenges", status_code=status.HTTP_201_CREATED, response_model=SuccessResponse)
+@app.post(
+    "/challenges",
+    status_code=status.HTTP_201_CREATED,
+    response_model=SuccessResponse[ChallengeResponse],
+)
 def create_challenge(
     challenge_data: ChallengeCreate,
     current_user: User = Depends(get_current_user),
@@ -245,84 +315,130 @@ def create_challenge(
 ):
     """新しい挑戦記録を作成するエンドポイント"""
 
-    # 新しい挑戦記録を作成
-    new_challenge = Challenge(
-        user_id=current_user.id,
-        content=challenge_data.content,
-        score=challenge_data.score,
+    # 新しい挑戦記録を作成（日付はユーザーのタイムゾーンで作成時に確定させる）
+    # INSERT ... RETURNINGの1文で作成した行を受け取る（コミット後のrefreshは不要）
+    created_at = datetime.utcnow()
+    new_challenge = db.scalars(
+        insert(Challenge)
+        .values(
+            user_id=current_user.id,
+            content=challenge_data.content,
+            score=challenge_data.score,
+            created_at=created_at,
+            local_date=stats_rollup.local_date_of(
+                created_at, stats_rollup.user_timezone(current_user.timezone)
+            ),
+        )
+        .returning(Challenge)
+    ).one()
+
+    # 日別集計も同じトランザクションで更新する
+    stats_rollup.apply_delta(
+        db,
+        current_user.id,
+        new_challenge.local_date,
+        1,
+        new_challenge.score,
     )
 
-    db.add(new_challenge)
+    # レスポンスを作る（created_atはJSTで出力）。コミット後に属性を読むと再SELECTされるため先に作る
+    response = SuccessResponse[ChallengeResponse](
+        data=ChallengeResponse.model_validate(new_challenge),
+        message="Challenge record created successfully.",
+    )
     db.commit()
-    db.refresh(new_challenge)
 
-    # レスポンスを返す（UTC→JST変換）
-    challenge_dict = ChallengeResponse.model_validate(new_challenge).model_dump()
-    # UTC naive datetime → UTC aware → JST aware に変換
-    created_at_jst = new_challenge.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
-    challenge_dict["created_at"] = created_at_jst.isoformat()
+    return ModelResponse(response, status_code=status.HTTP_201_CREATED)
 
-    return {
-        "success": True,
-        "data": challenge_dict,
-        "message": "Challenge record created successfully.",
-    }
+
+def _encode_cursor(challenge) -> str:
+    """一覧の続きを取得するための不透明なカーソル（created_at, id）を作る"""
+    raw = f"{challenge.created_at.isoformat()}|{challenge.id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """カーソルを(created_at, id)に戻す。不正な値は400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, challenge_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(challenge_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
 
 
 # 挑戦記録一覧を取得
-@app.get("/challenges", status_code=status.HTTP_200_OK, response_model=SuccessResponse)
+@app.get(
+    "/challenges",
+    status_code=status.HTTP_200_OK,
+    response_model=PaginatedResponse[list[ChallengeResponse]],
+)
 def get_challenges(
-    current_user: User = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
     limit: int = 20,
     offset: int = 0,
+    cursor: str | None = None,
 ):
-    """認証済みユーザーの挑戦記録一覧を取得するエンドポイント"""
+    """認証済みユーザーの挑戦記録一覧を取得するエンドポイント
+
+    cursorを指定すると、前ページの最後の記録より古いものを返す（キーセットページネーション）。
+    ページの深さに関係なく(user_id, created_at)インデックスから直接読み始められる。
+    offsetは旧方式として残している。
+    """
 
     # 自分の挑戦記録のみを取得（他のユーザーの記録は見えない）
-    # 新しい順（作成日時の降順）でソート
-    challenges = (
-        db.query(Challenge)
-        .filter(Challenge.user_id == current_user.id)
-        .order_by(Challenge.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    # 新しい順（作成日時の降順、同時刻はIDの降順）でソート
+    # 必要なカラムだけを選択し、ORMインスタンスを作らずに行のまま読む
+    query = (
+        select(*loading.CHALLENGE_COLUMNS)
+        .where(Challenge.user_id == current_user_id)
+        .order_by(Challenge.created_at.desc(), Challenge.id.desc())
     )
+    if cursor is not None:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.where(
+            tuple_(Challenge.created_at, Challenge.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset(offset)
 
-    # レスポンスを返す（UTC→JST変換）
-    challenges_response = []
-    for challenge in challenges:
-        challenge_dict = ChallengeResponse.model_validate(challenge).model_dump()
-        # UTC naive datetime → UTC aware → JST aware に変換
-        created_at_jst = challenge.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
-        challenge_dict["created_at"] = created_at_jst.isoformat()
-        challenges_response.append(challenge_dict)
+    challenges = db.execute(query.limit(limit)).all()
 
-    return {
-        "success": True,
-        "data": challenges_response,
-        "message": "Challenge records retrieved successfully.",
-    }
+    # ページが埋まっていれば続きがある可能性がある
+    next_cursor = (
+        _encode_cursor(challenges[-1]) if challenges and len(challenges) == limit else None
+    )
+
+    # 行をまとめて1回で検証し、JSONに直接シリアライズして返す（created_atはJSTで出力される）
+    return ModelResponse(
+        PaginatedResponse[list[ChallengeResponse]](
+            data=challenge_list_adapter.validate_python(challenges, from_attributes=True),
+            message="Challenge records retrieved successfully.",
+            next_cursor=next_cursor,
+        )
+    )
 
 
 # 挑戦記録の詳細を取得
 @app.get(
-    "/challenges/{challenge_id}", status_code=status.HTTP_200_OK, response_model=SuccessResponse
+    "/challenges/{challenge_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[ChallengeResponse],
 )
 def get_challenge_by_id(
     challenge_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの特定の挑戦記録を取得するエンドポイント"""
 
-    # 自分の挑戦記録のみ取得（他のユーザーの記録は404）
-    challenge = (
-        db.query(Challenge)
-        .filter(Challenge.id == challenge_id, Challenge.user_id == current_user.id)
-        .first()
-    )
+    # 自分の挑戦記録のみ取得（他のユーザーの記録は404）。カラムだけを行として読む
+    challenge = db.execute(
+        select(*loading.CHALLENGE_COLUMNS).where(
+            Challenge.id == challenge_id, Challenge.user_id == current_user_id
+        )
+    ).first()
 
     if not challenge:
         raise HTTPException(
@@ -330,64 +446,65 @@ def get_challenge_by_id(
             detail="Challenge record not found.",
         )
 
-    # レスポンスを返す（UTC→JST変換）
-    challenge_dict = ChallengeResponse.model_validate(challenge).model_dump()
-    # UTC naive datetime → UTC aware → JST aware に変換
-    created_at_jst = challenge.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
-    challenge_dict["created_at"] = created_at_jst.isoformat()
-
-    return {
-        "success": True,
-        "data": challenge_dict,
-        "message": "Challenge record retrieved successfully.",
-    }
+    # レスポンスを返す（created_atはJSTで出力される）
+    return ModelResponse(
+        SuccessResponse[ChallengeResponse](
+            data=ChallengeResponse.model_validate(challenge),
+            message="Challenge record retrieved successfully.",
+        )
+    )
 
 
 # 挑戦記録を更新
 @app.put(
-    "/challenges/{challenge_id}", status_code=status.HTTP_200_OK, response_model=SuccessResponse
+    "/challenges/{challenge_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[ChallengeResponse],
 )
 def update_challenge(
     challenge_id: UUID,
     challenge_data: ChallengeUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの特定の挑戦記録を更新するエンドポイント"""
 
-    # 自分の挑戦記録のみ取得（他のユーザーの記録は404）
-    challenge = (
-        db.query(Challenge)
-        .filter(Challenge.id == challenge_id, Challenge.user_id == current_user.id)
-        .first()
-    )
+    # 更新データ（Noneでないフィールドのみ更新）
+    values = challenge_data.model_dump(exclude_none=True)
+
+    # 自分の挑戦記録のみ対象（他のユーザーの記録は404）
+    owned = (Challenge.id == challenge_id, Challenge.user_id == current_user_id)
+    if not values:
+        challenge = db.execute(select(*loading.CHALLENGE_COLUMNS).where(*owned)).first()
+    else:
+        if "score" in values:
+            # スコアが変わった分だけ日別集計を更新する。挑戦記録の行をロックしてから変更前の
+            # スコアを読むため、挑戦記録の更新より先に同じトランザクションで行う
+            stats_rollup.apply_score_change(db, current_user_id, challenge_id, values["score"])
+        # UPDATE ... WHERE id=? AND user_id=? RETURNINGの1文で所有者の確認と更新を行う
+        challenge = db.scalars(
+            update(Challenge)
+            .where(*owned)
+            .values(**values)
+            .returning(Challenge)
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
 
     if not challenge:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Challenge record not found.",
         )
 
-    # 更新データを適用（Noneでないフィールドのみ更新）
-    if challenge_data.content is not None:
-        challenge.content = challenge_data.content
-    if challenge_data.score is not None:
-        challenge.score = challenge_data.score
-
+    # レスポンスを作る（created_atはJSTで出力）。コミット後に属性を読むと再SELECTされるため先に作る
+    response = SuccessResponse[ChallengeResponse](
+        data=ChallengeResponse.model_validate(challenge),
+        message="Challenge record updated successfully.",
+    )
     db.commit()
-    db.refresh(challenge)
-
-    # レスポンスを返す（UTC→JST変換）
-    challenge_dict = ChallengeResponse.model_validate(challenge).model_dump()
-    # UTC naive datetime → UTC aware → JST aware に変換
-    created_at_jst = challenge.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
-    challenge_dict["created_at"] = created_at_jst.isoformat()
 
-    return {
-        "success": True,
-        "data": challenge_dict,
-        "message": "Challenge record updated successfully.",
-    }
+    return ModelResponse(response)
 
 
 # 挑戦記録を削除
@@ -396,26 +513,28 @@ def update_challenge(
 )
 def delete_challenge(
     challenge_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの特定の挑戦記録を削除するエンドポイント"""
 
-    # 自分の挑戦記録のみ取得（他のユーザーの記録は404）
-    challenge = (
-        db.query(Challenge)
-        .filter(Challenge.id == challenge_id, Challenge.user_id == current_user.id)
-        .first()
-    )
+    # 自分の挑戦記録のみ削除（他のユーザーの記録は404）
+    # DELETE ... RETURNINGの1文で所有者の確認と削除を行い、集計に必要な値を受け取る
+    deleted = db.execute(
+        delete(Challenge)
+        .where(Challenge.id == challenge_id, Challenge.user_id == current_user_id)
+        .returning(Challenge.local_date, Challenge.score)
+        .execution_options(synchronize_session=False)
+    ).first()
 
-    if not challenge:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Challenge record not found.",
         )
 
-    # 削除実行
-    db.delete(challenge)
+    # 日別集計からも差し引く
+    stats_rollup.apply_delta(db, current_user_id, deleted.local_date, -1, -deleted.score)
     db.commit()
 
     return {
@@ -428,6 +547,48 @@ def delete_challenge(
 # ====== 統計エンドポイント ======
 
 
+def _period_stats(challenge_count: int, total_score: int) -> PeriodStats:
+    """件数と合計スコアから期間別の統計を作る"""
+    if challenge_count == 0:
+        return PeriodStats(challenge_count=0, total_score=0, average_score=0.0)
+    return PeriodStats(
+        challenge_count=challenge_count,
+        total_score=total_score,
+        average_score=total_score / challenge_count,
+    )
+
+
+def _stats_summary(db: Session, user: User) -> StatsSummaryResponse:
+    """今日・今週・全期間の統計を1回のクエリ（条件付き集計）で求める"""
+    # 今日の日付（ユーザーのタイムゾーン）
+    today = datetime.now(stats_rollup.user_timezone(user.timezone)).date()
+
+    # 今週の開始日（月曜日）
+    week_start = today - timedelta(days=today.weekday())
+
+    def conditional_sum(column, condition):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    is_today = ChallengeDailyStats.local_date >= today
+    is_this_week = ChallengeDailyStats.local_date >= week_start
+    row = db.execute(
+        select(
+            conditional_sum(ChallengeDailyStats.count, is_today),
+            conditional_sum(ChallengeDailyStats.score_sum, is_today),
+            conditional_sum(ChallengeDailyStats.count, is_this_week),
+            conditional_sum(ChallengeDailyStats.score_sum, is_this_week),
+            func.coalesce(func.sum(ChallengeDailyStats.count), 0),
+            func.coalesce(func.sum(ChallengeDailyStats.score_sum), 0),
+        ).where(ChallengeDailyStats.user_id == user.id)
+    ).one()
+
+    return StatsSummaryResponse(
+        today=_period_stats(row[0], row[1]),
+        this_week=_period_stats(row[2], row[3]),
+        all_time=_period_stats(row[4], row[5]),
+    )
+
+
 # 統計サマリーを取得
 @app.get("/stats/summary", status_code=status.HTTP_200_OK, response_model=SuccessResponse)
 def get_stats_summary(
@@ -435,57 +596,49 @@ def get_stats_summary(
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの統計サマリーを取得するエンドポイント"""
+    # 「今日」「今週」の区切りにユーザーのタイムゾーンを使う（ユーザーはauthのキャッシュから取得）
+    stats_response = _stats_summary(db, current_user)
 
-    # 現在の日本時間
-    now_jst = datetime.now(jst)
-
-    # 今日の開始日（日本時間の0時）
-    today_start_jst = now_jst.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # 今週の開始日（日本時間の月曜日0時）
-    week_start_jst = now_jst - timedelta(days=now_jst.weekday())
-    week_start_jst = week_start_jst.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # JSTをUTCに変換（DBと比較するため、tzinfo=Noneで取得）
-    today_start_utc = today_start_jst.astimezone(timezone.utc).replace(tzinfo=None)
-    week_start_utc = week_start_jst.astimezone(timezone.utc).replace(tzinfo=None)
-
-    # 自分の挑戦記録を取得
-    all_challenges = db.query(Challenge).filter(Challenge.user_id == current_user.id).all()
-
-    # 今日の挑戦記録（UTCで比較）
-    today_challenges = [f for f in all_challenges if f.created_at >= today_start_utc]
-
-    # 今週の挑戦記録（UTCで比較）
-    this_week_challenges = [f for f in all_challenges if f.created_at >= week_start_utc]
+    return {
+        "success": True,
+        "data": stats_response.model_dump(),
+        "message": "Statistics summary retrieved successfully.",
+    }
 
-    # ヘルパー関数: 期間別の統計を計算
-    def calculate_period_stats(challenges_list):
-        if not challenges_list:
-            return PeriodStats(challenge_count=0, total_score=0, average_score=0.0)
 
-        challenge_count = len(challenges_list)
-        total_score = sum(f.score for f in challenges_list)
-        average_score = total_score / challenge_count if challenge_count > 0 else 0.0
+def _calendar(db: Session, user_id: UUID, year: int, month: int) -> CalendarResponse:
+    """指定月の日別統計を日別集計（challenge_daily_stats）から求める"""
+    # 指定月の開始日と翌月の開始日（日本時間の日付）
+    month_start = date(year, month, 1)
+    next_month_start = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
 
-        return PeriodStats(
-            challenge_count=challenge_count, total_score=total_score, average_score=average_score
+    # 指定月の日別集計を取得（日付ごとに集計済み）
+    daily_stats = (
+        db.query(
+            ChallengeDailyStats.local_date, ChallengeDailyStats.count, ChallengeDailyStats.score_sum
         )
-
-    # 各期間の統計を計算
-    today_stats = calculate_period_stats(today_challenges)
-    this_week_stats = calculate_period_stats(this_week_challenges)
-    all_time_stats = calculate_period_stats(all_challenges)
-
-    stats_response = StatsSummaryResponse(
-        today=today_stats, this_week=this_week_stats, all_time=all_time_stats
+        .filter(
+            ChallengeDailyStats.user_id == user_id,
+            ChallengeDailyStats.local_date >= month_start,
+            ChallengeDailyStats.local_date < next_month_start,
+            ChallengeDailyStats.count > 0,
+        )
+        .order_by(ChallengeDailyStats.local_date)
+        .all()
     )
 
-    return {
-        "success": True,
-        "data": stats_response.model_dump(),
-        "message": "Statistics summary retrieved successfully.",
-    }
+    # 日別統計を作成
+    days_list = [
+        DayStats(
+            date=row.local_date.isoformat(),
+            challenge_count=row.count,
+            total_score=row.score_sum,
+            average_score=row.score_sum / row.count,
+        )
+        for row in daily_stats
+    ]
+
+    return CalendarResponse(year=year, month=month, days=days_list)
 
 
 # カレンダーデータを取得
@@ -493,7 +646,7 @@ def get_stats_summary(
 def get_calendar(
     year: int,
     month: int,
-    current_user: User = Depends(get_current_user),
+    current_user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """認証済みユーザーの指定月のカレンダーデータを取得するエンドポイント"""
@@ -505,64 +658,203 @@ def get_calendar(
             detail="Month must be between 1 and 12.",
         )
 
-    # 指定月の開始日（日本時間）
-    month_start_jst = datetime(year, month, 1, 0, 0, 0, tzinfo=jst)
+    calendar_response = _calendar(db, current_user_id, year, month)
 
-    # 指定月の終了日（翌月の1日0時 - 1秒）
-    if month == 12:
-        month_end_jst = datetime(year + 1, 1, 1, 0, 0, 0, tzinfo=jst)
-    else:
-        month_end_jst = datetime(year, month + 1, 1, 0, 0, 0, tzinfo=jst)
+    return {
+        "success": True,
+        "data": calendar_response.model_dump(),
+        "message": "Calendar data retrieved successfully.",
+    }
 
-    # JSTをUTCに変換（DBと比較するため）
-    month_start_utc = month_start_jst.astimezone(timezone.utc).replace(tzinfo=None)
-    month_end_utc = month_end_jst.astimezone(timezone.utc).replace(tzinfo=None)
 
-    # 指定月の挑戦記録を取得
-    challenges = (
-        db.query(Challenge)
-        .filter(
-            Challenge.user_id == current_user.id,
-            Challenge.created_at >= month_start_utc,
-            Challenge.created_at < month_end_utc,
+def _score_distribution(
+    db: Session, user_id: UUID, start_date: date | None, end_date: date | None
+) -> ScoreDistributionResponse:
+    """スコア（1〜5）ごとの件数をDB側のGROUP BYで求める
+
+    (user_id, local_date, score)のインデックスだけで集計でき、挑戦記録の本文は読まない。
+    """
+    query = (
+        select(Challenge.score, func.count())
+        .where(Challenge.user_id == user_id)
+        .group_by(Challenge.score)
+    )
+    if start_date is not None:
+        query = query.where(Challenge.local_date >= start_date)
+    if end_date is not None:
+        query = query.where(Challenge.local_date <= end_date)
+
+    counts = [0] * 5
+    for score, count in db.execute(query):
+        if 1 <= score <= 5:
+            counts[score - 1] = count
+
+    return ScoreDistributionResponse(
+        start_date=start_date, end_date=end_date, counts=counts, total=sum(counts)
+    )
+
+
+# スコア分布を取得
+@app.get(
+    "/stats/distribution",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[ScoreDistributionResponse],
+)
+def get_score_distribution(
+    request: Request,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """認証済みユーザーのスコア分布を取得するエンドポイント
+
+    start_date/end_date（YYYY-MM-DD、両端を含む）で期間を絞り込める。省略時は全期間。
+    ETagを返し、内容が変わっていなければ304を返す。
+    """
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must be on or before end_date.",
         )
-        .all()
+
+    distribution = _score_distribution(db, current_user_id, start_date, end_date)
+
+    return revalidated_response(
+        request,
+        SuccessResponse[ScoreDistributionResponse](
+            data=distribution, message="Score distribution retrieved successfully."
+        ),
     )
 
-    # 日付ごとにグループ化
-    from collections import defaultdict
-
-    daily_stats = defaultdict(list)
-
-    for challenge in challenges:
-        # UTC時刻をJSTに変換して日付を取得
-        created_at_jst = challenge.created_at.replace(tzinfo=timezone.utc).astimezone(jst)
-        date_str = created_at_jst.strftime("%Y-%m-%d")
-        daily_stats[date_str].append(challenge)
-
-    # 日別統計を計算
-    days_list = []
-    for date_str, challenges_on_day in sorted(daily_stats.items()):
-        challenge_count = len(challenges_on_day)
-        total_score = sum(f.score for f in challenges_on_day)
-        average_score = total_score / challenge_count if challenge_count > 0 else 0.0
-
-        days_list.append(
-            DayStats(
-                date=date_str,
-                challenge_count=challenge_count,
-                total_score=total_score,
-                average_score=average_score,
-            )
+
+# 日別推移で指定できる最大日数
+TREND_MAX_DAYS = 366
+
+
+def _trend(db: Session, user: User, days: int) -> TrendResponse:
+    """今日（ユーザーのタイムゾーン）までのdays日分の日別件数・合計スコアを求める
+
+    日付・スコアごとの件数はDB側のGROUP BYで集計し（インデックスのみで完結）、
+    記録のない日は0で埋めて連続した配列にする。
+    """
+    today = datetime.now(stats_rollup.user_timezone(user.timezone)).date()
+    start_date = today - timedelta(days=days - 1)
+
+    rows = db.execute(
+        select(Challenge.local_date, Challenge.score, func.count())
+        .where(
+            Challenge.user_id == user.id,
+            Challenge.local_date >= start_date,
+            Challenge.local_date <= today,
         )
+        .group_by(Challenge.local_date, Challenge.score)
+    )
 
-    calendar_response = CalendarResponse(year=year, month=month, days=days_list)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    score_counts = [[0] * 5 for _ in range(days)]
+    for local_date, score, count in rows:
+        if 1 <= score <= 5:
+            score_counts[(local_date - start_date).days][score - 1] = count
+
+    return TrendResponse(
+        dates=dates,
+        counts=[sum(day) for day in score_counts],
+        scores=[sum(n * (i + 1) for i, n in enumerate(day)) for day in score_counts],
+        score_counts=score_counts,
+    )
+
+
+# 日別推移を取得
+@app.get(
+    "/stats/trend",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[TrendResponse],
+)
+def get_trend(
+    request: Request,
+    days: int = 14,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """認証済みユーザーの直近days日分（今日を含む）の日別推移を取得するエンドポイント
+
+    ETagを返し、内容が変わっていなければ304を返す。
+    """
+    if days < 1 or days > TREND_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"days must be between 1 and {TREND_MAX_DAYS}.",
+        )
+
+    return revalidated_response(
+        request,
+        SuccessResponse[TrendResponse](
+            data=_trend(db, current_user, days), message="Trend retrieved successfully."
+        ),
+    )
 
-    return {
-        "success": True,
-        "data": calendar_response.model_dump(),
-        "message": "Calendar data retrieved successfully.",
-    }
+
+# ====== ダッシュボードエンドポイント ======
+
+# ダッシュボードの最近の挑戦記録の件数の上限
+DASHBOARD_RECENT_MAX = 50
+
+
+# ダッシュボードのデータを取得
+@app.get(
+    "/dashboard",
+    status_code=status.HTTP_200_OK,
+    response_model=SuccessResponse[DashboardResponse],
+)
+def get_dashboard(
+    request: Request,
+    recent_limit: int = 5,
+    trend_days: int = 7,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """ダッシュボードの表示に必要なデータを1回のリクエストで取得するエンドポイント
+
+    統計サマリー・最近の挑戦記録・今月のカレンダー・日別推移・スコア分布を返す。
+    認証とセッションは1回分で、各データはインデックスだけで完結する集計クエリ1本ずつで求める。
+    ETagを返し、内容が変わっていなければ304を返す。
+    """
+    if recent_limit < 1 or recent_limit > DASHBOARD_RECENT_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"recent_limit must be between 1 and {DASHBOARD_RECENT_MAX}.",
+        )
+    if trend_days < 1 or trend_days > TREND_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"trend_days must be between 1 and {TREND_MAX_DAYS}.",
+        )
+
+    # 今月はユーザーのタイムゾーンで決める
+    today = datetime.now(stats_rollup.user_timezone(current_user.timezone)).date()
+
+    recent = db.execute(
+        select(*loading.CHALLENGE_COLUMNS)
+        .where(Challenge.user_id == current_user.id)
+        .order_by(Challenge.created_at.desc(), Challenge.id.desc())
+        .limit(recent_limit)
+    ).all()
+
+    dashboard = DashboardResponse(
+        summary=_stats_summary(db, current_user),
+        recent_challenges=challenge_list_adapter.validate_python(recent, from_attributes=True),
+        calendar=_calendar(db, current_user.id, today.year, today.month),
+        trend=_trend(db, current_user, trend_days),
+        distribution=_score_distribution(db, current_user.id, None, None),
+    )
+
+    return revalidated_response(
+        request,
+        SuccessResponse[DashboardResponse](
+            data=dashboard, message="Dashboard retrieved successfully."
+        ),
+    )
 
 
 # ====== 通知エンドポイント ======
@@ -575,8 +867,17 @@ def send_notifications(
     db: Session = Depends(get_db),
     _: bool = Depends(verify_api_key),
 ):
-    """Lambda内部API: 現在のJST時刻に対応するユーザーにメール通知を送信"""
+    """Lambda内部API: 現在のJST時刻に対応するユーザーにメール通知を送信
+
+    定期実行のついでに、期限切れの失効済みトークンの行も削除する（認証のリクエストでは削除しない）。
+    """
     result = send_notification_batch(db)
+    try:
+        revocation.purge_expired(db)
+    except SQLAlchemyError as e:
+        # 削除できなくても次回の定期実行で消えるため、通知の結果は返す
+        db.rollback()
+        print(f"⚠️ Purging expired revoked tokens failed: {type(e).__name__}: {str(e)}")
     return {
         "success": True,
         "data": result,
@@ -594,7 +895,7 @@ def send_test_notification(
     """テスト用: 認証済みユーザーにテストメールを送信"""
     from email_service import get_weekly_stats, send_notification_email
 
-    stats = get_weekly_stats(db, current_user.id)
+    stats = get_weekly_stats(db, current_user.id, current_user.timezone)
     success = send_notification_email(current_user, stats)
 
     if not success:
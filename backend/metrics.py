@@ -0,0 +1,20 @@
+"""プロセス内メトリクスの登録と収集
+
+各モジュールは起動時にregister()で統計取得関数を登録し、
+GET /metrics がcollect()の結果を返す。
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """メトリクス提供関数を登録する（同名は上書き）"""
+    _providers[name] = provider
+
+
+def collect() -> dict[str, dict[str, Any]]:
+    """登録済みの全メトリクスを収集する"""
+    return {name: provider() for name, provider in _providers.items()}
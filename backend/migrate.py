@@ -0,0 +1,199 @@
+"""
+バージョン管理されたスキーママイグレーションの実行スクリプト
+
+migrations/ 配下の NNNN_説明.py を番号順に適用する。各モジュールは
+upgrade(conn) / downgrade(conn) を定義し、適用済みのバージョンは
+schema_migrations テーブルに記録する。
+
+インデックス作成のようにトランザクション外で実行する必要があるマイグレーションは
+モジュールで TRANSACTIONAL = False を宣言する（PostgreSQLの CREATE INDEX CONCURRENTLY 用）。
+
+使い方:
+    python migrate.py upgrade            # 未適用のマイグレーションをすべて適用
+    python migrate.py upgrade 0002       # 0002まで適用
+    python migrate.py downgrade 0001     # 0001より新しいものを取り消す（0000で全て）
+    python migrate.py status             # 適用状況を表示
+"""
+
+import argparse
+import importlib
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(4), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    version: str
+    name: str
+    module: ModuleType
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+
+def load_migrations() -> list[Migration]:
+    """migrations/ 配下のマイグレーションをバージョン順に読み込む"""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        module = importlib.import_module(f"migrations.{filename[:-3]}")
+        migrations.append(Migration(version=match.group(1), name=match.group(2), module=module))
+    return migrations
+
+
+def applied_versions(engine: Engine) -> set[str]:
+    """適用済みのバージョンを返す"""
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _run(engine: Engine, migration: Migration, direction: str) -> None:
+    """マイグレーションを1つ実行し、schema_migrationsを更新する"""
+    step = getattr(migration.module, direction)
+    if migration.transactional:
+        # スキーマ変更と記録を同じトランザクションで行う
+        with engine.begin() as conn:
+            step(conn)
+            _record(conn, migration, direction)
+    else:
+        # CREATE INDEX CONCURRENTLY はトランザクションブロック内で実行できない
+        with engine.connect() as conn:
+            step(conn.execution_options(isolation_level="AUTOCOMMIT"))
+        with engine.begin() as conn:
+            _record(conn, migration, direction)
+
+
+def _record(conn: Connection, migration: Migration, direction: str) -> None:
+    if direction == "upgrade":
+        conn.execute(
+            schema_migrations.insert().values(
+                version=migration.version, applied_at=datetime.utcnow()
+            )
+        )
+    else:
+        conn.execute(
+            schema_migrations.delete().where(schema_migrations.c.version == migration.version)
+        )
+
+
+def upgrade(engine: Engine, target: str | None = None) -> list[str]:
+    """targetまで（未指定なら最新まで）未適用のマイグレーションを適用する"""
+    applied = applied_versions(engine)
+    done = []
+    for migration in load_migrations():
+        if target is not None and migration.version > target:
+            break
+        if migration.version in applied:
+            continue
+        print(f"⬆️  {migration.version}_{migration.name}")
+        _run(engine, migration, "upgrade")
+        done.append(migration.version)
+    return done
+
+
+def downgrade(engine: Engine, target: str) -> list[str]:
+    """targetより新しい適用済みマイグレーションを新しい順に取り消す"""
+    applied = applied_versions(engine)
+    done = []
+    for migration in reversed(load_migrations()):
+        if migration.version <= target:
+            break
+        if migration.version not in applied:
+            continue
+        print(f"⬇️  {migration.version}_{migration.name}")
+        _run(engine, migration, "downgrade")
+        done.append(migration.version)
+    return done
+
+
+# ====== マイグレーション用ヘルパー ======
+
+
+def table_exists(conn: Connection, table: str) -> bool:
+    """テーブルが存在するか"""
+    return inspect(conn).has_table(table)
+
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    """カラムが存在するか"""
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def create_index(conn: Connection, name: str, table: str, columns: str) -> None:
+    """インデックスをオンラインで作成する（存在すれば何もしない）
+
+    PostgreSQLでは CREATE INDEX CONCURRENTLY を使い、書き込みをブロックしない。
+    columnsはSQLのカラム指定（例: "user_id, created_at DESC"）。
+    """
+    if conn.dialect.name == "postgresql":
+        # 失敗したCONCURRENTLY作成は無効なインデックスを残すため、作り直す
+        invalid = conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+    else:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def drop_index(conn: Connection, name: str) -> None:
+    """インデックスをオンラインで削除する（存在しなければ何もしない）"""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def main() -> None:
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="スキーママイグレーションを実行する")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser("upgrade", help="マイグレーションを適用する")
+    upgrade_parser.add_argument("target", nargs="?", default=None)
+    downgrade_parser = subparsers.add_parser("downgrade", help="マイグレーションを取り消す")
+    downgrade_parser.add_argument("target")
+    subparsers.add_parser("status", help="適用状況を表示する")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        done = upgrade(engine, args.target)
+        print(f"✅ {len(done)}件のマイグレーションを適用しました")
+    elif args.command == "downgrade":
+        done = downgrade(engine, args.target)
+        print(f"✅ {len(done)}件のマイグレーションを取り消しました")
+    else:
+        applied = applied_versions(engine)
+        for migration in load_migrations():
+            mark = "✅" if migration.version in applied else "📝"
+            print(f"{mark} {migration.version}_{migration.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""usersテーブルにis_notification_setup_completedカラムを追加する
+
+（旧 add_notification_setup_column.py）
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrate import column_exists
+
+
+def upgrade(conn: Connection) -> None:
+    if column_exists(conn, "users", "is_notification_setup_completed"):
+        return
+    conn.execute(
+        text(
+            "ALTER TABLE users "
+            "ADD COLUMN is_notification_setup_completed BOOLEAN NOT NULL DEFAULT FALSE"
+        )
+    )
+
+
+def downgrade(conn: Connection) -> None:
+    if column_exists(conn, "users", "is_notification_setup_completed"):
+        conn.execute(text("ALTER TABLE users DROP COLUMN is_notification_setup_completed"))
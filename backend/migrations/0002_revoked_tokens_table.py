@@ -0,0 +1,21 @@
+"""失効済みトークンのテーブル（revoked_tokens）を作成する"""
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+revoked_tokens = Table(
+    "revoked_tokens",
+    metadata,
+    Column("jti", String(64), primary_key=True),
+    Column("expires_at", DateTime, nullable=False, index=True),
+    Column("revoked_at", DateTime, nullable=False, index=True),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    revoked_tokens.create(conn, checkfirst=True)
+
+
+def downgrade(conn: Connection) -> None:
+    revoked_tokens.drop(conn, checkfirst=True)
@@ -0,0 +1,20 @@
+"""challengesに(user_id, created_at DESC)の複合インデックスを作成する
+
+一覧・統計・週次集計はすべてuser_idで絞り込み、created_atで並べ替え・範囲指定するため、
+このインデックスで該当ユーザーの行だけを新しい順に読める。
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrate import create_index, drop_index
+
+# PostgreSQLではCREATE INDEX CONCURRENTLYを使うため、トランザクション外で実行する
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, "ix_challenges_user_id_created_at", "challenges", "user_id, created_at DESC")
+
+
+def downgrade(conn: Connection) -> None:
+    drop_index(conn, "ix_challenges_user_id_created_at")
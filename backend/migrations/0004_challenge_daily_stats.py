@@ -0,0 +1,57 @@
+"""日別集計テーブル（challenge_daily_stats）を作成し、既存の挑戦記録から集計する"""
+
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, MetaData, Table, Uuid, select
+from sqlalchemy.engine import Connection
+
+from migrate import table_exists
+
+metadata = MetaData()
+Table("users", metadata, Column("id", Uuid, primary_key=True))
+challenges = Table(
+    "challenges",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("user_id", Uuid),
+    Column("score", Integer),
+    Column("created_at", DateTime),
+)
+challenge_daily_stats = Table(
+    "challenge_daily_stats",
+    metadata,
+    Column("user_id", Uuid, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("local_date", Date, primary_key=True),
+    Column("count", Integer, nullable=False),
+    Column("score_sum", Integer, nullable=False),
+)
+
+jst = timezone(timedelta(hours=9))
+
+
+def upgrade(conn: Connection) -> None:
+    if table_exists(conn, "challenge_daily_stats"):
+        return
+    challenge_daily_stats.create(conn)
+
+    # 既存の挑戦記録をJSTの日付ごとに集計する
+    totals = defaultdict(lambda: [0, 0])
+    rows = conn.execute(select(challenges.c.user_id, challenges.c.created_at, challenges.c.score))
+    for user_id, created_at, score in rows:
+        local_date = created_at.replace(tzinfo=timezone.utc).astimezone(jst).date()
+        total = totals[(user_id, local_date)]
+        total[0] += 1
+        total[1] += score
+    if totals:
+        conn.execute(
+            challenge_daily_stats.insert(),
+            [
+                {"user_id": u, "local_date": d, "count": count, "score_sum": score_sum}
+                for (u, d), (count, score_sum) in totals.items()
+            ],
+        )
+
+
+def downgrade(conn: Connection) -> None:
+    challenge_daily_stats.drop(conn, checkfirst=True)
@@ -0,0 +1,43 @@
+"""usersにtimezone、challengesにlocal_date（作成時のユーザーのタイムゾーンでの日付）を追加する
+
+既存ユーザーのtimezoneは既定値（Asia/Tokyo）になるため、既存の挑戦記録のlocal_dateは
+created_at（UTC）をJSTに変換した日付で埋める。
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrate import column_exists
+
+
+def _jst_date_sql(dialect_name: str) -> str:
+    """created_at（UTC naive）をJSTの日付に変換するSQL式"""
+    if dialect_name == "postgresql":
+        return "CAST(created_at + INTERVAL '9 hours' AS DATE)"
+    return "date(created_at, '+9 hours')"
+
+
+def upgrade(conn: Connection) -> None:
+    if not column_exists(conn, "users", "timezone"):
+        conn.execute(
+            text("ALTER TABLE users ADD COLUMN timezone VARCHAR(64) NOT NULL DEFAULT 'Asia/Tokyo'")
+        )
+
+    if not column_exists(conn, "challenges", "local_date"):
+        conn.execute(text("ALTER TABLE challenges ADD COLUMN local_date DATE"))
+    conn.execute(
+        text(
+            f"UPDATE challenges SET local_date = {_jst_date_sql(conn.dialect.name)} "
+            "WHERE local_date IS NULL"
+        )
+    )
+    # SQLiteはカラムの制約を変更できないため、NOT NULLはPostgreSQLのみ
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE challenges ALTER COLUMN local_date SET NOT NULL"))
+
+
+def downgrade(conn: Connection) -> None:
+    if column_exists(conn, "challenges", "local_date"):
+        conn.execute(text("ALTER TABLE challenges DROP COLUMN local_date"))
+    if column_exists(conn, "users", "timezone"):
+        conn.execute(text("ALTER TABLE users DROP COLUMN timezone"))
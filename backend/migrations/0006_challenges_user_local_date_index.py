@@ -0,0 +1,19 @@
+"""challengesに(user_id, local_date)の複合インデックスを作成する
+
+週次統計などの日・週単位の集計は、user_idとlocal_dateの範囲で絞り込む。
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrate import create_index, drop_index
+
+# PostgreSQLではCREATE INDEX CONCURRENTLYを使うため、トランザクション外で実行する
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, "ix_challenges_user_id_local_date", "challenges", "user_id, local_date")
+
+
+def downgrade(conn: Connection) -> None:
+    drop_index(conn, "ix_challenges_user_id_local_date")
@@ -0,0 +1,25 @@
+"""challengesの(user_id, local_date)インデックスを(user_id, local_date, score)に置き換える
+
+スコア分布・日別推移の集計はuser_id・local_date・scoreしか参照しないため、
+scoreを含めるとテーブル本体を読まずにインデックスだけで集計できる。
+先頭のカラムが同じため、旧インデックスは新しいインデックスで代替できる。
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrate import create_index, drop_index
+
+# PostgreSQLではCREATE INDEX CONCURRENTLYを使うため、トランザクション外で実行する
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(
+        conn, "ix_challenges_user_id_local_date_score", "challenges", "user_id, local_date, score"
+    )
+    drop_index(conn, "ix_challenges_user_id_local_date")
+
+
+def downgrade(conn: Connection) -> None:
+    create_index(conn, "ix_challenges_user_id_local_date", "challenges", "user_id, local_date")
+    drop_index(conn, "ix_challenges_user_id_local_date_score")
@@ -0,0 +1,44 @@
+"""usersに次の通知の送信時刻（UTC）のnext_notification_atを追加する
+
+通知バッチはnotification_time（HH:MM）の前方一致ではなく、next_notification_atが
+現在時刻以前のユーザーを選ぶ。既存ユーザーはnotification_timeとtimezoneから
+次の送信時刻を計算して埋める（タイムゾーンごとの換算が必要なためPythonで計算する）。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrate import column_exists
+from notification_schedule import next_notification_at
+
+
+def upgrade(conn: Connection) -> None:
+    if not column_exists(conn, "users", "next_notification_at"):
+        conn.execute(text("ALTER TABLE users ADD COLUMN next_notification_at TIMESTAMP"))
+
+    now = datetime.utcnow()
+    rows = conn.execute(
+        text(
+            "SELECT id, notification_time, timezone FROM users "
+            "WHERE notification_time IS NOT NULL AND next_notification_at IS NULL"
+        )
+    ).all()
+    params = [
+        {
+            "id": row.id,
+            "next_notification_at": next_notification_at(row.notification_time, row.timezone, now),
+        }
+        for row in rows
+    ]
+    if params:
+        conn.execute(
+            text("UPDATE users SET next_notification_at = :next_notification_at WHERE id = :id"),
+            params,
+        )
+
+
+def downgrade(conn: Connection) -> None:
+    if column_exists(conn, "users", "next_notification_at"):
+        conn.execute(text("ALTER TABLE users DROP COLUMN next_notification_at"))
@@ -0,0 +1,19 @@
+"""usersのnext_notification_atにインデックスを作成する
+
+通知バッチは送信時刻を過ぎたユーザー（next_notification_at <= 現在時刻）を範囲検索で選ぶ。
+"""
+
+from sqlalchemy.engine import Connection
+
+from migrate import create_index, drop_index
+
+# PostgreSQLではCREATE INDEX CONCURRENTLYを使うため、トランザクション外で実行する
+TRANSACTIONAL = False
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, "ix_users_next_notification_at", "users", "next_notification_at")
+
+
+def downgrade(conn: Connection) -> None:
+    drop_index(conn, "ix_users_next_notification_at")
@@ -1,14 +1,49 @@
+import os
+import time
 import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, Uuid
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
 
+# ユーザーのタイムゾーンの初期値（IANAのタイムゾーン名）
+DEFAULT_TIMEZONE = "Asia/Tokyo"
+
 
 def generate_uuid() -> uuid.UUID:
-    return uuid.uuid4()
+    """UUIDv7（RFC 9562）を生成する
+
+    先頭48bitがUnixミリ秒のため、新しい行は主キーのB-treeの末尾に追加される
+    （uuid4のようにランダムな位置へ挿入されず、ページ分割やインデックスの肥大化を防ぐ）。
+    既存のuuid4の行とは同じUuid型のまま共存できる。
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # バージョン7
+    value |= ((rand >> 62) & 0xFFF) << 64  # rand_a（12bit）
+    value |= 0b10 << 62  # バリアント（RFC 9562）
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF  # rand_b（62bit）
+    return uuid.UUID(int=value)
+
+
+def _default_local_date(context) -> date:
+    """local_date未指定で挿入された挑戦記録は、created_atを既定のタイムゾーン（JST）の日付にする"""
+    created_at = context.get_current_parameters().get("created_at") or datetime.utcnow()
+    return (created_at + timedelta(hours=9)).date()  # JST = UTC+9
+
+
+def _default_next_notification_at(context) -> datetime | None:
+    """挿入時のnotification_time・timezoneから、次の通知の送信時刻（UTC）を求める"""
+    # notification_scheduleはstats_rollup経由でこのモジュールを読み込むため、ここで読み込む
+    from notification_schedule import next_notification_at
+
+    params = context.get_current_parameters()
+    return next_notification_at(
+        params.get("notification_time"), params.get("timezone"), datetime.utcnow()
+    )
 
 
 class User(Base):
@@ -24,19 +59,32 @@ class User(Base):
     is_notification_setup_completed: Mapped[bool] = mapped_column(
         Boolean, default=False, nullable=False
     )  # 通知設定完了フラグ
+    timezone: Mapped[str] = mapped_column(
+        String(64), default=DEFAULT_TIMEZONE, server_default=DEFAULT_TIMEZONE, nullable=False
+    )  # 日付の区切りに使うタイムゾーン（IANA名）
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.utcnow(), nullable=False
     )
+    # 次に通知を送る時刻（UTC）。notification_time・timezoneの変更時と送信前に更新する
+    next_notification_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=_default_next_notification_at, nullable=True
+    )
 
-    # リレーション
+    # リレーション（自動ロードはしない。必要なエンドポイントがloading.pyのプロファイルで明示する）
+    # 削除時はDBのON DELETE CASCADEに任せ、挑戦記録を読み込まない
     challenges: Mapped[list["Challenge"]] = relationship(
-        "Challenge", back_populates="user", cascade="all, delete-orphan", lazy="selectin"
+        "Challenge", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email})>"
 
 
+# 通知バッチは送信時刻を過ぎたユーザーを範囲検索で選ぶ
+# （既存DBへの作成は migrations/0009_users_next_notification_at_index.py）
+Index("ix_users_next_notification_at", User.next_notification_at)
+
+
 class Challenge(Base):
     __tablename__ = "challenges"
 
@@ -49,12 +97,65 @@ class Challenge(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=lambda: datetime.utcnow(), nullable=False
     )
+    # 作成時点のユーザーのタイムゾーンでの日付。統計の日・週の区切りはこのカラムで行う
+    local_date: Mapped[date] = mapped_column(Date, default=_default_local_date, nullable=False)
 
     # リレーション（型ヒント付き）
-    user: Mapped["User"] = relationship(
-        back_populates="challenges",
-        lazy="joined",  # Challengeを取得時にUserも一緒に取得
-    )
+    # Userは自動ロードしない（必要な場合はloading.CHALLENGE_WITH_USERを指定する）
+    user: Mapped["User"] = relationship(back_populates="challenges")
 
     def __repr__(self) -> str:
         return f"<Challenge(id={self.id}, user_id={self.user_id}, score={self.score})>"
+
+
+# 一覧・統計はuser_idで絞り込みcreated_atの降順で読むため複合インデックスを張る
+# （既存DBへの作成は migrations/0003_challenges_user_created_index.py）
+Index("ix_challenges_user_id_created_at", Challenge.user_id, Challenge.created_at.desc())
+# 日・週単位の集計はuser_idとlocal_dateの範囲で絞り込む。scoreも含め、スコア分布などの
+# 件数・スコアの集計をテーブルを読まずにインデックスだけで行えるようにする
+# （既存DBへの作成は migrations/0007_challenges_local_date_score_index.py）
+Index(
+    "ix_challenges_user_id_local_date_score",
+    Challenge.user_id,
+    Challenge.local_date,
+    Challenge.score,
+)
+
+
+class ChallengeDailyStats(Base):
+    """ユーザー・日付（JST）ごとの挑戦記録の集計（統計用のロールアップ）
+
+    挑戦記録の作成・スコア更新・削除と同じトランザクションで更新する（stats_rollup.py）
+    """
+
+    __tablename__ = "challenge_daily_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    local_date: Mapped[date] = mapped_column(Date, primary_key=True)  # JSTの日付
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ChallengeDailyStats(user_id={self.user_id}, local_date={self.local_date}, "
+            f"count={self.count}, score_sum={self.score_sum})>"
+        )
+
+
+class RevokedToken(Base):
+    """失効済み（ログアウト済み）トークン"""
+
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)  # トークンID
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )  # トークン自体の有効期限（UTC）。過ぎたら行を削除できる
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.utcnow(), nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<RevokedToken(jti={self.jti}, expires_at={self.expires_at})>"
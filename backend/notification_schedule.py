@@ -0,0 +1,35 @@
+"""通知メールの送信スケジュール
+
+ユーザーの通知時刻（notification_time。ユーザーのタイムゾーンでのHH:MM）から、次に送信する
+UTC時刻（users.next_notification_at）を求める。通知バッチはnext_notification_atが現在時刻
+以前のユーザーをインデックスの範囲検索で選び、送信前に次の時刻へ進めて確保する。
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+import stats_rollup
+
+
+def next_notification_at(
+    notification_time: str | None, tz_name: str | None, after: datetime
+) -> datetime | None:
+    """after（UTC naive）より後で、ユーザーのタイムゾーンでnotification_timeになる最初の時刻を返す
+
+    戻り値はUTC naive。notification_timeがNone（通知しない）ならNone。
+    夏時間の切り替えで存在しない時刻は、切り替え前のUTCオフセットで換算する。
+    """
+    if notification_time is None:
+        return None
+
+    tz = stats_rollup.user_timezone(tz_name)
+    hour, minute = (int(part) for part in notification_time.split(":"))
+    local_date = after.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    while True:
+        candidate = (
+            datetime.combine(local_date, time(hour, minute), tzinfo=tz)
+            .astimezone(timezone.utc)
+            .replace(tzinfo=None)
+        )
+        if candidate > after:
+            return candidate
+        local_date += timedelta(days=1)
@@ -0,0 +1,60 @@
+"""外部APIの呼び出し回数を制限するレートリミッター（トークンバケット）
+
+同じプロセスの複数のワーカースレッドで1つのリミッターを共有し、合計の呼び出し回数をrate回/秒に
+抑える（プロセスをまたいでは共有しない）。
+トークンはrate個/秒で補充され、最大burst個まで貯まる。トークンがないときの呼び出しは
+次のトークンを予約して、その時刻まで待つ（呼び出し順に払い出すため、待ちが偏らない）。
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """スレッドセーフなトークンバケット。rateが0以下なら制限しない"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self) -> float:
+        """トークンを1つ取得する（なければ補充されるまで待つ）。待った秒数を返す"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 足りなければ負の残高として予約し、補充されるまでの時間だけ待つ
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict[str, float | int]:
+        """リミッターの統計情報（時間はミリ秒）"""
+        with self._lock:
+            throttled = self.throttled or 1
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "wait_avg_ms": self._wait_total / throttled * 1000,
+                "wait_max_ms": self._wait_max * 1000,
+            }
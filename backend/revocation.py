@@ -0,0 +1,120 @@
+"""トークン失効リスト
+
+失効済みトークンID（jti）はrevoked_tokensテーブルに永続化し、各プロセスは
+メモリ上のハッシュセットで判定する。判定はO(1)で、失効していない通常のケースではDBに
+問い合わせない。他プロセスで失効したトークンはsync_interval秒ごとの同期（差分のSELECTのみ）で
+取り込み、有効期限を過ぎたエントリはメモリから削除する。テーブルの期限切れの行は
+リクエストの処理中には削除せず、定期実行（通知バッチ、または python revocation.py）の
+purge_expiredで削除する。
+
+使い方（期限切れの行を削除する）:
+    python revocation.py
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import RevokedToken
+
+# 同期時の取りこぼし防止（コミットが遅れた行を拾うため、前回の最新時刻より少し遡る）
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationList:
+    """失効済みjtiのメモリ上のセット + DBとの同期"""
+
+    def __init__(self, session_factory: Callable[[], Session], sync_interval: float):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, datetime] = {}  # jti -> 有効期限（UTC naive）
+        self._lock = threading.Lock()
+        self._last_sync: float | None = None
+        self._watermark: datetime | None = None  # 取り込み済みのrevoked_atの最大値
+
+    def is_revoked(self, jti: str) -> bool:
+        """jtiが失効済みならTrue"""
+        self._sync_if_due()
+        return jti in self._revoked
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime) -> None:
+        """jtiを失効させる（DBにコミットし、このプロセスには即時反映する）
+
+        同じトークンの同時ログアウトでも一意制約違反にならないよう、INSERT ... ON CONFLICT DO
+        NOTHINGの1文で登録する。
+        """
+        upsert = dialect_insert(db)
+        db.execute(
+            upsert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        db.commit()
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def sync(self, db: Session) -> None:
+        """他プロセスで失効したjtiを取り込み、期限切れのエントリをメモリから削除する"""
+        now = _utcnow()
+        query = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+            RevokedToken.expires_at > now
+        )
+        if self._watermark is not None:
+            query = query.where(RevokedToken.revoked_at >= self._watermark - SYNC_OVERLAP)
+        rows = db.execute(query).all()
+
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._revoked[jti] = expires_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+    def _sync_if_due(self) -> None:
+        # 同期間隔の確認と更新をロック内で行い、同時に来たリクエストのうち1スレッドだけが同期する
+        with self._lock:
+            now = time.monotonic()
+            if self._last_sync is not None and now - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = now
+        try:
+            with self.session_factory() as db:
+                self.sync(db)
+        except SQLAlchemyError as e:
+            # 同期に失敗してもメモリ上のセットで判定を続ける（次回の間隔で再試行）
+            print(f"⚠️ Token revocation sync failed: {type(e).__name__}: {str(e)}")
+
+    def clear(self) -> None:
+        """メモリ上の状態をリセットする（テスト用）"""
+        with self._lock:
+            self._revoked.clear()
+            self._last_sync = None
+            self._watermark = None
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._revoked)}
+
+
+def purge_expired(db: Session) -> int:
+    """有効期限を過ぎた失効済みトークンの行を削除してコミットし、削除した行数を返す（定期実行用）"""
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= _utcnow()))
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        purged = purge_expired(session)
+    print(f"✅ 期限切れの失効済みトークンを削除しました（{purged}行）")
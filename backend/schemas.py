@@ -1,7 +1,14 @@
-from datetime import datetime, time
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Generic, TypeVar
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, field_serializer, field_validator
+
+# 日本標準時（JST: UTC+9）
+jst = timezone(timedelta(hours=9))
+
+T = TypeVar("T")
 
 # ======User関連=======
 
@@ -34,6 +41,7 @@ class UserUpdate(BaseModel):
     password: str | None = Field(default=None, min_length=8)
     notification_time: str | None = None
     is_notification_setup_completed: bool | None = None
+    timezone: str | None = None
 
     @field_validator("notification_time")
     @classmethod
@@ -48,6 +56,18 @@ class UserUpdate(BaseModel):
         except ValueError as e:
             raise ValueError("notification_time must be in HH:MM format (e.g., '20:00')") from e
 
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, v: str | None) -> str | None:
+        """timezoneのバリデーション（IANAのタイムゾーン名をチェック）"""
+        if v is None:
+            return v
+        try:
+            ZoneInfo(v)
+            return v
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise ValueError("timezone must be an IANA time zone name (e.g., 'Asia/Tokyo')") from e
+
 
 class UserResponse(BaseModel):
     """ユーザー情報のレスポンス"""
@@ -56,6 +76,7 @@ class UserResponse(BaseModel):
     email: EmailStr
     notification_time: str | None = None
     is_notification_setup_completed: bool = False
+    timezone: str = "Asia/Tokyo"
     created_at: datetime
 
     model_config = {"from_attributes": True}  # SQLAlchemyモデルから変換可能に
@@ -89,6 +110,17 @@ class ChallengeResponse(BaseModel):
 
     model_config = {"from_attributes": True}
 
+    @field_serializer("created_at")
+    def serialize_created_at(self, v: datetime) -> str:
+        """DBのUTC naiveな作成日時を、JSTのISO 8601文字列で出力する"""
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+        return v.astimezone(jst).isoformat()
+
+
+# 一覧の行（ORMインスタンスまたはRow）をまとめて1回で検証する
+challenge_list_adapter = TypeAdapter(list[ChallengeResponse])
+
 
 # ========== 継承を使ったネストモデル ==========
 
@@ -114,14 +146,24 @@ class ChallengeWithUser(ChallengeResponse):
 # ====== 統一レスポンス形式 ======
 
 
-class SuccessResponse(BaseModel):
-    """成功時のレスポンス（汎用）"""
+class SuccessResponse(BaseModel, Generic[T]):
+    """成功時のレスポンス（汎用）
+
+    SuccessResponse[ChallengeResponse] のようにdataの型を指定できる。
+    型を指定しない場合、dataは任意の値（辞書・リストなど）。
+    """
 
     success: bool = True
-    data: dict | list | None = None
+    data: T | None = None
     message: str | None = None
 
 
+class PaginatedResponse(SuccessResponse[T], Generic[T]):
+    """一覧のレスポンス（次ページ取得用のカーソル付き）"""
+
+    next_cursor: str | None = None  # 次ページがなければNone
+
+
 class ErrorDetail(BaseModel):
     """エラー詳細"""
 
@@ -173,6 +215,34 @@ class CalendarResponse(BaseModel):
     days: list[DayStats]
 
 
+class ScoreDistributionResponse(BaseModel):
+    """スコア分布のレスポンス"""
+
+    start_date: date | None = None  # 集計期間の開始日（含む）。Noneなら制限なし
+    end_date: date | None = None  # 集計期間の終了日（含む）。Noneなら制限なし
+    counts: list[int]  # スコア1〜5それぞれの件数（counts[0]がスコア1）
+    total: int
+
+
+class TrendResponse(BaseModel):
+    """日別推移のレスポンス（列形式。i番目の要素がdates[i]の日の値）"""
+
+    dates: list[date]  # 古い順の連続した日付（ユーザーのタイムゾーン、記録のない日も含む）
+    counts: list[int]  # 日ごとの件数
+    scores: list[int]  # 日ごとの合計スコア
+    score_counts: list[list[int]]  # 日ごとのスコア1〜5それぞれの件数
+
+
+class DashboardResponse(BaseModel):
+    """ダッシュボードのレスポンス（画面の初期表示に必要なデータをまとめたもの）"""
+
+    summary: StatsSummaryResponse
+    recent_challenges: list[ChallengeResponse]  # 新しい順
+    calendar: CalendarResponse  # 今月（ユーザーのタイムゾーン）
+    trend: TrendResponse
+    distribution: ScoreDistributionResponse  # 全期間
+
+
 # ====== トークン ======
 class TokenData(BaseModel):
     """トークンデータ"""
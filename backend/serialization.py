@@ -0,0 +1,42 @@
+"""レスポンスのJSONシリアライズ
+
+エンドポイントが辞書を返すと、FastAPIはjsonable_encoderで辞書を作り直し、
+response_modelで再検証してから標準のjsonモジュールで文字列化する。
+件数の多いレスポンスはpydanticのモデル（SuccessResponse[...]など）を組み立てて
+ModelResponseで返す。pydantic-core（Rust実装）が1回でJSONのバイト列を作り、
+FastAPIの再検証・再変換は行われない。
+"""
+
+import hashlib
+
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    """pydanticのモデルをそのままJSONにして返すレスポンス
+
+    response_modelはOpenAPIのスキーマ用に引き続き指定すること。
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json().encode("utf-8")
+
+
+def revalidated_response(request: Request, content: BaseModel) -> Response:
+    """ETag付きでモデルを返す。If-None-Matchが一致すれば本文なしの304を返す
+
+    Cache-Control: private, no-cache により、ブラウザはキャッシュを保持しつつ
+    毎回ETagで再検証する（記録の追加・更新がすぐに反映される）。
+    """
+    body = content.model_dump_json().encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,135 @@
+"""日別集計（challenge_daily_stats）の更新と再構築
+
+統計エンドポイントは挑戦記録を走査せず、このテーブルを読む。
+挑戦記録を変更するエンドポイントは、同じトランザクション内でapply_deltaを呼ぶこと。
+
+使い方（集計のずれを修復する）:
+    python stats_rollup.py            # 全ユーザーを再構築
+    python stats_rollup.py <user_id>  # 指定ユーザーのみ再構築
+"""
+
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import Challenge, ChallengeDailyStats
+
+# 日本標準時（JST: UTC+9）
+jst = timezone(timedelta(hours=9))
+
+
+@lru_cache(maxsize=64)
+def user_timezone(name: str | None) -> tzinfo:
+    """ユーザーのタイムゾーン名（IANA名）からtzinfoを返す。未設定・不明な名前はJST"""
+    if not name:
+        return jst
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return jst
+
+
+def local_date_of(created_at: datetime, tz: tzinfo = jst) -> date:
+    """UTC naiveの作成日時から、指定タイムゾーン（既定はJST）の日付を求める"""
+    return created_at.replace(tzinfo=timezone.utc).astimezone(tz).date()
+
+
+def apply_delta(
+    db: Session, user_id: uuid.UUID, local_date: date, count_delta: int, score_delta: int
+) -> None:
+    """日別集計に差分を加える（行がなければ作成する。コミットは呼び出し側）"""
+    insert = dialect_insert(db)
+    statement = insert(ChallengeDailyStats).values(
+        user_id=user_id, local_date=local_date, count=count_delta, score_sum=score_delta
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChallengeDailyStats.user_id, ChallengeDailyStats.local_date],
+        set_={
+            "count": ChallengeDailyStats.count + count_delta,
+            "score_sum": ChallengeDailyStats.score_sum + score_delta,
+        },
+    )
+    db.execute(statement)
+
+    # 記録がなくなった日の行は削除する
+    if count_delta < 0:
+        db.execute(
+            delete(ChallengeDailyStats).where(
+                ChallengeDailyStats.user_id == user_id,
+                ChallengeDailyStats.local_date == local_date,
+                ChallengeDailyStats.count <= 0,
+            )
+        )
+
+
+def _score_change_statement(user_id: uuid.UUID, challenge_id: uuid.UUID, new_score: int):
+    """apply_score_changeの文: 挑戦記録の行をロックして読み、その日の集計にスコアの差分を加える"""
+    # FOR UPDATEで挑戦記録の行をロックしてから変更前のスコアを読む。同じ挑戦記録を同時に更新する
+    # 後続のトランザクションはロックの解放を待ち、コミット済みの新しいスコアから差分を求める
+    old_challenge = (
+        select(Challenge.local_date, Challenge.score)
+        .where(Challenge.id == challenge_id, Challenge.user_id == user_id)
+        .with_for_update()
+        .cte("old_challenge")
+    )
+    return (
+        update(ChallengeDailyStats)
+        .where(
+            ChallengeDailyStats.user_id == user_id,
+            ChallengeDailyStats.local_date == old_challenge.c.local_date,
+        )
+        .values(score_sum=ChallengeDailyStats.score_sum + (new_score - old_challenge.c.score))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def apply_score_change(
+    db: Session, user_id: uuid.UUID, challenge_id: uuid.UUID, new_score: int
+) -> None:
+    """挑戦記録のスコア変更分を日別集計に反映する（コミットは呼び出し側）
+
+    挑戦記録を更新する前に、同じトランザクションで呼ぶこと。挑戦記録の行をロックして
+    変更前のスコアと日付を読むCTE（WITH ... SELECT ... FOR UPDATE）と集計の更新を1文で行うため、
+    挑戦記録を事前にSELECTしなくてよく、同時に更新されても差分がずれない。
+    対象の挑戦記録が存在しない（他ユーザーの記録を含む）場合は何もしない。
+    """
+    db.execute(_score_change_statement(user_id, challenge_id, new_score))
+
+
+def rebuild(db: Session, user_id: uuid.UUID | None = None) -> int:
+    """挑戦記録から日別集計を作り直す（user_id未指定なら全ユーザー）。作成した行数を返す
+
+    挑戦記録のlocal_date（作成時に確定した日付）ごとにDB側
+    （INSERT ... SELECT ... GROUP BY）で集計し、挑戦記録は転送しない。
+    """
+    delete_statement = delete(ChallengeDailyStats)
+    query = select(
+        Challenge.user_id, Challenge.local_date, func.count(), func.sum(Challenge.score)
+    ).group_by(Challenge.user_id, Challenge.local_date)
+    if user_id is not None:
+        delete_statement = delete_statement.where(ChallengeDailyStats.user_id == user_id)
+        query = query.where(Challenge.user_id == user_id)
+
+    db.execute(delete_statement)
+    result = db.execute(
+        ChallengeDailyStats.__table__.insert().from_select(
+            ["user_id", "local_date", "count", "score_sum"], query
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    target_user_id = uuid.UUID(sys.argv[1]) if len(sys.argv) > 1 else None
+    with SessionLocal() as session:
+        rows = rebuild(session, target_user_id)
+    print(f"✅ 日別集計を再構築しました（{rows}行）")
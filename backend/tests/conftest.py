@@ -10,7 +10,9 @@ from sqlalchemy.orm import Session, sessionmaker
 # backendディレクトリをPYTHONPATHに追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from auth import revocation_list, token_cache, user_cache  # noqa: E402
 from database import Base, get_db  # noqa: E402
+from loading import enable_strict_loading  # noqa: E402
 from main import app  # noqa: E402
 
 # テスト用のSQLiteデータベースURL（メモリ上に作成）
@@ -20,6 +22,24 @@ SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# トークン失効リストの同期もテスト用DBに向ける
+revocation_list.session_factory = TestingSessionLocal
+
+# テストでは暗黙の遅延ロードを禁止する（ローディングプロファイルの指定漏れを検出）
+enable_strict_loading(TestingSessionLocal)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator[None, None, None]:
+    """プロセス内キャッシュをテストごとにリセットする"""
+    user_cache.clear()
+    token_cache.clear()
+    revocation_list.clear()
+    yield
+    user_cache.clear()
+    token_cache.clear()
+    revocation_list.clear()
+
 
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
@@ -53,6 +53,22 @@ class TestUserRegistration:
         assert data["success"] is False
         assert "already exists" in data["error"]["message"].lower()
 
+    def test_register_duplicate_email_skips_hashing(
+        self, client: TestClient, db: Session, monkeypatch
+    ):
+        """異常系: 登録済みのメールアドレスではパスワードのハッシュ計算を行わない"""
+        import auth
+
+        client.post("/auth/register", json={"email": "test@example.com", "password": "password123"})
+        completed = auth.password_hash_pool.stats()["completed"]
+
+        response = client.post(
+            "/auth/register", json={"email": "test@example.com", "password": "password456"}
+        )
+
+        assert response.status_code == 400
+        assert auth.password_hash_pool.stats()["completed"] == completed
+
     def test_register_invalid_email(self, client: TestClient, db: Session):
         """異常系: 無効なメールアドレスで登録できない"""
         response = client.post(
@@ -260,6 +276,65 @@ class TestUpdateUser:
         me_response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
         assert me_response.json()["data"]["is_notification_setup_completed"] is True
 
+    def test_update_timezone(self, client: TestClient, db: Session):
+        """正常系: timezoneを更新できる（初期値はAsia/Tokyo）"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        assert register_response.json()["data"]["timezone"] == "Asia/Tokyo"
+        token = register_response.json()["data"]["access_token"]
+
+        response = client.put(
+            "/auth/me",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"timezone": "America/New_York"},
+        )
+        assert response.status_code == 200
+        assert response.json()["data"]["timezone"] == "America/New_York"
+
+    def test_update_recomputes_notification_schedule(self, client: TestClient, db: Session):
+        """正常系: 通知時刻・タイムゾーンを変えると次の通知の送信時刻が計算し直される"""
+        from datetime import datetime
+
+        from models import User
+        from notification_schedule import next_notification_at
+
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        user = db.query(User).filter(User.email == "test@example.com").one()
+        # 登録時は既定の通知時刻（20:00 JST）で設定される
+        assert user.next_notification_at is not None
+
+        before = datetime.utcnow()
+        response = client.put(
+            "/auth/me",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"notification_time": "07:45", "timezone": "Europe/London"},
+        )
+        assert response.status_code == 200
+
+        db.refresh(user)
+        assert user.next_notification_at == next_notification_at("07:45", "Europe/London", before)
+
+    def test_update_timezone_invalid(self, client: TestClient, db: Session):
+        """異常系: 存在しないタイムゾーン名では更新できない"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+
+        response = client.put(
+            "/auth/me",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"timezone": "Mars/Olympus_Mons"},
+        )
+        assert response.status_code == 422
+
 
 class TestLogout:
     """POST /auth/logout のテスト"""
@@ -287,3 +362,194 @@ class TestLogout:
         """異常系: トークンなしでログアウトできない"""
         response = client.post("/auth/logout")
         assert response.status_code == 401
+
+    def test_logout_revokes_token(self, client: TestClient, db: Session):
+        """正常系: ログアウトしたトークンは使えなくなり、他のトークンは使える"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        login_response = client.post(
+            "/auth/login",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        other_token = login_response.json()["data"]["access_token"]
+
+        client.post("/auth/logout", headers={"Authorization": f"Bearer {token}"})
+
+        assert (
+            client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+        )
+        assert (
+            client.get("/challenges", headers={"Authorization": f"Bearer {token}"}).status_code
+            == 401
+        )
+        other_response = client.get("/auth/me", headers={"Authorization": f"Bearer {other_token}"})
+        assert other_response.status_code == 200
+
+
+class TestUserCache:
+    """認証済みユーザーキャッシュのテスト"""
+
+    def test_repeated_requests_hit_cache(self, client: TestClient, db: Session):
+        """正常系: 同じトークンでの2回目以降のリクエストはキャッシュから解決される"""
+        from auth import user_cache
+
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+
+        for _ in range(3):
+            response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+            assert response.json()["data"]["email"] == "test@example.com"
+
+        stats = user_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+
+    def test_update_me_invalidates_cache(self, client: TestClient, db: Session):
+        """正常系: PUT /auth/me の後は更新後の値が返される"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        client.get("/auth/me", headers=headers)
+        client.put("/auth/me", headers=headers, json={"notification_time": "07:15"})
+        db.expunge_all()
+
+        response = client.get("/auth/me", headers=headers)
+        assert response.json()["data"]["notification_time"] == "07:15"
+
+    def test_deleted_user_is_evicted(self, client: TestClient, db: Session):
+        """正常系: ユーザー削除後はキャッシュされたトークンで認証できない"""
+        from models import User
+
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/auth/me", headers=headers).status_code == 200
+
+        db.delete(db.query(User).filter(User.email == "test@example.com").one())
+        db.commit()
+
+        assert client.get("/auth/me", headers=headers).status_code == 401
+
+    def test_metrics_expose_cache_counters(self, client: TestClient, db: Session, monkeypatch):
+        """正常系: GET /metrics でキャッシュのヒット/ミス数を取得できる"""
+        monkeypatch.setenv("NOTIFICATION_API_KEY", "metrics_key")
+
+        response = client.get("/metrics", headers={"X-API-Key": "metrics_key"})
+
+        assert response.status_code == 200
+        user_cache_stats = response.json()["data"]["user_cache"]
+        assert {"hits", "misses", "size", "max_size", "evictions"} <= user_cache_stats.keys()
+
+
+class TestTokenSubject:
+    """トークンのsub（ユーザーID）と旧形式トークンの互換性のテスト"""
+
+    def _register(self, client: TestClient) -> dict:
+        response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        return response.json()["data"]
+
+    def test_token_subject_is_user_id(self, client: TestClient, db: Session):
+        """正常系: トークンのsubにはユーザーIDが入る"""
+        import jwt
+
+        from auth import ALGORITHM, SECRET_KEY
+
+        data = self._register(client)
+
+        payload = jwt.decode(data["access_token"], SECRET_KEY, algorithms=[ALGORITHM])
+        assert payload["sub"] == data["id"]
+
+    def test_legacy_email_subject_still_accepted(self, client: TestClient, db: Session):
+        """正常系: 移行期間中はsubがメールアドレスの旧形式トークンも使える"""
+        from auth import create_access_token
+
+        data = self._register(client)
+        legacy_token = create_access_token(data={"sub": "test@example.com"})
+        headers = {"Authorization": f"Bearer {legacy_token}"}
+
+        me_response = client.get("/auth/me", headers=headers)
+        assert me_response.status_code == 200
+        assert me_response.json()["data"]["id"] == data["id"]
+
+        create_response = client.post(
+            "/challenges", headers=headers, json={"content": "旧トークン", "score": 3}
+        )
+        assert create_response.status_code == 201
+        assert create_response.json()["data"]["user_id"] == data["id"]
+
+    def test_legacy_email_subject_rejected_after_transition(
+        self, client: TestClient, db: Session, monkeypatch
+    ):
+        """異常系: 移行期間終了後は旧形式トークンを受け付けない"""
+        import auth
+
+        self._register(client)
+        legacy_token = auth.create_access_token(data={"sub": "test@example.com"})
+        monkeypatch.setattr(auth, "ACCEPT_LEGACY_EMAIL_SUBJECT", False)
+
+        response = client.get("/challenges", headers={"Authorization": f"Bearer {legacy_token}"})
+        assert response.status_code == 401
+
+
+class TestTokenDecodeCache:
+    """検証済みトークンのデコードキャッシュのテスト"""
+
+    def test_repeated_requests_reuse_decoded_claims(self, client: TestClient, db: Session):
+        """正常系: 同じトークンの2回目以降はキャッシュしたクレームを使う"""
+        from auth import token_cache
+
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+
+        for _ in range(3):
+            response = client.get("/challenges", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+
+        stats = token_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+
+    def test_invalid_token_is_not_cached(self, client: TestClient, db: Session):
+        """異常系: 検証に失敗したトークンはキャッシュしない"""
+        from auth import token_cache
+
+        for _ in range(2):
+            response = client.get("/challenges", headers={"Authorization": "Bearer invalid"})
+            assert response.status_code == 401
+
+        assert token_cache.stats()["size"] == 0
+
+    def test_expired_entry_is_not_served(self, db: Session, monkeypatch):
+        """正常系: expを過ぎたエントリはキャッシュから返さない"""
+        import hashlib
+        import time
+
+        import auth
+
+        token = auth.create_access_token(data={"sub": "user"})
+        payload = auth._decode_token(token)
+        digest = hashlib.sha256(token.encode()).digest()
+        assert auth.token_cache.get(digest) == payload
+
+        monkeypatch.setattr(time, "time", lambda: payload["exp"] + 1)
+        assert auth.token_cache.get(digest) is None
@@ -0,0 +1,71 @@
+"""TTLCacheのテスト"""
+
+import time
+
+from cache import TTLCache
+
+
+def test_get_and_set():
+    """保存した値を取得でき、ヒット/ミスが記録される"""
+    cache = TTLCache(max_size=10, ttl=60)
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """上限を超えると最も長く使われていないエントリが削除される"""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # aを最近使用にする
+
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    """TTLを過ぎたエントリは返さない"""
+    cache = TTLCache(max_size=10, ttl=30)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", 1)
+
+    monkeypatch.setattr(time, "time", lambda: now + 31)
+
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_explicit_expires_at_shorter_than_ttl(monkeypatch):
+    """expires_atがTTLより早ければそちらで失効する"""
+    cache = TTLCache(max_size=10, ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", 1, expires_at=now + 5)
+
+    monkeypatch.setattr(time, "time", lambda: now + 6)
+
+    assert cache.get("a") is None
+
+
+def test_pop_and_clear():
+    """pop/clearでエントリと統計を削除できる"""
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.pop("a")
+    cache.pop("missing")
+
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.stats() == {"size": 0, "max_size": 10, "hits": 0, "misses": 0, "evictions": 0}
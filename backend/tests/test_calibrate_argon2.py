@@ -0,0 +1,97 @@
+"""argon2パラメータ計測スクリプトと再ハッシュのテスト"""
+
+import json
+import time
+
+from calibrate_argon2 import calibrate
+
+
+def _fake_measure(time_cost, memory_cost, parallelism, samples, workers):
+    # 計算量に比例するレイテンシ（t=4, m=19456 で約47.5ms）。並列数が増えると遅くなる
+    return time_cost * memory_cost / 1638.4 * workers
+
+
+def test_calibrate_picks_strongest_params_within_target():
+    """目標p95以内で計算量が最大のパラメータを選ぶ"""
+    params = calibrate(target_ms=50, parallelism=2, samples=1, measure=_fake_measure)
+
+    assert (params["time_cost"], params["memory_cost"]) == (4, 19456)
+    assert params["p95_ms"] <= 50
+    assert params["parallelism"] == 2
+    assert params["workers"] == 1
+
+
+def test_calibrate_accounts_for_concurrent_workers():
+    """同時実行数が多いほど遅くなるため、より軽いパラメータを選び、ワーカー数を記録する"""
+    params = calibrate(target_ms=50, parallelism=2, samples=1, workers=2, measure=_fake_measure)
+
+    assert (params["time_cost"], params["memory_cost"]) == (2, 19456)
+    assert params["workers"] == 2
+
+
+def test_measure_p95_ms_runs_workers_concurrently(monkeypatch):
+    """計測はworkers件のハッシュを同時に計算する"""
+    import threading
+
+    import calibrate_argon2
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    class FakeHasher:
+        def hash(self, password):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    monkeypatch.setattr(calibrate_argon2.argon2, "using", lambda **kwargs: FakeHasher())
+
+    p95_ms = calibrate_argon2.measure_p95_ms(1, 19456, 1, samples=6, workers=3)
+
+    assert peak == 3
+    assert p95_ms >= 15
+
+
+def test_calibrate_returns_none_when_target_unreachable():
+    """どの候補も目標を満たさなければNone"""
+    assert calibrate(target_ms=1, parallelism=1, samples=1, measure=_fake_measure) is None
+
+
+def test_load_argon2_params(tmp_path):
+    """書き出したファイルからパラメータを読み込める"""
+    from auth import load_argon2_params
+
+    path = tmp_path / "argon2_params.json"
+    path.write_text(json.dumps({"time_cost": 2, "memory_cost": 19456, "parallelism": 1}))
+
+    assert load_argon2_params(str(path)) == {"time_cost": 2, "memory_cost": 19456, "parallelism": 1}
+    assert load_argon2_params(str(tmp_path / "missing.json")) == {}
+
+
+def test_login_rehashes_when_params_change(client, db, monkeypatch):
+    """パラメータ変更後のログインで既存ユーザーのハッシュが更新される"""
+    import auth
+    from models import User
+
+    client.post("/auth/register", json={"email": "test@example.com", "password": "password123"})
+    old_hash = db.query(User).filter(User.email == "test@example.com").one().hashed_password
+
+    new_context = auth.build_crypt_context({"time_cost": 1, "memory_cost": 8192, "parallelism": 1})
+    monkeypatch.setattr(auth, "pwd_context", new_context)
+
+    response = client.post(
+        "/auth/login", json={"email": "test@example.com", "password": "password123"}
+    )
+
+    assert response.status_code == 200
+    db.expire_all()
+    new_hash = db.query(User).filter(User.email == "test@example.com").one().hashed_password
+    assert new_hash != old_hash
+    assert "m=8192,t=1,p=1" in new_hash
+    assert not new_context.needs_update(new_hash)
+    assert new_context.verify("password123", new_hash)
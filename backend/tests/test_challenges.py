@@ -7,7 +7,11 @@ TDDアプローチ:
 3. Refactor: コードを改善する
 """
 
+from collections.abc import Generator
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 
@@ -370,6 +374,88 @@ class TestGetChallenges:
         data = response.json()
         assert len(data["data"]) == 3  # 5つ中、最初の2つをスキップして3つ取得
 
+    def test_get_challenges_with_cursor(self, client: TestClient, db: Session):
+        """正常系: next_cursorで重複・欠落なく全件を順にたどれる"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for i in range(5):
+            client.post(
+                "/challenges", headers=headers, json={"content": f"挑戦{i + 1}", "score": 3}
+            )
+
+        all_ids = [c["id"] for c in client.get("/challenges", headers=headers).json()["data"]]
+
+        seen_ids = []
+        response = client.get("/challenges?limit=2", headers=headers).json()
+        seen_ids += [c["id"] for c in response["data"]]
+        while response["next_cursor"]:
+            response = client.get(
+                f"/challenges?limit=2&cursor={response['next_cursor']}", headers=headers
+            ).json()
+            seen_ids += [c["id"] for c in response["data"]]
+
+        assert seen_ids == all_ids
+        assert len(seen_ids) == 5
+
+    def test_get_challenges_cursor_not_shifted_by_new_records(
+        self, client: TestClient, db: Session
+    ):
+        """正常系: 1ページ目取得後に記録が追加されても2ページ目はずれない"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for i in range(4):
+            client.post(
+                "/challenges", headers=headers, json={"content": f"挑戦{i + 1}", "score": 3}
+            )
+
+        first_page = client.get("/challenges?limit=2", headers=headers).json()
+        client.post("/challenges", headers=headers, json={"content": "新しい挑戦", "score": 5})
+
+        second_page = client.get(
+            f"/challenges?limit=2&cursor={first_page['next_cursor']}", headers=headers
+        ).json()
+
+        assert [c["content"] for c in second_page["data"]] == ["挑戦2", "挑戦1"]
+
+    def test_get_challenges_last_page_has_no_cursor(self, client: TestClient, db: Session):
+        """正常系: 最後のページではnext_cursorがnull"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.post("/challenges", headers=headers, json={"content": "挑戦", "score": 3})
+
+        response = client.get("/challenges?limit=2", headers=headers)
+
+        assert response.json()["next_cursor"] is None
+
+    def test_get_challenges_invalid_cursor(self, client: TestClient, db: Session):
+        """異常系: 不正なカーソルは400"""
+        register_response = client.post(
+            "/auth/register",
+            json={"email": "test@example.com", "password": "password123"},
+        )
+        token = register_response.json()["data"]["access_token"]
+
+        response = client.get(
+            "/challenges?cursor=not-a-cursor", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["error"]["message"] == "Invalid cursor."
+
 
 class TestUpdateChallenge:
     """PUT /challenges/{challenge_id} のテスト"""
@@ -888,3 +974,78 @@ class TestDeleteChallenge:
         assert challenge_ids[1] not in remaining_ids
         assert challenge_ids[0] in remaining_ids
         assert challenge_ids[2] in remaining_ids
+
+
+class TestWriteStatements:
+    """書き込みエンドポイントが事前・事後のSELECTを発行しないことのテスト"""
+
+    @pytest.fixture
+    def statements(self, db: Session) -> Generator[list[str], None, None]:
+        """テスト用DBに発行されたSQL文を記録する"""
+        engine = db.get_bind()
+        executed: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            executed.append(" ".join(statement.split()))
+
+        event.listen(engine, "before_cursor_execute", record)
+        yield executed
+        event.remove(engine, "before_cursor_execute", record)
+
+    def test_register_issues_single_insert(self, client: TestClient, statements: list[str]):
+        """正常系: 登録はidだけの軽い重複チェックと、INSERT ... ON CONFLICT RETURNINGの1文"""
+        response = client.post(
+            "/auth/register", json={"email": "test@example.com", "password": "password123"}
+        )
+
+        assert response.status_code == 201
+        assert len(statements) == 2
+        assert statements[0].startswith("SELECT users.id")
+        assert statements[1].startswith("INSERT INTO users")
+        assert "ON CONFLICT" in statements[1]
+        assert "RETURNING" in statements[1]
+
+    def test_challenge_writes_do_not_select(
+        self, client: TestClient, db: Session, statements: list[str]
+    ):
+        """正常系: 作成・更新・削除で挑戦記録をSELECTしない"""
+        register_response = client.post(
+            "/auth/register", json={"email": "test@example.com", "password": "password123"}
+        )
+        headers = {"Authorization": f"Bearer {register_response.json()['data']['access_token']}"}
+
+        challenge_id = client.post(
+            "/challenges", headers=headers, json={"content": "作成", "score": 2}
+        ).json()["data"]["id"]
+        update_response = client.put(
+            f"/challenges/{challenge_id}", headers=headers, json={"content": "更新", "score": 4}
+        )
+        delete_response = client.delete(f"/challenges/{challenge_id}", headers=headers)
+
+        assert update_response.json()["data"]["content"] == "更新"
+        assert update_response.json()["data"]["score"] == 4
+        assert delete_response.status_code == 200
+        challenge_selects = [
+            s for s in statements if s.startswith("SELECT") and " FROM challenges" in s
+        ]
+        assert challenge_selects == []
+
+    def test_score_update_locks_challenge_before_rollup(
+        self, client: TestClient, db: Session, statements: list[str]
+    ):
+        """正常系: スコア更新は挑戦記録を（CTEで）ロックして集計を更新してから、挑戦記録を更新する"""
+        register_response = client.post(
+            "/auth/register", json={"email": "test@example.com", "password": "password123"}
+        )
+        headers = {"Authorization": f"Bearer {register_response.json()['data']['access_token']}"}
+        challenge_id = client.post(
+            "/challenges", headers=headers, json={"content": "作成", "score": 2}
+        ).json()["data"]["id"]
+        statements.clear()
+
+        client.put(f"/challenges/{challenge_id}", headers=headers, json={"score": 4})
+
+        writes = [s for s in statements if not s.startswith("SELECT")]
+        assert writes[0].startswith("WITH old_challenge AS (SELECT")
+        assert "UPDATE challenge_daily_stats" in writes[0]
+        assert writes[1].startswith("UPDATE challenges")
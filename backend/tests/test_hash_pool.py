@@ -0,0 +1,125 @@
+"""パスワードハッシュ専用プールのテスト"""
+
+import threading
+import time
+
+import pytest
+
+from hash_pool import HashPool, PoolSaturatedError
+
+
+def _occupy(pool: HashPool) -> tuple[threading.Event, threading.Thread]:
+    """プールの実行枠を1つ埋めたままにする"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(timeout=5)
+
+    thread = threading.Thread(target=pool.run, args=(blocker,))
+    thread.start()
+    assert started.wait(timeout=5)
+    return release, thread
+
+
+def test_run_returns_result_and_records_metrics():
+    """正常系: 結果を返し、待ち時間・実行時間を記録する"""
+    pool = HashPool(max_workers=2, max_queue=2)
+
+    assert pool.run(lambda a, b: a + b, 1, 2) == 3
+
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["rejected"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["hash_time_avg_ms"] >= 0
+
+
+def test_run_propagates_exception():
+    """異常系: 実行中の例外は呼び出し元に伝わる"""
+    pool = HashPool(max_workers=1, max_queue=0)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        pool.run(fail)
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_saturated_pool_rejects_immediately():
+    """異常系: 実行枠と待ち行列が埋まっていれば待たずに拒否する"""
+    pool = HashPool(max_workers=1, max_queue=0)
+    release, thread = _occupy(pool)
+    try:
+        with pytest.raises(PoolSaturatedError):
+            pool.run(lambda: None)
+    finally:
+        release.set()
+        thread.join()
+
+    assert pool.stats()["rejected"] == 1
+    assert pool.run(lambda: "ok") == "ok"
+
+
+def test_login_returns_503_when_pool_saturated(client, monkeypatch):
+    """異常系: プールが満杯ならログインは503とRetry-Afterを返す"""
+    import auth
+
+    client.post("/auth/register", json={"email": "test@example.com", "password": "password123"})
+    pool = HashPool(max_workers=1, max_queue=0)
+    monkeypatch.setattr(auth, "password_hash_pool", pool)
+    release, thread = _occupy(pool)
+    try:
+        response = client.post(
+            "/auth/login", json={"email": "test@example.com", "password": "password123"}
+        )
+    finally:
+        release.set()
+        thread.join()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+
+
+def test_other_requests_complete_while_login_waits_for_hash(client, monkeypatch):
+    """正常系: ログインがハッシュ計算を待っている間も、他のリクエストは完了する"""
+    import auth
+
+    register_response = client.post(
+        "/auth/register", json={"email": "test@example.com", "password": "password123"}
+    )
+    headers = {"Authorization": f"Bearer {register_response.json()['data']['access_token']}"}
+    pool = HashPool(max_workers=1, max_queue=1)
+    monkeypatch.setattr(auth, "password_hash_pool", pool)
+    release, blocker = _occupy(pool)
+
+    login_response = {}
+    login = threading.Thread(
+        target=lambda: login_response.update(
+            response=client.post(
+                "/auth/login", json={"email": "test@example.com", "password": "password123"}
+            )
+        )
+    )
+    login.start()
+    try:
+        # ログインは実行枠が空くまで待ち行列で待っている
+        for _ in range(100):
+            if pool.stats()["in_flight"] == 2:
+                break
+            time.sleep(0.01)
+        assert pool.stats()["in_flight"] == 2
+
+        challenges_response = client.get("/challenges", headers=headers)
+
+        assert challenges_response.status_code == 200
+        assert login.is_alive()
+    finally:
+        release.set()
+        blocker.join()
+        login.join(timeout=5)
+
+    assert login_response["response"].status_code == 200
@@ -0,0 +1,86 @@
+"""ローディングプロファイルのテスト"""
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+import loading
+from models import Challenge, User
+
+
+def _create_user_with_challenges(db: Session) -> User:
+    user = User(email="loading@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.add_all([Challenge(user_id=user.id, content=f"c{i}", score=3) for i in range(3)])
+    db.commit()
+    db.expunge_all()
+    return user
+
+
+def test_user_only_does_not_load_challenges(db: Session):
+    """USER_ONLY: 挑戦記録は読み込まれず、アクセスすると例外になる"""
+    _create_user_with_challenges(db)
+
+    user = db.query(User).options(*loading.USER_ONLY).one()
+
+    assert "challenges" in inspect(user).unloaded
+    with pytest.raises(InvalidRequestError):
+        _ = user.challenges
+
+
+def test_user_with_challenges_loads_collection(db: Session):
+    """USER_WITH_CHALLENGES: 挑戦記録を明示的に読み込む"""
+    _create_user_with_challenges(db)
+
+    user = db.query(User).options(*loading.USER_WITH_CHALLENGES).one()
+
+    assert "challenges" not in inspect(user).unloaded
+    assert len(user.challenges) == 3
+
+
+def test_strict_mode_rejects_implicit_lazy_load(db: Session):
+    """strictモード: プロファイル未指定のクエリからの暗黙の遅延ロードは例外になる"""
+    _create_user_with_challenges(db)
+
+    challenge = db.query(Challenge).first()
+
+    with pytest.raises(loading.ImplicitLazyLoadError):
+        _ = challenge.user
+
+
+def test_get_me_does_not_load_challenges(client, auth_token, db: Session):
+    """GET /auth/me は挑戦記録を読み込まない"""
+    for i in range(3):
+        client.post(
+            "/challenges",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"content": f"挑戦{i}", "score": 3},
+        )
+    db.expunge_all()
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {auth_token}"})
+
+    assert response.status_code == 200
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    assert "challenges" in inspect(user).unloaded
+
+
+def test_challenge_reads_do_not_create_orm_instances(client, auth_token, db: Session):
+    """GET /challenges と詳細はカラムだけを読み、セッションに挑戦記録のインスタンスを残さない"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = [
+        client.post(
+            "/challenges", headers=headers, json={"content": f"挑戦{i}", "score": 3}
+        ).json()["data"]["id"]
+        for i in range(3)
+    ]
+    db.expunge_all()
+
+    list_response = client.get("/challenges", headers=headers)
+    detail_response = client.get(f"/challenges/{ids[0]}", headers=headers)
+
+    assert len(list_response.json()["data"]) == 3
+    assert detail_response.json()["data"]["id"] == ids[0]
+    assert not [obj for obj in db.identity_map.values() if isinstance(obj, Challenge)]
@@ -0,0 +1,172 @@
+"""スキーママイグレーションのテスト"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrate
+from database import Base
+from notification_schedule import next_notification_at
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """マイグレーション導入前のスキーマを持つSQLiteデータベース"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE users (id CHAR(32) PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE, "
+                "hashed_password VARCHAR(255) NOT NULL, notification_time VARCHAR(5), "
+                "created_at DATETIME NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE challenges (id CHAR(32) PRIMARY KEY, user_id CHAR(32) NOT NULL "
+                "REFERENCES users (id) ON DELETE CASCADE, content TEXT NOT NULL, "
+                "score INTEGER NOT NULL, created_at DATETIME NOT NULL)"
+            )
+        )
+    yield engine
+    engine.dispose()
+
+
+def _index_names(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_upgrade_applies_all_migrations(legacy_engine):
+    """未適用のマイグレーションを順番に適用し、記録する"""
+    done = migrate.upgrade(legacy_engine)
+
+    versions = [m.version for m in migrate.load_migrations()]
+    assert done == versions
+    assert migrate.applied_versions(legacy_engine) == set(versions)
+    with legacy_engine.connect() as conn:
+        assert migrate.column_exists(conn, "users", "is_notification_setup_completed")
+    assert "revoked_tokens" in inspect(legacy_engine).get_table_names()
+    assert "ix_challenges_user_id_created_at" in _index_names(legacy_engine, "challenges")
+    assert "ix_challenges_user_id_local_date_score" in _index_names(legacy_engine, "challenges")
+    assert "ix_challenges_user_id_local_date" not in _index_names(legacy_engine, "challenges")
+    assert "ix_users_next_notification_at" in _index_names(legacy_engine, "users")
+
+    # 2回目は何もしない
+    assert migrate.upgrade(legacy_engine) == []
+
+
+def test_upgrade_to_target(legacy_engine):
+    """指定したバージョンまでだけ適用する"""
+    assert migrate.upgrade(legacy_engine, "0001") == ["0001"]
+    assert "revoked_tokens" not in inspect(legacy_engine).get_table_names()
+
+
+def test_downgrade_reverts_in_reverse_order(legacy_engine):
+    """指定したバージョンより新しいものを新しい順に取り消す"""
+    migrate.upgrade(legacy_engine)
+
+    done = migrate.downgrade(legacy_engine, "0001")
+
+    assert done == sorted(done, reverse=True)
+    assert "0001" not in done
+    assert migrate.applied_versions(legacy_engine) == {"0001"}
+    assert "ix_challenges_user_id_created_at" not in _index_names(legacy_engine, "challenges")
+
+    migrate.downgrade(legacy_engine, "0000")
+    assert migrate.applied_versions(legacy_engine) == set()
+    with legacy_engine.connect() as conn:
+        assert not migrate.column_exists(conn, "users", "is_notification_setup_completed")
+
+
+def test_upgrade_is_noop_on_fresh_schema(tmp_path):
+    """create_allで作成済みのスキーマでは各マイグレーションは何もせず記録だけ行う"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    migrate.upgrade(engine)
+
+    assert migrate.applied_versions(engine) == {m.version for m in migrate.load_migrations()}
+    engine.dispose()
+
+
+def test_daily_stats_backfilled_from_existing_challenges(legacy_engine):
+    """日別集計テーブルは既存の挑戦記録からJSTの日付で集計される"""
+    with legacy_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password, created_at) "
+                "VALUES ('00000000000000000000000000000001', 'a@example.com', 'x', "
+                "'2025-01-01 00:00:00')"
+            )
+        )
+        # 2025-01-01 14:59 UTC = 01-01 23:59 JST, 15:00 UTC = 01-02 00:00 JST
+        for i, (created_at, score) in enumerate(
+            [("2025-01-01 14:59:00", 2), ("2025-01-01 15:00:00", 3), ("2025-01-01 16:00:00", 4)]
+        ):
+            conn.execute(
+                text(
+                    "INSERT INTO challenges (id, user_id, content, score, created_at) VALUES "
+                    f"('{i:032d}', '00000000000000000000000000000001', 'c', {score}, '{created_at}')"
+                )
+            )
+
+    migrate.upgrade(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT local_date, count, score_sum FROM challenge_daily_stats ORDER BY local_date"
+            )
+        ).all()
+    assert [tuple(row) for row in rows] == [("2025-01-01", 1, 2), ("2025-01-02", 2, 7)]
+
+
+def test_local_date_backfilled_as_jst(legacy_engine):
+    """既存の挑戦記録のlocal_dateはcreated_atをJSTに変換した日付で埋められる"""
+    with legacy_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password, created_at) "
+                "VALUES ('00000000000000000000000000000001', 'a@example.com', 'x', "
+                "'2025-01-01 00:00:00')"
+            )
+        )
+        for i, created_at in enumerate(["2025-01-01 14:59:00", "2025-01-01 15:00:00"]):
+            conn.execute(
+                text(
+                    "INSERT INTO challenges (id, user_id, content, score, created_at) VALUES "
+                    f"('{i:032d}', '00000000000000000000000000000001', 'c', 1, '{created_at}')"
+                )
+            )
+
+    migrate.upgrade(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        local_dates = conn.execute(text("SELECT local_date FROM challenges ORDER BY id")).scalars()
+        assert list(local_dates) == ["2025-01-01", "2025-01-02"]
+        assert conn.execute(text("SELECT timezone FROM users")).scalar() == "Asia/Tokyo"
+
+
+def test_next_notification_at_backfilled(legacy_engine):
+    """既存ユーザーの次の送信時刻は、notification_timeとtimezoneから計算して埋められる"""
+    with legacy_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, hashed_password, notification_time, created_at) "
+                "VALUES ('00000000000000000000000000000001', 'a@example.com', 'x', '20:00', "
+                "'2025-01-01 00:00:00'), "
+                "('00000000000000000000000000000002', 'b@example.com', 'x', NULL, "
+                "'2025-01-01 00:00:00')"
+            )
+        )
+
+    before = datetime.utcnow()
+    migrate.upgrade(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        rows = conn.execute(text("SELECT next_notification_at FROM users ORDER BY id")).scalars()
+        scheduled, disabled = list(rows)
+    # 通知時刻のないユーザーは送信しない
+    assert disabled is None
+    assert datetime.fromisoformat(scheduled) == next_notification_at("20:00", "Asia/Tokyo", before)
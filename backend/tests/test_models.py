@@ -0,0 +1,26 @@
+"""モデルのテスト"""
+
+import time
+import uuid
+
+from models import generate_uuid
+
+
+def test_generate_uuid_is_version_7():
+    """generate_uuidはRFC 9562のUUIDv7を返す"""
+    value = generate_uuid()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    # 先頭48bitは現在のUnixミリ秒
+    assert abs((value.int >> 80) - time.time_ns() // 1_000_000) < 1000
+
+
+def test_generate_uuid_is_time_ordered():
+    """後から生成したIDほど大きい（ミリ秒が変われば必ず順序が保たれる）"""
+    first = generate_uuid()
+    time.sleep(0.002)
+    second = generate_uuid()
+
+    assert first < second
+    assert len({generate_uuid() for _ in range(1000)}) == 1000
@@ -1,22 +1,44 @@
 import sys
 from datetime import datetime, timedelta, timezone
 
+import pytest
+
 from models import Challenge, User
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def unlimited_send_rate(monkeypatch):
+    """送信のレート制限はテストを遅くするだけなので外す（制限自体のテストでは差し替える）"""
+    import email_service
+
+    monkeypatch.setattr(email_service, "notification_rate_limiter", RateLimiter(rate=0))
+
+
+def _due() -> datetime:
+    """送信時刻を過ぎたnext_notification_at（UTC naive）"""
+    return datetime.utcnow() - timedelta(minutes=1)
 
 
-def test_get_users_for_notification_jst_20(db):
-    """指定JST時刻(20時台)のユーザーを取得できる"""
-    # テスト用ユーザー作成
-    u1 = User(email="u1@example.com", hashed_password="x", notification_time="20:00")
-    u2 = User(email="u2@example.com", hashed_password="x", notification_time="20:30")
-    u3 = User(email="u3@example.com", hashed_password="x", notification_time="19:00")
+def test_get_users_for_notification_due(db):
+    """送信時刻（next_notification_at）を過ぎたユーザーだけを取得できる"""
+    now = datetime(2025, 1, 6, 11, 30)  # 20:30 JST
+    u1 = User(
+        email="u1@example.com", hashed_password="x", next_notification_at=datetime(2025, 1, 6, 11)
+    )
+    u2 = User(email="u2@example.com", hashed_password="x", next_notification_at=now)
+    u3 = User(
+        email="u3@example.com",
+        hashed_password="x",
+        next_notification_at=datetime(2025, 1, 6, 11, 31),
+    )
 
     db.add_all([u1, u2, u3])
     db.commit()
 
     from email_service import get_users_for_notification
 
-    users = get_users_for_notification(db, 20)
+    users = get_users_for_notification(db, now)
 
     emails = {u.email for u in users}
 
@@ -25,6 +47,25 @@ def test_get_users_for_notification_jst_20(db):
     assert "u3@example.com" not in emails
 
 
+def test_next_notification_at():
+    """通知時刻（ユーザーのタイムゾーン）の次の送信時刻をUTCで求める"""
+    from notification_schedule import next_notification_at
+
+    # 19:00 JSTの時点では当日の20:00 JST（11:00 UTC）
+    assert next_notification_at("20:00", "Asia/Tokyo", datetime(2025, 1, 6, 10)) == datetime(
+        2025, 1, 6, 11
+    )
+    # ちょうど送信時刻なら翌日
+    assert next_notification_at("20:00", "Asia/Tokyo", datetime(2025, 1, 6, 11)) == datetime(
+        2025, 1, 7, 11
+    )
+    # 分単位・夏時間の切り替え（2025-03-09にEST(-5) → EDT(-4)）
+    assert next_notification_at("08:15", "America/New_York", datetime(2025, 3, 8, 14)) == datetime(
+        2025, 3, 9, 12, 15
+    )
+    assert next_notification_at(None, "Asia/Tokyo", datetime(2025, 1, 6)) is None
+
+
 def test_get_weekly_stats(db):
     """週次統計を正しく計算できる"""
     # ユーザーと挑戦記録をセットアップ
@@ -168,8 +209,18 @@ def test_send_endpoint_success(client, monkeypatch, db):
 
     # 現在の時刻に対応するユーザーを2人作成
     hour_str = f"{current_hour:02d}:00"
-    u1 = User(email="send_test1@example.com", hashed_password="x", notification_time=hour_str)
-    u2 = User(email="send_test2@example.com", hashed_password="x", notification_time=hour_str)
+    u1 = User(
+        email="send_test1@example.com",
+        hashed_password="x",
+        notification_time=hour_str,
+        next_notification_at=_due(),
+    )
+    u2 = User(
+        email="send_test2@example.com",
+        hashed_password="x",
+        notification_time=hour_str,
+        next_notification_at=_due(),
+    )
 
     db.add_all([u1, u2])
     db.commit()
@@ -272,8 +323,18 @@ def test_send_notification_batch_integration(client, monkeypatch, db):
     hour_str = f"{current_hour:02d}:00"
 
     # 複数ユーザーを作成
-    u1 = User(email="integration1@example.com", hashed_password="x", notification_time=hour_str)
-    u2 = User(email="integration2@example.com", hashed_password="x", notification_time=hour_str)
+    u1 = User(
+        email="integration1@example.com",
+        hashed_password="x",
+        notification_time=hour_str,
+        next_notification_at=_due(),
+    )
+    u2 = User(
+        email="integration2@example.com",
+        hashed_password="x",
+        notification_time=hour_str,
+        next_notification_at=_due(),
+    )
     # u3は確実に異なる時刻を設定（現在時刻の1時間後、24時間制を考慮）
     different_hour = (current_hour + 1) % 24
     u3 = User(
@@ -332,8 +393,9 @@ def test_send_notification_batch_integration(client, monkeypatch, db):
     assert data["data"]["current_hour_jst"] == current_hour
     assert len(data["data"]["failed_emails"]) == 0
 
-    # Resendに実際に送信されたメールをチェック
+    # Resendに実際に送信されたメールをチェック（並列送信のため宛先順に並べて確認）
     assert len(sent_emails) == 2
+    sent_emails.sort(key=lambda params: params["to"])
 
     # メール内容を確認
     email_1 = sent_emails[0]
@@ -345,3 +407,579 @@ def test_send_notification_batch_integration(client, monkeypatch, db):
     email_2 = sent_emails[1]
     assert email_2["to"] == ["integration2@example.com"]
     assert email_2["subject"] == "今日も挑戦を記録しましょう！"
+
+
+def test_get_weekly_stats_for_users(db):
+    """複数ユーザーの週次統計をまとめて集計でき、ユーザーごとの集計と一致する"""
+    from email_service import get_weekly_stats, get_weekly_stats_for_users
+
+    today = datetime.now(timezone(timedelta(hours=9))).date()
+    week_start = today - timedelta(days=today.weekday())
+    users = [User(email=f"bulk{i}@example.com", hashed_password="x") for i in range(3)]
+    db.add_all(users)
+    db.commit()
+    db.add_all(
+        [
+            Challenge(user_id=users[0].id, content="a", score=2, local_date=week_start),
+            Challenge(user_id=users[0].id, content="b", score=5, local_date=today),
+            Challenge(user_id=users[1].id, content="c", score=4, local_date=today),
+            # 先週の記録は含まない
+            Challenge(
+                user_id=users[1].id,
+                content="d",
+                score=1,
+                local_date=week_start - timedelta(days=1),
+            ),
+        ]
+    )
+    db.commit()
+
+    stats = get_weekly_stats_for_users(db, users)
+
+    assert stats == {u.id: get_weekly_stats(db, u.id) for u in users}
+    assert stats[users[0].id]["challenge_count"] == 2
+    assert stats[users[0].id]["total_score"] == 7
+    assert stats[users[1].id]["challenge_count"] == 1
+    # 記録のないユーザーも0件の統計を返す
+    assert stats[users[2].id]["challenge_count"] == 0
+    assert stats[users[2].id]["average_score"] == 0.0
+
+
+def test_get_weekly_stats_for_users_chunked(db):
+    """対象ユーザーをchunk_size人ずつ、GROUP BYのクエリで集計する"""
+    from sqlalchemy import event
+
+    from email_service import get_weekly_stats_for_users
+
+    users = [User(email=f"chunk{i}@example.com", hashed_password="x") for i in range(5)]
+    db.add_all(users)
+    db.commit()
+    for u in users:
+        db.add(Challenge(user_id=u.id, content="c", score=3))
+    db.commit()
+    user_ids = [u.id for u in users]
+
+    engine = db.get_bind()
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        stats = get_weekly_stats_for_users(db, users, chunk_size=2)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # 5人を2人ずつ → 3クエリ（ユーザーごとのクエリは発行しない）
+    assert len(executed) == 3
+    assert all("GROUP BY" in statement for statement in executed)
+    assert sorted(stats) == sorted(user_ids)
+    assert all(s["challenge_count"] == 1 for s in stats.values())
+
+
+def test_dispatch_notifications_concurrent(db):
+    """batch_size人ずつのバッチを最大concurrency件まで並列に送り、成否はユーザーの順に返す"""
+    import threading
+    import time
+
+    from email_service import dispatch_notifications
+
+    users = [User(email=f"dispatch{i}@example.com", hashed_password="x") for i in range(8)]
+    db.add_all(users)
+    db.commit()
+    weekly_stats = {u.id: {"challenge_count": 0} for u in users}
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    batch_sizes = []
+
+    def send_batch(batch, stats):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            batch_sizes.append(len(batch))
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        # 奇数番目のユーザーは送信失敗
+        return [int(u.email.removeprefix("dispatch").split("@")[0]) % 2 == 0 for u in batch]
+
+    results = dispatch_notifications(
+        users, weekly_stats, send_batch=send_batch, concurrency=3, batch_size=2
+    )
+
+    assert results == [True, False] * 4
+    assert batch_sizes == [2, 2, 2, 2]
+    assert 1 < max_in_flight <= 3
+
+
+def test_send_endpoint_counts_failures_per_user(client, monkeypatch, db):
+    """並列送信でも、失敗したユーザーはfailed_emailsに個別に記録される"""
+    monkeypatch.setenv("NOTIFICATION_API_KEY", "test_key_123")
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+
+    class DummyEmails:
+        @staticmethod
+        def send(params):
+            if params["to"] == ["fail@example.com"]:
+                raise RuntimeError("rejected")
+            return {"id": "msg_test"}
+
+    class DummyResend:
+        api_key = None
+        Emails = DummyEmails
+
+    monkeypatch.setitem(sys.modules, "resend", DummyResend())
+
+    hour_str = f"{datetime.now(timezone(timedelta(hours=9))).hour:02d}:00"
+    users = [
+        User(
+            email=email,
+            hashed_password="x",
+            notification_time=hour_str,
+            next_notification_at=_due(),
+        )
+        for email in ("ok1@example.com", "fail@example.com", "ok2@example.com")
+    ]
+    db.add_all(users)
+    db.commit()
+
+    response = client.post("/notifications/send", headers={"X-API-Key": "test_key_123"})
+
+    data = response.json()["data"]
+    assert data["total_users"] == 3
+    assert data["emails_sent"] == 2
+    assert data["emails_failed"] == 1
+    assert [f["email"] for f in data["failed_emails"]] == ["fail@example.com"]
+
+
+class _ResendError(Exception):
+    """resend.exceptions.ResendErrorと同じく、HTTPステータスをcodeに持つ例外"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class _BatchResend:
+    """Batch.sendとEmails.sendの呼び出しを記録するresendモジュールのスタブ
+
+    batch_errorsを渡すと、Batch.sendの呼び出しごとに先頭から順に送出する（尽きたら成功）。
+    """
+
+    def __init__(self, batch_response=None, batch_errors=(), rejected=()):
+        stub = self
+        self.api_key = None
+        self.batch_calls = []
+        self.batch_options = []
+        self.single_calls = []
+        errors = list(batch_errors)
+
+        class Batch:
+            @staticmethod
+            def send(params, options=None):
+                stub.batch_calls.append(params)
+                stub.batch_options.append(options)
+                if errors:
+                    raise errors.pop(0)
+                if batch_response is not None:
+                    return batch_response
+                return {"data": [{"id": f"msg_{i}"} for i in range(len(params))]}
+
+        class Emails:
+            @staticmethod
+            def send(params):
+                stub.single_calls.append(params)
+                if params["to"][0] in rejected:
+                    raise RuntimeError("rejected")
+                return {"id": "msg_single"}
+
+        self.Batch = Batch
+        self.Emails = Emails
+
+
+def _transient_users(n):
+    from models import generate_uuid
+
+    users = [User(id=generate_uuid(), email=f"batch{i}@example.com") for i in range(n)]
+    return users, {u.id: {"challenge_count": 1, "total_score": 3} for u in users}
+
+
+def test_dispatch_uses_provider_batches(monkeypatch):
+    """RESEND_BATCH_SIZE件ずつBatch.sendで送り、1通ずつの送信はしない"""
+    from email_service import dispatch_notifications
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend()
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(250)
+
+    results = dispatch_notifications(users, weekly_stats, concurrency=1)
+
+    assert results == [True] * 250
+    assert [len(call) for call in stub.batch_calls] == [100, 100, 50]
+    assert [params["to"] for call in stub.batch_calls for params in call] == [
+        [u.email] for u in users
+    ]
+    assert stub.single_calls == []
+
+
+def test_dispatch_respects_shared_rate_limit(monkeypatch):
+    """並列に送ってもAPI呼び出しはワーカー共有のレート制限（回/秒）を超えない"""
+    import threading
+    import time
+
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    limiter = RateLimiter(rate=20)
+    monkeypatch.setattr(email_service, "notification_rate_limiter", limiter)
+    stub = _BatchResend()
+    call_times = []
+    lock = threading.Lock()
+    send = stub.Batch.send
+
+    def timed_send(params, options=None):
+        with lock:
+            call_times.append(time.perf_counter())
+        return send(params, options)
+
+    stub.Batch.send = timed_send
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(50)
+
+    results = email_service.dispatch_notifications(
+        users, weekly_stats, concurrency=5, batch_size=10
+    )
+
+    assert results == [True] * 50
+    assert limiter.stats()["acquired"] == 5
+    call_times.sort()
+    # 5回の呼び出しは1/20秒ずつ間隔が空く（1回目はburst）
+    assert call_times[-1] - call_times[0] >= 4 / 20 * 0.9
+
+
+def test_batch_validation_rejection_falls_back_to_single_sends(monkeypatch):
+    """バッチ全体が内容の不正で拒否されたら1通ずつ送り、失敗したメッセージだけFalseになる"""
+    from email_service import send_notification_email_batch
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend(
+        batch_errors=[_ResendError(422, "invalid `to` field")], rejected={"batch1@example.com"}
+    )
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(3)
+
+    results = send_notification_email_batch(users, weekly_stats)
+
+    assert results == [True, False, True]
+    assert len(stub.batch_calls) == 1
+    assert len(stub.single_calls) == 3
+
+
+def test_batch_partial_errors_mark_only_failed(monkeypatch):
+    """permissiveモードでerrorsに返されたメッセージだけをFalseにし、1通ずつ送り直さない"""
+    from email_service import send_notification_email_batch
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend(
+        batch_response={
+            "data": [{"id": "msg_0"}, {"id": "msg_2"}],
+            "errors": [{"index": 1, "message": "invalid `to` field"}],
+        },
+    )
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(3)
+
+    results = send_notification_email_batch(users, weekly_stats)
+
+    assert results == [True, False, True]
+    assert stub.batch_options[0]["batch_validation"] == "permissive"
+    assert stub.single_calls == []
+
+
+def test_batch_rate_limited_is_retried_with_same_idempotency_key(monkeypatch):
+    """429ならバッチごと間隔を空けて送り直し、同じ冪等キーを使う（1通ずつには切り替えない）"""
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    monkeypatch.setattr(email_service, "RESEND_RETRY_BACKOFF_SECONDS", 0.01)
+    sleeps = []
+    monkeypatch.setattr(email_service.time, "sleep", sleeps.append)
+    stub = _BatchResend(
+        batch_errors=[_ResendError(429, "rate limited"), _ResendError(429, "rate limited")]
+    )
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(3)
+
+    results = email_service.send_notification_email_batch(users, weekly_stats)
+
+    assert results == [True, True, True]
+    assert len(stub.batch_calls) == 3
+    assert len({options["idempotency_key"] for options in stub.batch_options}) == 1
+    assert sleeps == [0.01, 0.02]
+    assert stub.single_calls == []
+
+
+def test_batch_timeout_is_retried_then_fails_without_single_sends(monkeypatch):
+    """タイムアウトが続けば送り直しの上限で諦めて全員Falseにし、1通ずつ送り直さない（二重送信しない）"""
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    monkeypatch.setattr(email_service, "RESEND_BATCH_MAX_RETRIES", 2)
+    monkeypatch.setattr(email_service.time, "sleep", lambda seconds: None)
+    stub = _BatchResend(batch_errors=[TimeoutError("read timed out")] * 3)
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(3)
+
+    results = email_service.send_notification_email_batch(users, weekly_stats)
+
+    assert results == [False, False, False]
+    assert len(stub.batch_calls) == 3
+    assert len({options["idempotency_key"] for options in stub.batch_options}) == 1
+    assert stub.single_calls == []
+
+
+def test_batch_non_transient_error_is_not_retried(monkeypatch):
+    """認証エラーなど送り直しても成功しないエラーは、送り直さず全員Falseにする"""
+    from email_service import send_notification_email_batch
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend(batch_errors=[_ResendError(401, "invalid api key")])
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    users, weekly_stats = _transient_users(2)
+
+    assert send_notification_email_batch(users, weekly_stats) == [False, False]
+    assert len(stub.batch_calls) == 1
+    assert stub.single_calls == []
+
+
+def test_send_endpoint_maps_batch_results_to_failed_emails(client, monkeypatch, db):
+    """バッチ送信の結果がユーザーごとにfailed_emailsへ対応づけられる"""
+    monkeypatch.setenv("NOTIFICATION_API_KEY", "test_key_123")
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend(
+        batch_response={"data": [{"id": "msg_0"}], "errors": [{"index": 1, "message": "bad"}]},
+    )
+    monkeypatch.setitem(sys.modules, "resend", stub)
+
+    hour_str = f"{datetime.now(timezone(timedelta(hours=9))).hour:02d}:00"
+    db.add_all(
+        [
+            User(
+                email="good@example.com",
+                hashed_password="x",
+                notification_time=hour_str,
+                next_notification_at=_due(),
+            ),
+            User(
+                email="bad@example.com",
+                hashed_password="x",
+                notification_time=hour_str,
+                next_notification_at=_due(),
+            ),
+        ]
+    )
+    db.commit()
+
+    response = client.post("/notifications/send", headers={"X-API-Key": "test_key_123"})
+
+    data = response.json()["data"]
+    assert data["emails_sent"] == 1
+    assert data["emails_failed"] == 1
+    assert [f["email"] for f in data["failed_emails"]] == ["bad@example.com"]
+    assert len(stub.batch_calls) == 1
+    assert stub.single_calls == []
+
+
+# ====== メールテンプレート ======
+
+
+def test_compiled_template_matches_replace_rendering():
+    """コンパイル済みテンプレートの描画結果は、プレースホルダーを順に置換した結果と同じ"""
+    import email_service
+
+    context = {
+        "email": "render@example.com",
+        "challenge_count": 3,
+        "total_score": 11,
+        "average_score": "3.7",
+        "week_start": "2025/01/06",
+        "week_end": "2025/01/12",
+        "app_url": "https://example.com",
+    }
+    for name in ("notification_email.html", "notification_email.txt"):
+        with open(f"{email_service.TEMPLATE_DIR}/{name}", encoding="utf-8") as f:
+            expected = f.read()
+        for key, value in context.items():
+            expected = expected.replace("{{ " + key + " }}", str(value))
+
+        assert email_service._get_template(name).render(context) == expected
+
+
+def test_compiled_template_keeps_unknown_placeholders():
+    """contextにないプレースホルダーはそのまま残す"""
+    from email_service import _CompiledTemplate
+
+    template = _CompiledTemplate("{{ a }} + {{ b }} = {{ a }}{{ b }}!")
+
+    assert template.render({"a": 1}) == "1 + {{ b }} = 1{{ b }}!"
+    assert template.render({"a": 1, "b": "x"}) == "1 + x = 1x!"
+
+
+def test_templates_are_loaded_once_unless_reload(monkeypatch, tmp_path):
+    """テンプレートは初回だけ読み込み、TEMPLATE_RELOADが有効なら更新を検知して読み直す"""
+    import os
+
+    import email_service
+
+    monkeypatch.setattr(email_service, "TEMPLATE_DIR", str(tmp_path))
+    monkeypatch.setattr(email_service, "_template_cache", {})
+    path = tmp_path / "greeting.txt"
+    path.write_text("Hello {{ email }}", encoding="utf-8")
+
+    assert email_service._get_template("greeting.txt").render({"email": "a"}) == "Hello a"
+    assert email_service._get_template("missing.txt") is None
+
+    # 本番（既定）ではファイルが更新されても読み直さない
+    path.write_text("Bye {{ email }}", encoding="utf-8")
+    os.utime(path, (0, 0))
+    assert email_service._get_template("greeting.txt").render({"email": "a"}) == "Hello a"
+
+    monkeypatch.setattr(email_service, "TEMPLATE_RELOAD", True)
+    assert email_service._get_template("greeting.txt").render({"email": "a"}) == "Bye a"
+
+
+def test_send_batch_advances_schedule(client, monkeypatch, db):
+    """送信すると次の通知時刻へ進み、同じ時刻には再送しない"""
+    monkeypatch.setenv("NOTIFICATION_API_KEY", "test_key_123")
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    monkeypatch.setitem(sys.modules, "resend", _BatchResend())
+
+    user = User(
+        email="schedule@example.com",
+        hashed_password="x",
+        notification_time="07:30",
+        timezone="America/Los_Angeles",
+        next_notification_at=_due(),
+    )
+    db.add(user)
+    db.commit()
+
+    from notification_schedule import next_notification_at
+
+    before = datetime.utcnow()
+    first = client.post("/notifications/send", headers={"X-API-Key": "test_key_123"}).json()
+    second = client.post("/notifications/send", headers={"X-API-Key": "test_key_123"}).json()
+
+    assert first["data"]["emails_sent"] == 1
+    assert second["data"]["total_users"] == 0
+    db.refresh(user)
+    assert user.next_notification_at > before
+    assert user.next_notification_at == next_notification_at("07:30", "America/Los_Angeles", before)
+
+
+def _overlap_users(db, n):
+    users = [
+        User(
+            email=f"overlap{i}@example.com",
+            hashed_password="x",
+            notification_time="20:00",
+            timezone="Asia/Tokyo" if i % 2 else "UTC",
+            next_notification_at=_due(),
+        )
+        for i in range(n)
+    ]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def test_overlapping_batches_send_one_email_per_user(monkeypatch, db):
+    """実行が重なっても（前のバッチの送信中に次のバッチが始まっても）各ユーザーに1通だけ送る"""
+    from sqlalchemy.orm import sessionmaker
+
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend()
+    send = stub.Batch.send
+    overlapping = []
+    other_db = sessionmaker(bind=db.get_bind())()
+
+    def send_and_overlap(params, options=None):
+        # 1つ目のバッチの送信中に、別のセッションで次のバッチを実行する
+        if not overlapping:
+            overlapping.append(email_service.send_notification_batch(other_db))
+        return send(params, options)
+
+    stub.Batch.send = send_and_overlap
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    _overlap_users(db, 4)
+
+    try:
+        first = email_service.send_notification_batch(db)
+    finally:
+        other_db.close()
+
+    recipients = [params["to"][0] for call in stub.batch_calls for params in call]
+    assert sorted(recipients) == [f"overlap{i}@example.com" for i in range(4)]
+    assert first["emails_sent"] == 4
+    assert overlapping[0]["total_users"] == 0
+
+
+def test_batches_selecting_same_users_claim_each_user_once(monkeypatch, db):
+    """2つのバッチが同じ対象ユーザーを選んでも、先に確保した方だけが送る"""
+    from sqlalchemy.orm import sessionmaker
+
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    stub = _BatchResend()
+    monkeypatch.setitem(sys.modules, "resend", stub)
+    _overlap_users(db, 4)
+
+    select_due = email_service.get_users_for_notification
+    other_db = sessionmaker(bind=db.get_bind())()
+    overlapping = {}
+
+    def select_then_overlap(session, now):
+        users = select_due(session, now)
+        # 1つ目のバッチが対象を選んだ直後（確保する前）に、次のバッチが選んで確保・送信する
+        if session is db and "result" not in overlapping:
+            overlapping["result"] = email_service.send_notification_batch(other_db)
+        return users
+
+    monkeypatch.setattr(email_service, "get_users_for_notification", select_then_overlap)
+
+    try:
+        first = email_service.send_notification_batch(db)
+    finally:
+        other_db.close()
+
+    recipients = [params["to"][0] for call in stub.batch_calls for params in call]
+    assert sorted(recipients) == [f"overlap{i}@example.com" for i in range(4)]
+    assert overlapping["result"]["emails_sent"] == 4
+    assert first["total_users"] == 0
+
+
+def test_failed_sends_keep_advanced_schedule(monkeypatch, db):
+    """送信に失敗したユーザーも失敗として記録し、次の通知時刻は戻さない"""
+    import email_service
+
+    monkeypatch.setenv("RESEND_API_KEY", "resend_test_key")
+    monkeypatch.setitem(
+        sys.modules, "resend", _BatchResend(batch_errors=[_ResendError(401, "invalid api key")])
+    )
+    users = _overlap_users(db, 2)
+
+    result = email_service.send_notification_batch(db)
+
+    assert result["emails_failed"] == 2
+    assert sorted(f["email"] for f in result["failed_emails"]) == [u.email for u in users]
+    db.expire_all()
+    assert all(u.next_notification_at > datetime.utcnow() for u in users)
+    assert email_service.get_users_for_notification(db, datetime.utcnow()) == []
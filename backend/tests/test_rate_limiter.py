@@ -0,0 +1,55 @@
+"""レートリミッター（トークンバケット）のテスト"""
+
+import threading
+import time
+
+from rate_limiter import RateLimiter
+
+
+def test_burst_is_not_throttled():
+    """正常系: burst個までは待たずに取得できる"""
+    limiter = RateLimiter(rate=1, burst=3)
+
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.stats()["throttled"] == 0
+
+
+def test_acquire_waits_for_refill():
+    """正常系: トークンがなければ補充まで待ち、rate回/秒を超えない"""
+    limiter = RateLimiter(rate=20)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        limiter.acquire()
+    elapsed = time.perf_counter() - start
+
+    # 1回目はburst、残り4回は1/20秒ずつ待つ
+    assert elapsed >= 4 / 20 * 0.9
+    stats = limiter.stats()
+    assert stats["acquired"] == 5
+    assert stats["throttled"] == 4
+
+
+def test_limit_is_shared_between_threads():
+    """正常系: 複数スレッドで共有しても合計がrate回/秒に抑えられる"""
+    limiter = RateLimiter(rate=50)
+    threads = [
+        threading.Thread(target=lambda: [limiter.acquire() for _ in range(3)]) for _ in range(4)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    assert limiter.stats()["acquired"] == 12
+    assert elapsed >= 11 / 50 * 0.9
+
+
+def test_zero_rate_disables_limit():
+    """rateが0以下なら制限しない"""
+    limiter = RateLimiter(rate=0)
+
+    assert all(limiter.acquire() == 0.0 for _ in range(100))
@@ -0,0 +1,129 @@
+"""トークン失効リストのテスト"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from models import RevokedToken
+from revocation import RevocationList, purge_expired
+
+
+def _session_factory(db: Session):
+    class _Factory:
+        def __call__(self):
+            return self
+
+        def __enter__(self):
+            return db
+
+        def __exit__(self, *args):
+            return False
+
+    return _Factory()
+
+
+def test_revoke_is_visible_immediately(db: Session):
+    """失効させたjtiはこのプロセスで即座に失効済みと判定される"""
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    expires_at = datetime.utcnow() + timedelta(days=1)
+
+    assert revocations.is_revoked("jti-1") is False
+    revocations.revoke(db, "jti-1", expires_at)
+
+    assert revocations.is_revoked("jti-1") is True
+    assert db.get(RevokedToken, "jti-1") is not None
+
+
+def test_revoke_already_revoked_jti(db: Session):
+    """同じトークンの同時ログアウト: 他のリクエストが登録済みでもエラーにならない"""
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    db.add(RevokedToken(jti="jti-dup", expires_at=expires_at))
+    db.commit()
+
+    revocations.revoke(db, "jti-dup", expires_at)
+    revocations.revoke(db, "jti-dup", expires_at)
+
+    assert revocations.is_revoked("jti-dup") is True
+    assert db.query(RevokedToken).filter(RevokedToken.jti == "jti-dup").count() == 1
+
+
+def test_sync_picks_up_revocations_from_other_processes(db: Session):
+    """他プロセスがDBに登録した失効は同期で取り込まれる"""
+    revocations = RevocationList(_session_factory(db), sync_interval=0)
+    assert revocations.is_revoked("jti-other") is False
+
+    db.add(RevokedToken(jti="jti-other", expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+
+    assert revocations.is_revoked("jti-other") is True
+
+
+def test_no_sync_within_interval(db: Session):
+    """同期間隔内はDBに問い合わせずメモリ上のセットで判定する"""
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    assert revocations.is_revoked("jti-later") is False
+
+    db.add(RevokedToken(jti="jti-later", expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+
+    assert revocations.is_revoked("jti-later") is False
+
+
+def test_sync_prunes_expired_entries_from_memory_only(db: Session):
+    """同期は期限切れのエントリをメモリから削除するが、テーブルの行は削除しない"""
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    revocations.revoke(db, "jti-expired", datetime.utcnow() - timedelta(seconds=1))
+    revocations.revoke(db, "jti-valid", datetime.utcnow() + timedelta(days=1))
+
+    revocations.sync(db)
+
+    assert revocations.stats()["size"] == 1
+    assert db.get(RevokedToken, "jti-expired") is not None
+
+
+def test_purge_expired_deletes_expired_rows(db: Session):
+    """定期実行のpurge_expiredが期限切れの行だけを削除する"""
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    revocations.revoke(db, "jti-expired", datetime.utcnow() - timedelta(seconds=1))
+    revocations.revoke(db, "jti-valid", datetime.utcnow() + timedelta(days=1))
+
+    assert purge_expired(db) == 1
+
+    assert db.get(RevokedToken, "jti-expired") is None
+    assert db.get(RevokedToken, "jti-valid") is not None
+
+
+def test_concurrent_requests_sync_once(db: Session, monkeypatch):
+    """同期間隔が来たときに同時に判定したリクエストのうち、1スレッドだけが同期する"""
+    import threading
+    import time
+
+    revocations = RevocationList(_session_factory(db), sync_interval=3600)
+    syncs = []
+
+    def slow_sync(session):
+        syncs.append(threading.get_ident())
+        time.sleep(0.05)
+
+    monkeypatch.setattr(revocations, "sync", slow_sync)
+    threads = [threading.Thread(target=revocations.is_revoked, args=("jti",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(syncs) == 1
+
+
+def test_notification_batch_purges_expired_revocations(client, db: Session, monkeypatch):
+    """通知バッチ（定期実行）のついでに期限切れの失効済みトークンの行を削除する"""
+    monkeypatch.setenv("NOTIFICATION_API_KEY", "test_key_123")
+    db.add(RevokedToken(jti="jti-expired", expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+    response = client.post("/notifications/send", headers={"X-API-Key": "test_key_123"})
+
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.get(RevokedToken, "jti-expired") is None
@@ -0,0 +1,44 @@
+"""レスポンススキーマのテスト"""
+
+import json
+import uuid
+from datetime import datetime
+
+from schemas import ChallengeResponse, PaginatedResponse, challenge_list_adapter
+from serialization import ModelResponse
+
+
+def _challenge(created_at: datetime) -> ChallengeResponse:
+    return ChallengeResponse(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), content="c", score=3, created_at=created_at
+    )
+
+
+def test_challenge_created_at_serialized_as_jst():
+    """UTC naiveのcreated_atはJSTのISO 8601文字列で出力される"""
+    challenge = _challenge(datetime(2025, 1, 1, 15, 30))
+
+    assert challenge.model_dump()["created_at"] == "2025-01-02T00:30:00+09:00"
+    assert json.loads(challenge.model_dump_json())["created_at"] == "2025-01-02T00:30:00+09:00"
+
+
+def test_model_response_renders_typed_envelope():
+    """ModelResponseは型付きの封筒をそのままJSONにする"""
+    rows = [_challenge(datetime(2025, 1, 1, 0, 0)), _challenge(datetime(2025, 1, 2, 0, 0))]
+    envelope = PaginatedResponse[list[ChallengeResponse]](
+        data=challenge_list_adapter.validate_python(rows, from_attributes=True),
+        message="ok",
+        next_cursor="abc",
+    )
+
+    response = ModelResponse(envelope, status_code=201)
+    body = json.loads(response.body)
+
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert body["success"] is True
+    assert body["next_cursor"] == "abc"
+    assert [item["created_at"] for item in body["data"]] == [
+        "2025-01-01T09:00:00+09:00",
+        "2025-01-02T09:00:00+09:00",
+    ]
@@ -1,6 +1,10 @@
 """統計エンドポイントのテスト"""
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from models import Challenge, ChallengeDailyStats, User
 
 
 def test_get_stats_summary_success(client, auth_token):
@@ -279,3 +283,214 @@ def test_get_calendar_user_isolation(client, auth_token):
     assert len(data["data"]["days"]) == 1
     assert data["data"]["days"][0]["challenge_count"] == 1
     assert data["data"]["days"][0]["total_score"] == 5
+
+
+def test_get_stats_summary_period_split(client, auth_token, db):
+    """GET /stats/summary - 今日・今週・それ以前の集計が期間ごとに分かれる"""
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    today = datetime.now(timezone(timedelta(hours=9))).date()
+    week_start = today - timedelta(days=today.weekday())
+    db.add_all(
+        [
+            ChallengeDailyStats(user_id=user.id, local_date=today, count=2, score_sum=8),
+            ChallengeDailyStats(
+                user_id=user.id, local_date=week_start - timedelta(days=1), count=3, score_sum=3
+            ),
+        ]
+    )
+    if week_start < today:
+        db.add(ChallengeDailyStats(user_id=user.id, local_date=week_start, count=1, score_sum=5))
+    db.commit()
+    week_count, week_score = (3, 13) if week_start < today else (2, 8)
+
+    response = client.get("/stats/summary", headers={"Authorization": f"Bearer {auth_token}"})
+
+    data = response.json()["data"]
+    assert data["today"] == {"challenge_count": 2, "total_score": 8, "average_score": 4.0}
+    assert data["this_week"]["challenge_count"] == week_count
+    assert data["this_week"]["total_score"] == week_score
+    assert data["all_time"]["challenge_count"] == week_count + 3
+    assert data["all_time"]["total_score"] == week_score + 3
+
+
+def test_get_score_distribution(client, auth_token, db):
+    """GET /stats/distribution - スコアごとの件数を返す（期間指定可）"""
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    db.add_all(
+        [
+            Challenge(user_id=user.id, content="a", score=1, local_date=date(2025, 1, 1)),
+            Challenge(user_id=user.id, content="b", score=3, local_date=date(2025, 1, 2)),
+            Challenge(user_id=user.id, content="c", score=3, local_date=date(2025, 1, 3)),
+            Challenge(user_id=user.id, content="d", score=5, local_date=date(2025, 1, 4)),
+        ]
+    )
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get("/stats/distribution", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["counts"] == [1, 0, 2, 0, 1]
+    assert data["total"] == 4
+
+    response = client.get(
+        "/stats/distribution",
+        headers=headers,
+        params={"start_date": "2025-01-02", "end_date": "2025-01-03"},
+    )
+    data = response.json()["data"]
+    assert data["counts"] == [0, 0, 2, 0, 0]
+    assert data["start_date"] == "2025-01-02"
+    assert data["end_date"] == "2025-01-03"
+
+
+def test_get_score_distribution_etag(client, auth_token):
+    """GET /stats/distribution - 内容が同じならETagで304を返し、記録が増えれば200を返す"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = client.get("/stats/distribution", headers=headers)
+    etag = first.headers["ETag"]
+
+    not_modified = client.get("/stats/distribution", headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    client.post("/challenges", headers=headers, json={"content": "c", "score": 2})
+    modified = client.get("/stats/distribution", headers={**headers, "If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.json()["data"]["counts"] == [0, 1, 0, 0, 0]
+
+
+def test_get_score_distribution_invalid_range(client, auth_token):
+    """GET /stats/distribution - 開始日が終了日より後なら422"""
+    response = client.get(
+        "/stats/distribution",
+        headers={"Authorization": f"Bearer {auth_token}"},
+        params={"start_date": "2025-02-01", "end_date": "2025-01-01"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_get_score_distribution_no_token(client):
+    """GET /stats/distribution - トークンなしは401"""
+    assert client.get("/stats/distribution").status_code == 401
+
+
+def test_get_trend_gap_filled(client, auth_token, db):
+    """GET /stats/trend - 記録のない日も0で埋めた連続した日別推移を返す"""
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    today = datetime.now(timezone(timedelta(hours=9))).date()
+    db.add_all(
+        [
+            Challenge(user_id=user.id, content="a", score=2, local_date=today - timedelta(days=2)),
+            Challenge(user_id=user.id, content="b", score=3, local_date=today),
+            Challenge(user_id=user.id, content="c", score=5, local_date=today),
+            # 期間外
+            Challenge(user_id=user.id, content="d", score=4, local_date=today - timedelta(days=3)),
+        ]
+    )
+    db.commit()
+
+    response = client.get(
+        "/stats/trend", headers={"Authorization": f"Bearer {auth_token}"}, params={"days": 3}
+    )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["dates"] == [(today - timedelta(days=i)).isoformat() for i in (2, 1, 0)]
+    assert data["counts"] == [1, 0, 2]
+    assert data["scores"] == [2, 0, 8]
+    assert data["score_counts"] == [[0, 1, 0, 0, 0], [0, 0, 0, 0, 0], [0, 0, 1, 0, 1]]
+
+
+def test_get_trend_default_days(client, auth_token):
+    """GET /stats/trend - daysを省略すると14日分"""
+    response = client.get("/stats/trend", headers={"Authorization": f"Bearer {auth_token}"})
+
+    data = response.json()["data"]
+    assert len(data["dates"]) == 14
+    assert data["counts"] == [0] * 14
+
+
+def test_get_trend_invalid_days(client, auth_token):
+    """GET /stats/trend - daysが範囲外なら422"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    assert client.get("/stats/trend", headers=headers, params={"days": 0}).status_code == 422
+    assert client.get("/stats/trend", headers=headers, params={"days": 367}).status_code == 422
+
+
+def test_get_dashboard(client, auth_token):
+    """GET /dashboard - 個別の統計エンドポイントと同じ内容を1回のレスポンスで返す"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(6):
+        client.post(
+            "/challenges", headers=headers, json={"content": f"挑戦{i}", "score": i % 5 + 1}
+        )
+    today = datetime.now(timezone(timedelta(hours=9))).date()
+
+    response = client.get("/dashboard", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    data = response.json()["data"]
+    assert data["summary"] == client.get("/stats/summary", headers=headers).json()["data"]
+    assert (
+        data["recent_challenges"]
+        == client.get("/challenges", headers=headers, params={"limit": 5}).json()["data"]
+    )
+    assert (
+        data["calendar"]
+        == client.get(
+            "/stats/calendar", headers=headers, params={"year": today.year, "month": today.month}
+        ).json()["data"]
+    )
+    assert (
+        data["trend"]
+        == client.get("/stats/trend", headers=headers, params={"days": 7}).json()["data"]
+    )
+    assert data["distribution"] == client.get("/stats/distribution", headers=headers).json()["data"]
+
+
+def test_get_dashboard_query_count(client, auth_token, db):
+    """GET /dashboard - 認証1回分と、各データ1本ずつの集計クエリで返す"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/challenges", headers=headers, json={"content": "挑戦", "score": 3})
+
+    engine = db.get_bind()
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/dashboard", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    # ユーザーの取得（キャッシュにあれば0回）+ サマリー・最近の記録・カレンダー・推移・分布
+    assert sum("FROM users" in statement for statement in executed) <= 1
+    assert len(executed) <= 6
+
+
+def test_get_dashboard_params(client, auth_token):
+    """GET /dashboard - recent_limit/trend_daysで件数・日数を変えられ、範囲外なら422"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        client.post("/challenges", headers=headers, json={"content": f"挑戦{i}", "score": 1})
+
+    data = client.get(
+        "/dashboard", headers=headers, params={"recent_limit": 2, "trend_days": 30}
+    ).json()["data"]
+    assert len(data["recent_challenges"]) == 2
+    assert len(data["trend"]["dates"]) == 30
+
+    assert client.get("/dashboard", headers=headers, params={"recent_limit": 0}).status_code == 422
+    assert client.get("/dashboard", headers=headers, params={"trend_days": 367}).status_code == 422
+
+
+def test_get_dashboard_no_token(client):
+    """GET /dashboard - トークンなしは401"""
+    assert client.get("/dashboard").status_code == 401
@@ -0,0 +1,135 @@
+"""日別集計（challenge_daily_stats）のテスト"""
+
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session
+
+import stats_rollup
+from models import Challenge, ChallengeDailyStats, User
+
+
+def _rollup(db: Session) -> dict:
+    db.expire_all()
+    return {
+        (row.user_id, row.local_date): (row.count, row.score_sum)
+        for row in db.query(ChallengeDailyStats).all()
+    }
+
+
+def test_rollup_follows_create_update_delete(client, auth_token, db: Session):
+    """作成・スコア更新・削除に合わせて日別集計が更新される"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = [
+        client.post(
+            "/challenges", headers=headers, json={"content": f"c{i}", "score": i + 1}
+        ).json()["data"]["id"]
+        for i in range(3)
+    ]
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    today = stats_rollup.local_date_of(datetime.utcnow())
+
+    assert _rollup(db) == {(user.id, today): (3, 6)}
+
+    client.put(f"/challenges/{ids[0]}", headers=headers, json={"score": 5})
+    assert _rollup(db) == {(user.id, today): (3, 10)}
+
+    client.put(f"/challenges/{ids[1]}", headers=headers, json={"content": "内容のみ変更"})
+    assert _rollup(db) == {(user.id, today): (3, 10)}
+
+    client.delete(f"/challenges/{ids[2]}", headers=headers)
+    assert _rollup(db) == {(user.id, today): (2, 7)}
+
+    for challenge_id in ids[:2]:
+        client.delete(f"/challenges/{challenge_id}", headers=headers)
+    assert _rollup(db) == {}
+
+
+def test_score_change_locks_challenge_before_reading_old_score():
+    """スコア変更の差分は、挑戦記録の行をFOR UPDATEでロックしてから読んだ変更前のスコアで求める
+
+    同じ挑戦記録の同時更新では、後続のトランザクションがロックを待ってコミット済みのスコアを
+    読むため、集計がずれない（例: 3 → 5、3 → 4 の同時更新でも差分は合計+1）。
+    """
+    import uuid
+
+    from sqlalchemy.dialects import postgresql
+
+    statement = stats_rollup._score_change_statement(uuid.uuid4(), uuid.uuid4(), 5)
+    sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("WITH old_challenge AS (SELECT")
+    cte, _, rest = sql.partition(") UPDATE challenge_daily_stats")
+    assert "FROM challenges" in cte
+    assert cte.endswith("FOR UPDATE")
+    assert "old_challenge.score" in rest
+
+
+def test_successive_score_changes_keep_rollup_in_sync(client, auth_token, db: Session):
+    """同じ挑戦記録のスコアを続けて変更しても、集計は最後のスコアとの差分だけ変わる"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    challenge_id = client.post(
+        "/challenges", headers=headers, json={"content": "c", "score": 3}
+    ).json()["data"]["id"]
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    today = stats_rollup.local_date_of(datetime.utcnow())
+
+    client.put(f"/challenges/{challenge_id}", headers=headers, json={"score": 5})
+    client.put(f"/challenges/{challenge_id}", headers=headers, json={"score": 4})
+
+    assert _rollup(db) == {(user.id, today): (1, 4)}
+
+
+def test_rebuild_repairs_drift(client, auth_token, db: Session):
+    """rebuildで挑戦記録から集計を作り直せる"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(2):
+        client.post("/challenges", headers=headers, json={"content": f"c{i}", "score": 4})
+    expected = _rollup(db)
+
+    # 集計がずれた状態を作る
+    db.query(ChallengeDailyStats).update({"count": 99, "score_sum": 0})
+    db.commit()
+
+    rows = stats_rollup.rebuild(db)
+
+    assert rows == 1
+    assert _rollup(db) == expected
+
+
+def test_rebuild_buckets_by_jst_date(client, auth_token, db: Session):
+    """rebuildはDB側でJSTの日付に変換して集計する（UTC 15:00以降は翌日）"""
+    user = db.query(User).filter(User.email == "test@example.com").one()
+    db.add_all(
+        [
+            Challenge(
+                user_id=user.id, content="a", score=1, created_at=datetime(2025, 1, 1, 14, 59)
+            ),
+            Challenge(
+                user_id=user.id, content="b", score=2, created_at=datetime(2025, 1, 1, 15, 0)
+            ),
+            Challenge(user_id=user.id, content="c", score=3, created_at=datetime(2025, 1, 2, 3, 0)),
+        ]
+    )
+    db.commit()
+
+    rows = stats_rollup.rebuild(db, user.id)
+
+    assert rows == 2
+    assert _rollup(db) == {
+        (user.id, date(2025, 1, 1)): (1, 1),
+        (user.id, date(2025, 1, 2)): (2, 5),
+    }
+
+
+def test_local_date_uses_user_timezone(client, auth_token, db: Session):
+    """挑戦記録の日付は作成時のユーザーのタイムゾーンで確定する"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.put("/auth/me", headers=headers, json={"timezone": "America/Los_Angeles"})
+    client.post("/challenges", headers=headers, json={"content": "c", "score": 2})
+
+    challenge = db.query(Challenge).one()
+    expected = stats_rollup.local_date_of(
+        challenge.created_at, stats_rollup.user_timezone("America/Los_Angeles")
+    )
+    assert challenge.local_date == expected
+    assert _rollup(db) == {(challenge.user_id, expected): (1, 2)}
@@ -4,7 +4,7 @@ import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { useAuth } from "@/lib/context/AuthContext";
 import { apiClient, getErrorMessage } from "@/lib/api/client";
-import { Challenge, ApiResponse } from "@/lib/types";
+import { Challenge, PaginatedResponse } from "@/lib/types";
 import { ChallengeCard } from "@/components/dashboard/ChallengeCard";
 import { EmptyState } from "@/components/dashboard/EmptyState";
 import { Button } from "@/components/ui/button";
@@ -25,6 +25,8 @@ export default function ChallengesListPage() {
   const { isAuthenticated, isLoading: authLoading } = useAuth();
   const [challenges, setChallenges] = useState<Challenge[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [deleteDialogOpen, setDeleteDialogOpen] = useState(false);
   const [deletingChallengeId, setDeletingChallengeId] = useState<string | null>(null);
   const [isDeleting, setIsDeleting] = useState(false);
@@ -36,10 +38,11 @@ export default function ChallengesListPage() {
     const fetchChallenges = async () => {
       try {
         setIsLoading(true);
-        const response = await apiClient.get<ApiResponse<Challenge[]>>(
+        const response = await apiClient.get<PaginatedResponse<Challenge[]>>(
           "/challenges?limit=50"
         );
         setChallenges(response.data.data);
+        setNextCursor(response.data.next_cursor);
       } catch (error) {
         console.error("Failed to fetch challenges:", getErrorMessage(error));
         toast.error("挑戦記録の取得に挑戦しました");
@@ -51,6 +54,26 @@ export default function ChallengesListPage() {
     fetchChallenges();
   }, [isAuthenticated]);
 
+  // 続きを読み込む（カーソルページネーション）
+  const loadMore = async () => {
+    if (!nextCursor) return;
+
+    setIsLoadingMore(true);
+    try {
+      const response = await apiClient.get<PaginatedResponse<Challenge[]>>(
+        "/challenges",
+        { params: { limit: 50, cursor: nextCursor } }
+      );
+      setChallenges((prev) => [...prev, ...response.data.data]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch challenges:", getErrorMessage(error));
+      toast.error("挑戦記録の取得に挑戦しました");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   // 編集ボタンのハンドラ
   const handleEdit = (id: string) => {
     // 将来実装: 編集ページへ遷移
@@ -142,6 +165,13 @@ export default function ChallengesListPage() {
                 onDelete={handleDelete}
               />
             ))}
+            {nextCursor && (
+              <div className="flex justify-center pt-2">
+                <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+                  {isLoadingMore ? "読み込み中..." : "もっと見る"}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -5,7 +5,7 @@ import Link from "next/link";
 import { useRouter } from "next/navigation";
 import { useAuth } from "@/lib/context/AuthContext";
 import { apiClient, getErrorMessage } from "@/lib/api/client";
-import { ApiResponse, StatsSummary, Challenge } from "@/lib/types";
+import { ApiResponse, Dashboard } from "@/lib/types";
 import { Button } from "@/components/ui/button";
 import { StatsCard } from "@/components/dashboard/StatsCard";
 import { ChallengeCard } from "@/components/dashboard/ChallengeCard";
@@ -21,15 +21,14 @@ import { Plus, Clock, Calendar as CalendarIcon, TrendingUp, Sun } from "lucide-r
  * - 新しい挑戦を記録するボタン
  * - 統計サマリー（今日、今週、全期間）
  * - 最近の挑戦記録（直近5件）
+ * - アナリティクスチャート・活動カレンダー
  */
 export default function DashboardPage() {
   const router = useRouter();
   const { user, isAuthenticated, isLoading: authLoading } = useAuth();
 
-  // 統計データ
-  const [stats, setStats] = useState<StatsSummary | null>(null);
-  // 最近の挑戦記録
-  const [recentChallenges, setRecentChallenges] = useState<Challenge[]>([]);
+  // ダッシュボードのデータ（統計・最近の記録・チャート・カレンダー）
+  const [dashboard, setDashboard] = useState<Dashboard | null>(null);
   // ローディング状態
   const [isLoading, setIsLoading] = useState(true);
 
@@ -45,7 +44,7 @@ export default function DashboardPage() {
 
   /**
    * データ取得
-   * 統計サマリーと最近の挑戦記録を並列で取得
+   * 画面に必要なデータを1回のリクエストでまとめて取得し、各チャートに渡す
    */
   useEffect(() => {
     if (!isAuthenticated) return;
@@ -54,14 +53,8 @@ export default function DashboardPage() {
       try {
         setIsLoading(true);
 
-        // 並列でAPIを呼び出し
-        const [statsResponse, challengesResponse] = await Promise.all([
-          apiClient.get<ApiResponse<StatsSummary>>("/stats/summary"),
-          apiClient.get<ApiResponse<Challenge[]>>("/challenges?limit=5"),
-        ]);
-
-        setStats(statsResponse.data.data);
-        setRecentChallenges(challengesResponse.data.data || []);
+        const response = await apiClient.get<ApiResponse<Dashboard>>("/dashboard");
+        setDashboard(response.data.data);
       } catch (error) {
         console.error("データ取得エラー:", getErrorMessage(error));
       } finally {
@@ -90,6 +83,9 @@ export default function DashboardPage() {
     );
   }
 
+  const stats = dashboard?.summary;
+  const recentChallenges = dashboard?.recent_challenges ?? [];
+
   return (
     <div className="space-y-8">
       {/* ページタイトル + 新規作成ボタン */}
@@ -148,14 +144,14 @@ export default function DashboardPage() {
           📈 アナリティクス
         </h2>
         <div className="grid gap-6 lg:grid-cols-2">
-          <WeeklyTrendChart />
-          <ScoreDistributionChart />
+          <WeeklyTrendChart trend={dashboard?.trend} />
+          <ScoreDistributionChart distribution={dashboard?.distribution} />
         </div>
       </div>
 
       {/* 活動カレンダー */}
       <div>
-        <CalendarHeatmap />
+        <CalendarHeatmap initialCalendar={dashboard?.calendar} />
       </div>
 
       {/* 最近の挑戦記録 */}
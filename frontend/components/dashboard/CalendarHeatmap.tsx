@@ -14,41 +14,60 @@ interface HeatmapDay {
   displayDate: string;
 }
 
+/**
+ * 日別統計をヒートマップのデータに変換
+ */
+function toHeatmapData(calendar: CalendarStats): HeatmapDay[] {
+  const days = calendar.days || [];
+  return days.map((day: DayStats) => {
+    const dateObj = new Date(day.date);
+    return {
+      date: day.date,
+      count: day.challenge_count,
+      displayDate: `${dateObj.getMonth() + 1}/${dateObj.getDate()}`,
+    };
+  });
+}
+
+interface CalendarHeatmapProps {
+  /** 今月のカレンダー（ダッシュボードで取得済みの場合）。他の月に移動したときは自分で取得する */
+  initialCalendar?: CalendarStats;
+}
+
 /**
  * カレンダーヒートマップ
  * GitHub風の貢献カレンダー
  * Material Design 3: トーナルカラー、マイクロインタラクション
  */
-export function CalendarHeatmap() {
+export function CalendarHeatmap({ initialCalendar }: CalendarHeatmapProps) {
   const [data, setData] = useState<HeatmapDay[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [hoveredDay, setHoveredDay] = useState<HeatmapDay | null>(null);
-  const [currentMonth, setCurrentMonth] = useState<{ year: number; month: number }>({
-    year: new Date().getFullYear(),
-    month: new Date().getMonth() + 1,
-  });
+  const [currentMonth, setCurrentMonth] = useState<{ year: number; month: number }>(
+    initialCalendar
+      ? { year: initialCalendar.year, month: initialCalendar.month }
+      : { year: new Date().getFullYear(), month: new Date().getMonth() + 1 }
+  );
 
   useEffect(() => {
+    const { year, month } = currentMonth;
+
+    // 取得済みの月はそのまま表示する
+    if (initialCalendar && initialCalendar.year === year && initialCalendar.month === month) {
+      setData(toHeatmapData(initialCalendar));
+      setIsLoading(false);
+      return;
+    }
+
     async function fetchData() {
       try {
         setIsLoading(true);
-        const { year, month } = currentMonth;
 
         const response = await apiClient.get<ApiResponse<CalendarStats>>(
           `/stats/calendar?year=${year}&month=${month}`
         );
 
-        const days = response.data.data.days || [];
-        const heatmapData = days.map((day: DayStats) => {
-          const dateObj = new Date(day.date);
-          return {
-            date: day.date,
-            count: day.challenge_count,
-            displayDate: `${dateObj.getMonth() + 1}/${dateObj.getDate()}`,
-          };
-        });
-
-        setData(heatmapData);
+        setData(toHeatmapData(response.data.data));
       } catch (error) {
         console.error("Failed to fetch calendar data:", getErrorMessage(error));
       } finally {
@@ -57,7 +76,7 @@ export function CalendarHeatmap() {
     }
 
     fetchData();
-  }, [currentMonth]);
+  }, [currentMonth, initialCalendar]);
 
   // 色の濃淡を計算（Material Design 3のトーナルカラー）
   const getColor = (count: number): string => {
@@ -5,7 +5,7 @@ import { motion } from "framer-motion";
 import { PieChart, Pie, Cell, ResponsiveContainer, Tooltip, Legend } from "recharts";
 import type { PieLabelRenderProps, LegendPayload } from "recharts";
 import { apiClient, getErrorMessage } from "@/lib/api/client";
-import { ApiResponse, Challenge } from "@/lib/types";
+import { ApiResponse, ScoreDistributionStats } from "@/lib/types";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { ChartSkeleton } from "./ChartSkeleton";
 import { PieChartIcon } from "lucide-react";
@@ -18,70 +18,85 @@ interface ScoreDistribution {
   [key: string]: number; // Recharts互換のためのインデックスシグネチャ
 }
 
+/**
+ * スコアごとの件数から円グラフのデータと最多スコアを作成
+ */
+function toDistribution(stats: ScoreDistributionStats): {
+  distribution: ScoreDistribution[];
+  mostCommonScore: number | null;
+} {
+  const counts = stats.counts ?? [];
+  const total = stats.total ?? 0;
+
+  // データ整形
+  const distribution: ScoreDistribution[] = [];
+  let maxCount = 0;
+  let maxScore = 1;
+
+  for (let score = 1; score <= 5; score++) {
+    const count = counts[score - 1] || 0;
+    if (count > maxCount) {
+      maxCount = count;
+      maxScore = score;
+    }
+    distribution.push({
+      score,
+      count,
+      percentage: total > 0 ? (count / total) * 100 : 0,
+    });
+  }
+
+  return {
+    distribution: distribution.filter((d) => d.count > 0), // カウントが0のスコアは除外
+    mostCommonScore: maxCount > 0 ? maxScore : null,
+  };
+}
+
+interface ScoreDistributionChartProps {
+  /** 全期間のスコア分布（ダッシュボードで取得済みの場合）。省略時は自分で取得する */
+  distribution?: ScoreDistributionStats;
+}
+
 /**
  * スコア分布チャート
  * 挑戦記録のスコア（1-5点）の分布を円グラフで可視化
  * Material Design 3: トーナルカラー、レスポンシブデザイン
  */
-export function ScoreDistributionChart() {
+export function ScoreDistributionChart({ distribution }: ScoreDistributionChartProps) {
   const [data, setData] = useState<ScoreDistribution[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [mostCommonScore, setMostCommonScore] = useState<number | null>(null);
 
   useEffect(() => {
+    const apply = (stats: ScoreDistributionStats) => {
+      const result = toDistribution(stats);
+      setData(result.distribution);
+      setMostCommonScore(result.mostCommonScore);
+    };
+
+    if (distribution) {
+      apply(distribution);
+      setIsLoading(false);
+      return;
+    }
+
     async function fetchData() {
       try {
         setIsLoading(true);
-        // 最新100件の挑戦記録を取得
-        const response = await apiClient.get<ApiResponse<Challenge[]>>(
-          "/challenges?limit=100"
+        // スコアごとの件数はサーバー側で集計済み（全期間）
+        const response = await apiClient.get<ApiResponse<ScoreDistributionStats>>(
+          "/stats/distribution"
         );
-
-        const challenges = response.data.data || [];
-
-        // スコア別にカウント
-        const scoreCounts = new Map<number, number>();
-        for (let i = 1; i <= 5; i++) {
-          scoreCounts.set(i, 0);
-        }
-
-        challenges.forEach((challenge) => {
-          const score = challenge.score;
-          scoreCounts.set(score, (scoreCounts.get(score) || 0) + 1);
-        });
-
-        // 合計数を計算
-        const total = challenges.length;
-
-        // データ整形
-        const distribution: ScoreDistribution[] = [];
-        let maxCount = 0;
-        let maxScore = 1;
-
-        for (let score = 1; score <= 5; score++) {
-          const count = scoreCounts.get(score) || 0;
-          if (count > maxCount) {
-            maxCount = count;
-            maxScore = score;
-          }
-          distribution.push({
-            score,
-            count,
-            percentage: total > 0 ? (count / total) * 100 : 0,
-          });
-        }
-
-        setData(distribution.filter((d) => d.count > 0)); // カウントが0のスコアは除外
-        setMostCommonScore(maxCount > 0 ? maxScore : null);
+        apply(response.data.data);
       } catch (error) {
-        console.error("Failed to fetch challenges:", getErrorMessage(error));
+        console.error("Failed to fetch score distribution:", getErrorMessage(error));
       } finally {
         setIsLoading(false);
       }
     }
 
     fetchData();
-  }, []);
+  }, [distribution]);
 
   if (isLoading) {
     return <ChartSkeleton />;
@@ -128,7 +143,7 @@ export function ScoreDistributionChart() {
             スコア分布
           </CardTitle>
           <p className="text-sm text-gray-500">
-            最新100件のチャレンジスコア（最多: {mostCommonScore}点）
+            全期間のチャレンジスコア（最多: {mostCommonScore}点）
           </p>
         </CardHeader>
         <CardContent>
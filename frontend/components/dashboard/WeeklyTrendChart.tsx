@@ -13,13 +13,9 @@ import {
   LabelList,
 } from "recharts";
 import { apiClient, getErrorMessage } from "@/lib/api/client";
-import { ApiResponse, Challenge } from "@/lib/types";
+import { ApiResponse, TrendStats } from "@/lib/types";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
-import {
-  getJstDateString,
-  isInCurrentWeekJst,
-  getWeekDayDateString,
-} from "@/lib/utils/timezone";
+import { getWeekDayDateString } from "@/lib/utils/timezone";
 import { ChartSkeleton } from "./ChartSkeleton";
 import { TrendingUp } from "lucide-react";
 import { SCORE_COLORS, SCORE_RANGE } from "@/lib/constants/colors";
@@ -36,90 +32,94 @@ interface ChartDataPoint {
   topScore: number;
 }
 
+/**
+ * 日別推移から今週（日曜〜土曜）の7日分のチャートデータを作成
+ */
+function toChartData(trend: TrendStats): ChartDataPoint[] {
+  // 日付 → スコア1〜5の件数
+  const dailyScores = new Map<string, number[]>();
+  trend.dates.forEach((dateStr, i) => {
+    dailyScores.set(dateStr, trend.score_counts[i]);
+  });
+
+  // 今週の7日分（日曜〜土曜）のデータを作成
+  const chartData: ChartDataPoint[] = [];
+  const weekDays = ["日", "月", "火", "水", "木", "金", "土"];
+
+  for (let i = 0; i < 7; i++) {
+    const dateStr = getWeekDayDateString(i, 0); // 0 = 日曜始まり
+    const counts = dailyScores.get(dateStr) || [0, 0, 0, 0, 0];
+
+    const score1 = counts[0] * 1;
+    const score2 = counts[1] * 2;
+    const score3 = counts[2] * 3;
+    const score4 = counts[3] * 4;
+    const score5 = counts[4] * 5;
+
+    // 最も下にあるスコアブロック（最小レベル）を決定
+    let topScore = 0;
+    if (score1 > 0) topScore = 1;
+    else if (score2 > 0) topScore = 2;
+    else if (score3 > 0) topScore = 3;
+    else if (score4 > 0) topScore = 4;
+    else if (score5 > 0) topScore = 5;
+
+    chartData.push({
+      date: dateStr,
+      displayDate: weekDays[i],
+      score1,
+      score2,
+      score3,
+      score4,
+      score5,
+      totalScore: score1 + score2 + score3 + score4 + score5,
+      topScore,
+    });
+  }
+
+  return chartData;
+}
+
+interface WeeklyTrendChartProps {
+  /** 直近7日分の日別推移（ダッシュボードで取得済みの場合）。省略時は自分で取得する */
+  trend?: TrendStats;
+}
+
 /**
  * 週次トレンドチャート
  * 今週（日曜始まり〜土曜終わり）の合計スコアをスコア別に色分けした積み上げ棒グラフで視覚化
  * Material Design 3: Material You colors, スムーズなアニメーション
  */
-export function WeeklyTrendChart() {
+export function WeeklyTrendChart({ trend }: WeeklyTrendChartProps) {
   const [data, setData] = useState<ChartDataPoint[]>([]);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
+    if (trend) {
+      setData(toChartData(trend));
+      setIsLoading(false);
+      return;
+    }
+
     async function fetchData() {
       try {
         setIsLoading(true);
 
-        // 挑戦記録を取得（最新100件）
-        const challengesResponse = await apiClient.get<ApiResponse<Challenge[]>>(
-          "/challenges?limit=100"
-        );
-        const challenges = challengesResponse.data.data || [];
-
-        // 今週のデータのみフィルタリング（JST基準、日曜始まり）
-        const thisWeekChallenges = challenges.filter((challenge) =>
-          isInCurrentWeekJst(challenge.created_at, 0)
+        // 直近7日分の日別推移を取得（サーバー側で日付・スコアごとに集計済み）
+        // 今週（日曜始まり）の経過日はすべて直近7日に含まれる
+        const trendResponse = await apiClient.get<ApiResponse<TrendStats>>(
+          "/stats/trend?days=7"
         );
-
-        // 日付ごとにグループ化（JST日付文字列を使用）
-        const dailyScores = new Map<string, Map<number, number>>();
-
-        thisWeekChallenges.forEach((challenge) => {
-          const dateStr = getJstDateString(challenge.created_at);
-
-          if (!dailyScores.has(dateStr)) {
-            dailyScores.set(dateStr, new Map());
-          }
-
-          const scoreMap = dailyScores.get(dateStr)!;
-          scoreMap.set(challenge.score, (scoreMap.get(challenge.score) || 0) + 1);
-        });
-
-        // 今週の7日分（日曜〜土曜）のデータを作成
-        const chartData: ChartDataPoint[] = [];
-        const weekDays = ["日", "月", "火", "水", "木", "金", "土"];
-
-        for (let i = 0; i < 7; i++) {
-          const dateStr = getWeekDayDateString(i, 0); // 0 = 日曜始まり
-          const scoreMap = dailyScores.get(dateStr) || new Map();
-
-          const score1 = (scoreMap.get(1) || 0) * 1;
-          const score2 = (scoreMap.get(2) || 0) * 2;
-          const score3 = (scoreMap.get(3) || 0) * 3;
-          const score4 = (scoreMap.get(4) || 0) * 4;
-          const score5 = (scoreMap.get(5) || 0) * 5;
-
-          // 最も下にあるスコアブロック（最小レベル）を決定
-          let topScore = 0;
-          if (score1 > 0) topScore = 1;
-          else if (score2 > 0) topScore = 2;
-          else if (score3 > 0) topScore = 3;
-          else if (score4 > 0) topScore = 4;
-          else if (score5 > 0) topScore = 5;
-
-          chartData.push({
-            date: dateStr,
-            displayDate: weekDays[i],
-            score1,
-            score2,
-            score3,
-            score4,
-            score5,
-            totalScore: score1 + score2 + score3 + score4 + score5,
-            topScore,
-          });
-        }
-
-        setData(chartData);
+        setData(toChartData(trendResponse.data.data));
       } catch (error) {
-        console.error("Failed to fetch challenges:", getErrorMessage(error));
+        console.error("Failed to fetch trend:", getErrorMessage(error));
       } finally {
         setIsLoading(false);
       }
     }
 
     fetchData();
-  }, []);
+  }, [trend]);
 
   if (isLoading) {
     return <ChartSkeleton />;
@@ -9,6 +9,7 @@ export interface User {
   email: string;
   notification_time?: string; // "HH:MM" 形式（例: "20:00"）
   is_notification_setup_completed: boolean; // 通知設定完了フラグ
+  timezone: string; // IANAのタイムゾーン名（例: "Asia/Tokyo"）
   created_at: string;
 }
 
@@ -88,6 +89,14 @@ export interface ApiResponse<T> {
   message: string;
 }
 
+/**
+ * ページネーション付き一覧のレスポンス型
+ * next_cursor を ?cursor= に渡すと続きを取得できる（最後のページでは null）
+ */
+export interface PaginatedResponse<T> extends ApiResponse<T> {
+  next_cursor: string | null;
+}
+
 /**
  * エラーレスポンス型
  * バックエンドがエラー時に返す形式
@@ -156,6 +165,43 @@ export interface CalendarStats {
   days: DayStats[];
 }
 
+/**
+ * スコア分布
+ * GET /stats/distribution のレスポンス
+ * counts[0] がスコア1、counts[4] がスコア5の件数
+ */
+export interface ScoreDistributionStats {
+  start_date: string | null; // "YYYY-MM-DD" 形式（null は制限なし）
+  end_date: string | null;
+  counts: number[];
+  total: number;
+}
+
+/**
+ * 日別推移（列形式）
+ * GET /stats/trend のレスポンス
+ * i番目の要素が dates[i] の日の値（記録のない日も0で含まれる）
+ */
+export interface TrendStats {
+  dates: string[]; // "YYYY-MM-DD" 形式、古い順
+  counts: number[]; // 日ごとの件数
+  scores: number[]; // 日ごとの合計スコア
+  score_counts: number[][]; // 日ごとのスコア1〜5それぞれの件数
+}
+
+/**
+ * ダッシュボード
+ * GET /dashboard のレスポンス
+ * ダッシュボードの初期表示に必要なデータをまとめて含む
+ */
+export interface Dashboard {
+  summary: StatsSummary;
+  recent_challenges: Challenge[]; // 新しい順
+  calendar: CalendarStats; // 今月
+  trend: TrendStats;
+  distribution: ScoreDistributionStats; // 全期間
+}
+
 // ========== ユーティリティ型 ==========
 
 /**
@@ -163,7 +209,8 @@ export interface CalendarStats {
  */
 export interface PaginationParams {
   limit?: number;
-  offset?: number;
+  offset?: number; // 旧方式（cursor推奨）
+  cursor?: string;
 }
 
 /**